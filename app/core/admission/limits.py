@@ -0,0 +1,130 @@
+"""
+Primitives for admission control: a concurrency gate and per-client token buckets.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict, deque
+from typing import Deque, Optional
+
+
+class ConcurrencyGate:
+    """
+    Caps the number of requests handled at once.
+
+    Unlike `asyncio.Semaphore`, waiting is bounded: a caller that cannot get a slot
+    within its timeout is turned away, and at most `limit` callers may wait at once.
+    Released slots are handed directly to the oldest waiter.
+
+    Args:
+        limit (int): Maximum number of slots held concurrently.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.in_flight = 0
+        self._waiters: Deque["asyncio.Future[None]"] = deque()
+
+    async def acquire(self, timeout: float) -> bool:
+        """
+        Take a slot, waiting up to `timeout` seconds for one to free up.
+
+        Returns:
+            bool: True if a slot was taken and must later be released.
+        """
+        if self.in_flight < self.limit and not self._waiters:
+            self.in_flight += 1
+            return True
+        if timeout <= 0 or len(self._waiters) >= self.limit:
+            return False
+        waiter: "asyncio.Future[None]" = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, timeout)
+            return True
+        except asyncio.TimeoutError:
+            # The slot may have been handed over just as the timeout fired.
+            if waiter.done() and not waiter.cancelled():
+                return True
+            self._waiters.remove(waiter)
+            return False
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+
+    def release(self) -> None:
+        """Give a slot back, passing it to the oldest waiter if there is one."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+
+class _Bucket:
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, tokens: float, updated: float):
+        self.tokens = tokens
+        self.updated = updated
+
+
+class TokenBucketStore:
+    """
+    Per-client token buckets with idle-entry eviction.
+
+    Buckets are kept in least-recently-used order, so lookups, refills and evictions
+    are all O(1): a bucket idle for longer than `idle_ttl` is indistinguishable from
+    a new, full one and is dropped from the front of the order.
+
+    Args:
+        rate (float): Tokens added per second.
+        burst (float): Bucket capacity.
+        idle_ttl (float): Seconds after which an unused bucket is evicted.
+        max_entries (int): Hard cap on the number of tracked clients.
+    """
+
+    def __init__(self, rate: float, burst: float, idle_ttl: float, max_entries: int):
+        self.rate = rate
+        self.burst = burst
+        self.idle_ttl = idle_ttl
+        self.max_entries = max_entries
+        self._buckets: "OrderedDict[str, _Bucket]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def consume(self, key: str, now: Optional[float] = None) -> float:
+        """
+        Take one token from the bucket for `key`.
+
+        Args:
+            key (str): Client identifier.
+            now (Optional[float]): Current monotonic time, mainly for tests.
+
+        Returns:
+            float: 0.0 if the request is allowed, otherwise the seconds until a
+            token becomes available.
+        """
+        now = time.monotonic() if now is None else now
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = _Bucket(self.burst, now)
+        else:
+            self._buckets.move_to_end(key)
+            bucket.tokens = min(self.burst, bucket.tokens + (now - bucket.updated) * self.rate)
+            bucket.updated = now
+        self._evict(now)
+        if bucket.tokens >= 1:
+            bucket.tokens -= 1
+            return 0.0
+        return (1 - bucket.tokens) / self.rate
+
+    def _evict(self, now: float) -> None:
+        while self._buckets:
+            key, oldest = next(iter(self._buckets.items()))
+            if len(self._buckets) <= self.max_entries and now - oldest.updated < self.idle_ttl:
+                return
+            del self._buckets[key]
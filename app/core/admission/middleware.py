@@ -0,0 +1,118 @@
+"""
+FastAPI middleware for admission control and per-client rate limiting.
+
+When the database or its connection pool saturates, unbounded queueing inside
+request handlers makes latency explode for every caller. This middleware keeps
+the amount of concurrent work bounded instead:
+
+- A global cap and optional per path-prefix caps on in-flight requests. A request
+  that cannot get a slot within a short queueing timeout is rejected with
+  503 Service Unavailable and a Retry-After header.
+- Per-client token buckets, keyed on the 'X-User-Id' header (the same identity
+  recorded by `LoggingMiddleware`) or else the client IP, so one noisy caller is
+  rejected with 429 Too Many Requests before it can starve the others.
+
+Queue waits and rejections are recorded in the metrics registry under `admission.*`.
+
+Note:
+    'X-User-Id' is not authenticated; behind an untrusted edge, rate limits keyed
+    on it can be sidestepped by rotating the header.
+"""
+
+import time
+from math import ceil
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.types import ASGIApp
+
+import app.core.config as config
+from app.core.config import PrefixRules
+from app.core.admission.limits import ConcurrencyGate, TokenBucketStore
+from app.core.metrics.registry import metrics
+
+
+class AdmissionMiddleware(BaseHTTPMiddleware):
+    """
+    Middleware that bounds in-flight requests and rate limits each client.
+
+    Args:
+        app (ASGIApp): The wrapped application.
+        max_in_flight (int): Global cap on concurrently handled requests.
+        route_limits (Optional[Dict[str, float]]): Caps per path prefix; the longest
+            matching prefix applies.
+        queue_timeout (float): Seconds a request may wait for a free slot.
+        rate (float): Tokens per second per client; 0 disables rate limiting.
+        burst (float): Token bucket capacity per client.
+        idle_ttl (float): Seconds before an idle client's bucket is evicted.
+        max_clients (int): Maximum number of client buckets kept in memory.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        max_in_flight: int = config.ADMISSION_MAX_IN_FLIGHT,
+        route_limits: Optional[Dict[str, float]] = None,
+        queue_timeout: float = config.ADMISSION_QUEUE_TIMEOUT,
+        rate: float = config.RATE_LIMIT_PER_SECOND,
+        burst: float = config.RATE_LIMIT_BURST,
+        idle_ttl: float = config.RATE_LIMIT_IDLE_SECONDS,
+        max_clients: int = config.RATE_LIMIT_MAX_CLIENTS,
+    ) -> None:
+        super().__init__(app)
+        limits = config.ADMISSION_ROUTE_LIMITS if route_limits is None else route_limits
+        self.global_gate = ConcurrencyGate(max_in_flight)
+        self.route_gates = PrefixRules(
+            {prefix: ConcurrencyGate(int(limit)) for prefix, limit in limits.items()}
+        )
+        self.queue_timeout = queue_timeout
+        self.buckets = TokenBucketStore(rate, burst, idle_ttl, max_clients) if rate > 0 else None
+
+    @staticmethod
+    def client_key(request: Request) -> str:
+        user_id = request.headers.get("X-User-Id")
+        if user_id:
+            return f"user:{user_id}"
+        return f"ip:{request.client.host if request.client else 'unknown'}"
+
+    def _gates_for(self, path: str) -> List[ConcurrencyGate]:
+        gate = self.route_gates.match(path)
+        return [self.global_gate] if gate is None else [self.global_gate, gate]
+
+    async def dispatch(
+        self, request: Request, call_next: Callable[[Request], Awaitable[Response]]
+    ) -> Response:
+        if self.buckets is not None:
+            retry_after = self.buckets.consume(self.client_key(request))
+            if retry_after > 0:
+                metrics.inc("admission.rejected.rate_limited")
+                return _reject(429, "Too Many Requests", retry_after)
+
+        start = time.perf_counter()
+        acquired: List[ConcurrencyGate] = []
+        for gate in self._gates_for(request.url.path):
+            remaining = self.queue_timeout - (time.perf_counter() - start)
+            if not await gate.acquire(remaining):
+                for held in acquired:
+                    held.release()
+                metrics.inc("admission.rejected.capacity")
+                return _reject(503, "Service Unavailable", self.queue_timeout)
+            acquired.append(gate)
+        metrics.observe("admission.queue_wait_ms", (time.perf_counter() - start) * 1000)
+        metrics.inc("admission.admitted")
+
+        try:
+            return await call_next(request)
+        finally:
+            for gate in acquired:
+                gate.release()
+
+
+def _reject(status_code: int, detail: str, retry_after: float) -> Response:
+    return JSONResponse(
+        {"detail": detail},
+        status_code=status_code,
+        headers={"Retry-After": str(max(1, ceil(retry_after)))},
+    )
@@ -0,0 +1,108 @@
+"""
+FastAPI middleware serving repeated GET requests from an in-memory response cache.
+
+Only GET requests under a path prefix with a configured TTL are cached, and only
+200 responses without cookies or `Cache-Control: no-store`. Entries are keyed by
+path, query string and the configured vary headers, and tagged with the first
+path segment (e.g. `users`), which services invalidate after mutations.
+
+Every cacheable response carries an `X-Cache: HIT` or `X-Cache: MISS` header.
+This middleware sits inside `LoggingMiddleware`, so hits are still logged and
+the log entry records the cache status. Cached ETags are honoured: a hit whose
+ETag matches If-None-Match is answered with 304 Not Modified.
+"""
+
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp
+
+import app.core.config as config
+from app.core.config import PrefixRules
+from app.core.cache.store import CachedResponse, ResponseCache, response_cache
+from app.core.etags import if_none_match_matches
+from app.core.metrics.registry import metrics
+from app.core.responses import buffer_response, stored_response
+
+CACHE_STATUS_HEADER = "X-Cache"
+
+
+def cache_tag(path: str) -> str:
+    """Return the invalidation tag for a request path: its first segment."""
+    return path.strip("/").split("/", 1)[0]
+
+
+class ResponseCacheMiddleware(BaseHTTPMiddleware):
+    """
+    Middleware that caches encoded GET responses.
+
+    Args:
+        app (ASGIApp): The wrapped application.
+        cache (Optional[ResponseCache]): Store to use; defaults to the shared `response_cache`.
+        ttls (Optional[Dict[str, float]]): TTL in seconds per path prefix.
+        vary (Optional[Tuple[str, ...]]): Request headers that are part of the cache key.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        cache: Optional[ResponseCache] = None,
+        ttls: Optional[Dict[str, float]] = None,
+        vary: Optional[Tuple[str, ...]] = None,
+    ) -> None:
+        super().__init__(app)
+        self.cache = response_cache if cache is None else cache
+        self.ttls = PrefixRules(config.RESPONSE_CACHE_TTLS if ttls is None else ttls)
+        self.vary = config.RESPONSE_CACHE_VARY if vary is None else vary
+
+    def _key(self, request: Request) -> str:
+        varied = "|".join(request.headers.get(name, "") for name in self.vary)
+        return f"{request.url.path}?{request.url.query}|{varied}"
+
+    async def dispatch(
+        self, request: Request, call_next: Callable[[Request], Awaitable[Response]]
+    ) -> Response:
+        ttl = self.ttls.match(request.url.path) if request.method == "GET" else None
+        if not ttl:
+            return await call_next(request)
+
+        key = self._key(request)
+        bypass = "no-cache" in request.headers.get("cache-control", "")
+        entry = None if bypass else self.cache.get(key)
+        if entry is not None:
+            metrics.inc("cache.hits")
+            return _replay(entry, request.headers.get("if-none-match"))
+
+        metrics.inc("cache.misses")
+        tag = cache_tag(request.url.path)
+        generation = self.cache.generation(tag)
+        response = await call_next(request)
+        if (
+            response.status_code != 200
+            or "set-cookie" in response.headers
+            or "no-store" in response.headers.get("cache-control", "")
+        ):
+            return response
+
+        response = await buffer_response(response)
+        entry = CachedResponse(
+            response.status_code,
+            response.headers.items(),
+            response.body,
+            tag,
+            time.monotonic() + ttl,
+        )
+        self.cache.set(key, entry, generation)
+        response.headers[CACHE_STATUS_HEADER] = "MISS"
+        return response
+
+
+def _replay(entry: CachedResponse, if_none_match: Optional[str]) -> Response:
+    etag = entry.header("etag")
+    if etag is not None and if_none_match_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag, CACHE_STATUS_HEADER: "HIT"})
+    headers: List[Tuple[str, str]] = [*entry.headers, (CACHE_STATUS_HEADER.lower(), "HIT")]
+    return stored_response(entry.status_code, headers, entry.body)
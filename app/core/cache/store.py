@@ -0,0 +1,136 @@
+"""
+In-memory store for encoded HTTP responses.
+
+Entries are evicted least-recently-used first once the store exceeds its memory
+budget, expire after their TTL, and can be invalidated in bulk by tag. Each tag
+also carries a generation counter: a response computed while a mutation
+invalidated its tag is not stored, so a slow read racing a write cannot put
+stale data back into the cache.
+
+The store is per process; under the multi-worker launcher each worker keeps its
+own copy, and invalidations only reach the worker that handled the mutation.
+Other workers serve their copy until its TTL expires.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
+
+import app.core.config as config
+
+# Rough per-entry bookkeeping overhead, so many tiny entries still count against the budget.
+_ENTRY_OVERHEAD = 256
+
+
+class CachedResponse:
+    """
+    An encoded response held in the cache.
+
+    Attributes:
+        status_code (int): HTTP status code.
+        headers (List[Tuple[str, str]]): Response headers.
+        body (bytes): Encoded response body.
+        tag (str): Invalidation tag.
+        expires_at (float): Monotonic time after which the entry is stale.
+        size (int): Approximate memory footprint in bytes.
+    """
+
+    __slots__ = ("status_code", "headers", "body", "tag", "expires_at", "size")
+
+    def __init__(
+        self,
+        status_code: int,
+        headers: List[Tuple[str, str]],
+        body: bytes,
+        tag: str,
+        expires_at: float,
+    ):
+        self.status_code = status_code
+        self.headers = headers
+        self.body = body
+        self.tag = tag
+        self.expires_at = expires_at
+        self.size = (
+            len(body) + sum(len(name) + len(value) for name, value in headers) + _ENTRY_OVERHEAD
+        )
+
+    def header(self, name: str) -> Optional[str]:
+        for key, value in self.headers:
+            if key == name:
+                return value
+        return None
+
+
+class ResponseCache:
+    """
+    LRU response store with a memory budget, TTLs and tag-based invalidation.
+
+    Args:
+        max_bytes (int): Memory budget for all entries.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._tag_keys: Dict[str, Set[str]] = {}
+        self._generations: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str, now: Optional[float] = None) -> Optional[CachedResponse]:
+        """Return the live entry for `key`, marking it most recently used."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= (time.monotonic() if now is None else now):
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def generation(self, tag: str) -> int:
+        """Return the invalidation generation of `tag`, to be passed back to `set`."""
+        return self._generations.get(tag, 0)
+
+    def set(self, key: str, entry: CachedResponse, generation: int) -> bool:
+        """
+        Store `entry` unless its tag was invalidated since `generation` was read.
+
+        Returns:
+            bool: True if the entry was stored.
+        """
+        if entry.size > self.max_bytes or self.generation(entry.tag) != generation:
+            return False
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = entry
+        self._tag_keys.setdefault(entry.tag, set()).add(key)
+        self.size += entry.size
+        while self.size > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+        return True
+
+    def invalidate_tag(self, tag: str) -> None:
+        """Drop every entry stored under `tag` and reject in-flight responses for it."""
+        self._generations[tag] = self.generation(tag) + 1
+        for key in self._tag_keys.pop(tag, set()):
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self.size -= entry.size
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._tag_keys.clear()
+        self.size = 0
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self.size -= entry.size
+        keys = self._tag_keys.get(entry.tag)
+        if keys is not None:
+            keys.discard(key)
+
+
+response_cache = ResponseCache(config.RESPONSE_CACHE_MAX_BYTES)
@@ -0,0 +1,60 @@
+"""
+SQLAlchemy model for the change log, an append-only feed of entity mutations.
+
+DAOs that opt in (see `BaseDAO.change_entity`) append one entry per created,
+updated or deleted row in the same transaction as the change itself. Entries are
+numbered by `seq`, which only ever grows: SQLite serializes write transactions, so
+entries become visible in `seq` order and a reader that has seen `seq` N will never
+later find a committed entry below N.
+
+Tables:
+    - change_log: One row per change, with a snapshot of the row after the change;
+      deletes are recorded as tombstones without a snapshot.
+"""
+
+from datetime import datetime
+from enum import Enum
+from typing import Any, Dict, Optional
+from sqlalchemy import JSON, DateTime, Index, String
+from sqlalchemy.orm import Mapped, mapped_column
+from app.core.database import Base
+from app.core.logging.models import eastern_now
+
+
+class ChangeOperation(str, Enum):
+    """Kinds of change recorded in the change log."""
+
+    CREATE = "create"
+    UPDATE = "update"
+    DELETE = "delete"
+
+
+class ChangeLogModel(Base):
+    """
+    ORM model for one entry of the change log.
+
+    Attributes:
+        seq (int): Monotonic sequence number; AUTOINCREMENT keeps it from being reused.
+        entity (str): Name of the changed entity type, e.g. 'users'.
+        entity_id (int): Primary key of the changed row.
+        operation (str): 'create', 'update' or 'delete'.
+        version (Optional[int]): Row version after the change, or the last version for
+            deletes; None for models without a version column.
+        data (Optional[Dict[str, Any]]): Column values after the change, excluding the
+            version; None for delete tombstones.
+        created_at (datetime): When the change was recorded.
+    """
+
+    __tablename__ = "change_log"
+    __table_args__ = (
+        Index("ix_change_log_entity_seq", "entity", "seq"),
+        {"sqlite_autoincrement": True},
+    )
+
+    seq: Mapped[int] = mapped_column(primary_key=True)
+    entity: Mapped[str] = mapped_column(String(64))
+    entity_id: Mapped[int]
+    operation: Mapped[str] = mapped_column(String(8))
+    version: Mapped[Optional[int]]
+    data: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSON)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=eastern_now)
@@ -0,0 +1,67 @@
+"""
+In-process notifications of new change log entries, for long-polling readers.
+
+A reader subscribes before it queries the change log and then waits on its
+subscription, so a change committed between the query and the wait is not missed.
+Notifications only reach readers in the process that made the change; under the
+multi-worker launcher, readers in other workers should also re-query on an
+interval.
+"""
+
+import asyncio
+from typing import Dict, Set
+
+
+class ChangeNotifier:
+    """Wakes readers waiting for changes to an entity type."""
+
+    def __init__(self) -> None:
+        self._waiters: Dict[str, Set["asyncio.Future[None]"]] = {}
+
+    def subscribe(self, entity: str) -> "asyncio.Future[None]":
+        """
+        Register interest in the next change to `entity`.
+
+        Returns:
+            asyncio.Future[None]: Resolved by the next `notify(entity)`. Pass it to
+            `wait` or `unsubscribe`.
+        """
+        future: "asyncio.Future[None]" = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(entity, set()).add(future)
+        return future
+
+    def unsubscribe(self, entity: str, future: "asyncio.Future[None]") -> None:
+        waiters = self._waiters.get(entity)
+        if waiters is not None:
+            waiters.discard(future)
+            if not waiters:
+                del self._waiters[entity]
+        future.cancel()
+
+    def notify(self, entity: str) -> None:
+        """Wake every reader subscribed to `entity`. Safe to call from any thread."""
+        for future in self._waiters.pop(entity, ()):
+            future.get_loop().call_soon_threadsafe(_resolve, future)
+
+    async def wait(self, entity: str, future: "asyncio.Future[None]", timeout: float) -> bool:
+        """
+        Wait until the subscription is notified or `timeout` seconds pass, then unsubscribe.
+
+        Returns:
+            bool: True if a change was notified.
+        """
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self.unsubscribe(entity, future)
+
+
+def _resolve(future: "asyncio.Future[None]") -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+change_notifier = ChangeNotifier()
@@ -0,0 +1,103 @@
+"""
+Content-coding negotiation and incremental compressors for HTTP responses.
+"""
+
+import time
+import zlib
+from typing import Dict, Optional
+
+# Codings we can produce, in order of preference when the client weighs them equally.
+SUPPORTED_ENCODINGS = ("gzip", "deflate")
+
+# zlib window bits selecting the container format of each coding.
+_WBITS = {"gzip": 31, "deflate": 15}
+
+_COMPRESSIBLE_PREFIXES = ("text/",)
+_COMPRESSIBLE_TYPES = {"application/json", "application/javascript", "application/xml"}
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    Pick the content-coding to use from an Accept-Encoding header.
+
+    Codings listed with `q=0` are refused, and `*` covers any coding not listed.
+
+    Args:
+        accept_encoding (Optional[str]): The request's Accept-Encoding header.
+
+    Returns:
+        Optional[str]: 'gzip' or 'deflate', or None to send the body unencoded.
+    """
+    if not accept_encoding:
+        return None
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        weight = 1.0
+        name, _, value = params.strip().partition("=")
+        if name.strip().lower() == "q":
+            try:
+                weight = float(value)
+            except ValueError:
+                weight = 0.0
+        weights[coding.strip().lower()] = weight
+    wildcard = weights.get("*", 0.0)
+    best, best_weight = None, 0.0
+    for coding in SUPPORTED_ENCODINGS:
+        weight = weights.get(coding, wildcard)
+        if weight > best_weight:
+            best, best_weight = coding, weight
+    return best
+
+
+def is_compressible(content_type: Optional[str]) -> bool:
+    """Return True for textual media types worth compressing."""
+    media_type = (content_type or "").split(";", 1)[0].strip().lower()
+    return (
+        media_type.startswith(_COMPRESSIBLE_PREFIXES)
+        or media_type in _COMPRESSIBLE_TYPES
+        or media_type.endswith(("+json", "+xml"))
+    )
+
+
+class StreamCompressor:
+    """
+    Compresses a response body chunk by chunk.
+
+    Every chunk is sync-flushed, so each input chunk yields output the client can
+    decode immediately; nothing is held back waiting for more input.
+
+    Not thread-safe, but calls may be made from different threads one at a time.
+
+    Args:
+        encoding (str): 'gzip' or 'deflate'.
+        level (int): zlib compression level, 1 (fastest) to 9 (smallest).
+
+    Attributes:
+        bytes_in (int): Uncompressed bytes consumed so far.
+        bytes_out (int): Compressed bytes produced so far.
+        cpu_seconds (float): Thread CPU time spent compressing so far.
+    """
+
+    def __init__(self, encoding: str, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, _WBITS[encoding])
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.cpu_seconds = 0.0
+
+    def _measure(self, started: float, data: bytes, output: bytes) -> bytes:
+        self.cpu_seconds += time.thread_time() - started
+        self.bytes_in += len(data)
+        self.bytes_out += len(output)
+        return output
+
+    def compress(self, data: bytes) -> bytes:
+        """Compress `data` and flush it to a decodable boundary."""
+        started = time.thread_time()
+        output = self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+        return self._measure(started, data, output)
+
+    def finish(self) -> bytes:
+        """Return the end of the compressed stream."""
+        started = time.thread_time()
+        return self._measure(started, b"", self._compressor.flush(zlib.Z_FINISH))
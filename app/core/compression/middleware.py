@@ -0,0 +1,171 @@
+"""
+FastAPI middleware compressing responses according to the request's Accept-Encoding.
+
+Bodies are compressed chunk by chunk as the application produces them, so
+streaming responses are never buffered; only up to `min_size` bytes are held
+back to decide whether a body without Content-Length is worth compressing.
+Chunks of at least `thread_threshold` bytes are compressed in a worker thread
+(zlib releases the GIL), keeping the event loop free for other requests.
+
+This middleware sits outside `LoggingMiddleware`, so logged response bodies are
+the uncompressed text. A strong ETag must differ between content-codings, so the
+ETag of a compressed response gets the coding as a suffix (`"abc"` becomes
+`"abc-gzip"`). The suffixes are stripped from If-None-Match and If-Match before
+the request reaches the application, which only knows the unencoded ETags, and
+a 304 answering a suffixed tag gets the suffix back. Responses also carry
+`Vary: Accept-Encoding` so caches keep each coding apart.
+
+Bytes in and out are counted in the metrics registry under `compression.*`,
+along with per-response compression ratio and CPU time.
+"""
+
+from typing import AsyncIterator, Awaitable, Callable, List, Optional
+
+import anyio
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp
+
+import app.core.config as config
+from app.core.compression.codecs import (
+    SUPPORTED_ENCODINGS,
+    StreamCompressor,
+    is_compressible,
+    negotiate_encoding,
+)
+from app.core.etags import add_coding_suffix, strip_coding_suffixes
+from app.core.metrics.registry import metrics
+
+_CONDITIONAL_HEADERS = (b"if-none-match", b"if-match")
+
+
+class CompressionMiddleware(BaseHTTPMiddleware):
+    """
+    Middleware that gzip- or deflate-encodes textual responses.
+
+    Args:
+        app (ASGIApp): The wrapped application.
+        min_size (int): Bodies smaller than this many bytes are sent uncompressed.
+        level (int): zlib compression level.
+        thread_threshold (int): Chunks of at least this many bytes are compressed
+            off the event loop.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        min_size: int = config.COMPRESSION_MIN_SIZE,
+        level: int = config.COMPRESSION_LEVEL,
+        thread_threshold: int = config.COMPRESSION_THREAD_THRESHOLD,
+    ) -> None:
+        super().__init__(app)
+        self.min_size = min_size
+        self.level = level
+        self.thread_threshold = thread_threshold
+
+    async def dispatch(
+        self, request: Request, call_next: Callable[[Request], Awaitable[Response]]
+    ) -> Response:
+        encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+        validated_coding = _strip_conditional_suffixes(request)
+        response = await call_next(request)
+        if response.status_code == 304:
+            if validated_coding is not None and validated_coding == encoding:
+                _suffix_etag(response, encoding)
+            return response
+        if encoding is None or request.method == "HEAD" or not self._compressible(response):
+            return response
+
+        content_length = response.headers.get("content-length")
+        if content_length is not None and int(content_length) < self.min_size:
+            metrics.inc("compression.skipped.small")
+            return response
+
+        body = response.body_iterator  # type: ignore[attr-defined]
+        head: List[bytes] = []
+        size = 0
+        async for chunk in body:
+            head.append(chunk)
+            size += len(chunk)
+            if size >= self.min_size:
+                break
+        else:
+            # The whole body arrived below the threshold: send it as is.
+            response.body_iterator = _replay(head, None)  # type: ignore[attr-defined]
+            metrics.inc("compression.skipped.small")
+            return response
+
+        del response.headers["content-length"]
+        response.headers["content-encoding"] = encoding
+        response.headers.add_vary_header("Accept-Encoding")
+        _suffix_etag(response, encoding)
+        response.body_iterator = self._compress(  # type: ignore[attr-defined]
+            _replay(head, body), StreamCompressor(encoding, self.level)
+        )
+        return response
+
+    @staticmethod
+    def _compressible(response: Response) -> bool:
+        return (
+            response.status_code >= 200
+            and response.status_code not in (204, 206, 304)
+            and "content-encoding" not in response.headers
+            and is_compressible(response.headers.get("content-type"))
+        )
+
+    async def _compress(
+        self, chunks: AsyncIterator[bytes], compressor: StreamCompressor
+    ) -> AsyncIterator[bytes]:
+        async for chunk in chunks:
+            if not chunk:
+                continue
+            if len(chunk) >= self.thread_threshold:
+                output = await anyio.to_thread.run_sync(compressor.compress, chunk)
+                metrics.inc("compression.offloaded_chunks")
+            else:
+                output = compressor.compress(chunk)
+            if output:
+                yield output
+        yield compressor.finish()
+
+        metrics.inc("compression.responses")
+        metrics.inc("compression.bytes_in", compressor.bytes_in)
+        metrics.inc("compression.bytes_out", compressor.bytes_out)
+        if compressor.bytes_in:
+            metrics.observe("compression.ratio", compressor.bytes_out / compressor.bytes_in)
+        metrics.observe("compression.cpu_ms", compressor.cpu_seconds * 1000)
+
+
+def _strip_conditional_suffixes(request: Request) -> Optional[str]:
+    """
+    Remove coding suffixes from the request's conditional headers, in place.
+
+    Returns:
+        Optional[str]: The coding whose suffix was found, if any.
+    """
+    found = None
+    headers = []
+    for name, value in request.scope["headers"]:
+        if name in _CONDITIONAL_HEADERS:
+            stripped, coding = strip_coding_suffixes(value.decode("latin-1"), SUPPORTED_ENCODINGS)
+            if coding is not None:
+                value, found = stripped.encode("latin-1"), coding
+        headers.append((name, value))
+    if found is not None:
+        request.scope["headers"] = headers
+    return found
+
+
+def _suffix_etag(response: Response, encoding: str) -> None:
+    etag = response.headers.get("etag")
+    if etag is not None:
+        response.headers["etag"] = add_coding_suffix(etag, encoding)
+
+
+async def _replay(head: List[bytes], rest: Optional[AsyncIterator[bytes]]) -> AsyncIterator[bytes]:
+    for chunk in head:
+        yield chunk
+    if rest is not None:
+        async for chunk in rest:
+            yield chunk
@@ -3,6 +3,167 @@ Configuration settings for the application.
 """
 
 import os
+from typing import Dict, Generic, List, Mapping, Optional, Tuple, TypeVar
+
+V = TypeVar("V")
+
+
+def _env_bool(name: str, default: str) -> bool:
+    return os.getenv(name, default).lower() in ("true", "1", "t")
+
+
+def _env_prefix_map(name: str, default: str) -> Dict[str, float]:
+    """Parse a `"/prefix=value,/other=value"` variable into a path-prefix mapping."""
+    mapping: Dict[str, float] = {}
+    for item in os.getenv(name, default).split(","):
+        if "=" in item:
+            prefix, value = item.split("=", 1)
+            mapping[prefix.strip()] = float(value)
+    return mapping
+
+
+class PrefixRules(Generic[V]):
+    """
+    Values per path prefix, such as a `_env_prefix_map` setting, looked up by path.
+
+    A prefix matches whole path segments: `/users` matches `/users` and `/users/1`
+    but not `/users-export`. When several prefixes match, the longest one wins.
+
+    Args:
+        rules (Mapping[str, V]): Value per path prefix.
+    """
+
+    def __init__(self, rules: Mapping[str, V]):
+        # Longest prefixes first, so the most specific rule wins.
+        self.rules: List[Tuple[str, V]] = sorted(
+            ((prefix.rstrip("/"), value) for prefix, value in rules.items()),
+            key=lambda item: -len(item[0]),
+        )
+
+    def match(self, path: str) -> Optional[V]:
+        """Return the value of the longest prefix matching `path`, or None."""
+        for prefix, value in self.rules:
+            if path == prefix or path.startswith(prefix + "/"):
+                return value
+        return None
+
 
 SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./test.db")
-TESTING = os.getenv("TESTING", "False").lower() in ("true", "1", "t")
+TESTING = _env_bool("TESTING", "False")
+
+# Log every SQL statement; turned off by the benchmark suite.
+SQL_ECHO = _env_bool("SQL_ECHO", "True")
+
+# Record every request in the API log (see app/core/logging).
+REQUEST_LOGGING_ENABLED = _env_bool("REQUEST_LOGGING_ENABLED", "True")
+
+# Connection pool for file-backed databases, and how many of its connections
+# to open during startup so the first requests do not pay for them.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_POOL_WARMUP = int(os.getenv("DB_POOL_WARMUP", "2"))
+
+# Skip `create_all` on startup when the stored schema fingerprint is unchanged.
+SCHEMA_FINGERPRINT_CHECK = _env_bool("SCHEMA_FINGERPRINT_CHECK", "True")
+
+# SQLite journal mode for file databases; WAL lets readers run alongside the writer.
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+
+# Hash-sharded user storage: comma-separated database URLs, one per shard; empty
+# keeps users in the main database. Only append or remove URLs at the end, and
+# run `python -m app.core.sharding.rebalance` (offline) whenever the list changes.
+# In sharded mode the change feed holds changes back for the settle time, so a
+# slower commit on one shard cannot be skipped by readers of another.
+SHARD_URLS = [url.strip() for url in os.getenv("SHARD_URLS", "").split(",") if url.strip()]
+SHARD_CHANGE_SETTLE_MS = float(os.getenv("SHARD_CHANGE_SETTLE_MS", "500"))
+
+# Production launcher (`serve.py`).
+SERVER_HOST = os.getenv("HOST", "0.0.0.0")
+SERVER_PORT = int(os.getenv("PORT", "8000"))
+WORKERS = int(os.getenv("WEB_CONCURRENCY", str(os.cpu_count() or 1)))
+GRACEFUL_SHUTDOWN_TIMEOUT = float(os.getenv("GRACEFUL_SHUTDOWN_TIMEOUT", "30"))
+
+# Queue between the workers and the dedicated log writer process.
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+LOG_WRITER_BATCH_SIZE = int(os.getenv("LOG_WRITER_BATCH_SIZE", "500"))
+
+# Admission control: caps on concurrently handled requests, globally and per
+# path prefix, and how long a request may wait for a slot before a 503. Off by
+# default; size the caps for the deployment before turning it on. Long-polling
+# change feed requests get their own cap, so idle waits never use up the /users slots.
+ADMISSION_ENABLED = _env_bool("ADMISSION_ENABLED", "False")
+ADMISSION_MAX_IN_FLIGHT = int(os.getenv("ADMISSION_MAX_IN_FLIGHT", "256"))
+ADMISSION_ROUTE_LIMITS = _env_prefix_map(
+    "ADMISSION_ROUTE_LIMITS", "/users/changes=64,/users=128,/admin=16"
+)
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "0.1"))
+
+# Per-client token buckets keyed on X-User-Id or client IP; a rate of 0 (the
+# default) disables them. Behind a reverse proxy every client shares the proxy's
+# IP, so only set a rate when clients send X-User-Id.
+RATE_LIMIT_PER_SECOND = float(os.getenv("RATE_LIMIT_PER_SECOND", "0"))
+RATE_LIMIT_BURST = float(os.getenv("RATE_LIMIT_BURST", "100"))
+RATE_LIMIT_IDLE_SECONDS = float(os.getenv("RATE_LIMIT_IDLE_SECONDS", "300"))
+RATE_LIMIT_MAX_CLIENTS = int(os.getenv("RATE_LIMIT_MAX_CLIENTS", "100000"))
+
+# Serialize read-only user responses straight from row mappings to JSON bytes,
+# skipping ORM hydration and response-model validation.
+FAST_JSON_RESPONSES = _env_bool("FAST_JSON_RESPONSES", "False")
+
+# User searches matching at most this many rows are ranked by bm25; broader
+# searches, whose full ranking would cost a scan of the match list, are ordered by id.
+SEARCH_MAX_RANKED = int(os.getenv("SEARCH_MAX_RANKED", "1000"))
+
+# Bulk user imports: rows validated and upserted per transaction, number of row
+# errors kept per job, and where uploads are spooled (system temp dir if unset).
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "500"))
+IMPORT_MAX_ERRORS = int(os.getenv("IMPORT_MAX_ERRORS", "100"))
+IMPORT_UPLOAD_DIR = os.getenv("IMPORT_UPLOAD_DIR") or None
+
+# Change feeds: longest long-poll wait a client may request, and how often a waiting
+# request re-reads the change log for changes made by other worker processes.
+CHANGES_MAX_WAIT = float(os.getenv("CHANGES_MAX_WAIT", "30"))
+CHANGES_POLL_INTERVAL = float(os.getenv("CHANGES_POLL_INTERVAL", "1"))
+
+# Response compression: bodies smaller than the minimum size are sent as is, and
+# chunks at least the thread threshold in size are compressed in a worker thread.
+COMPRESSION_ENABLED = _env_bool("COMPRESSION_ENABLED", "True")
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_LEVEL = int(os.getenv("COMPRESSION_LEVEL", "6"))
+COMPRESSION_THREAD_THRESHOLD = int(os.getenv("COMPRESSION_THREAD_THRESHOLD", str(64 * 1024)))
+
+# Idempotency keys: POST/PUT/PATCH/DELETE requests under a path prefix with a TTL
+# (seconds) that send an `Idempotency-Key` header run once per client and key;
+# retries within the TTL are answered with the stored response. Keys are kept in
+# the main database; a key whose request never finishes is freed after the lease.
+IDEMPOTENCY_ENABLED = _env_bool("IDEMPOTENCY_ENABLED", "True")
+IDEMPOTENCY_TTLS = _env_prefix_map("IDEMPOTENCY_TTLS", "/users=86400")
+IDEMPOTENCY_LEASE_SECONDS = float(os.getenv("IDEMPOTENCY_LEASE_SECONDS", "60"))
+
+# Per-request profiling. When disabled the middleware is not installed at all.
+# A request is profiled if it sends `X-Profile: <PROFILING_TOKEN>` (ignored when
+# no token is set) or is picked by its path prefix's sample rate (0.0 to 1.0).
+PROFILING_ENABLED = _env_bool("PROFILING_ENABLED", "False")
+PROFILING_TOKEN = os.getenv("PROFILING_TOKEN") or None
+PROFILING_SAMPLE_RATES = _env_prefix_map("PROFILING_SAMPLE_RATES", "")
+PROFILING_INTERVAL_MS = float(os.getenv("PROFILING_INTERVAL_MS", "2"))
+PROFILING_MAX_CONCURRENT = int(os.getenv("PROFILING_MAX_CONCURRENT", "4"))
+
+# Event-loop monitor: a heartbeat every interval measures how late the loop runs
+# it; stalls longer than the slow threshold are kept with the loop thread's stack
+# and the request in flight (see `/admin/loop`). When disabled neither the
+# heartbeat, the watchdog thread nor the middleware is started.
+LOOP_MONITOR_ENABLED = _env_bool("LOOP_MONITOR_ENABLED", "False")
+LOOP_MONITOR_INTERVAL_MS = float(os.getenv("LOOP_MONITOR_INTERVAL_MS", "10"))
+LOOP_MONITOR_SLOW_MS = float(os.getenv("LOOP_MONITOR_SLOW_MS", "100"))
+LOOP_MONITOR_MAX_EVENTS = int(os.getenv("LOOP_MONITOR_MAX_EVENTS", "50"))
+
+# In-memory cache of encoded GET responses. TTLs (seconds) are per path prefix;
+# paths without a TTL are never cached. Mutations invalidate entries by tag.
+RESPONSE_CACHE_ENABLED = _env_bool("RESPONSE_CACHE_ENABLED", "False")
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+RESPONSE_CACHE_TTLS = _env_prefix_map("RESPONSE_CACHE_TTLS", "/users=30")
+RESPONSE_CACHE_VARY: Tuple[str, ...] = tuple(
+    header.strip().lower()
+    for header in os.getenv("RESPONSE_CACHE_VARY", "accept,accept-encoding").split(",")
+    if header.strip()
+)
@@ -2,18 +2,49 @@
 Base Data Access Object (DAO) for performing async CRUD operations on SQLAlchemy models.
 
 This module defines a generic, reusable DAO implementation intended to reduce
-boilerplate across FastAPI domain layers.
+boilerplate across FastAPI domain layers. DAOs that set `change_entity` also
+append every create, update and delete to the change log (`app.core.changes`).
+
+When the session is sharded (`app.core.sharding`) and the model's table has a
+shard key, new rows get IDs in the bucket of their shard key, lookups by ID go
+to one shard, and list queries run on every shard and merge the results in ID
+order.
 """
 
 # pylint: disable=invalid-name
 
-from typing import Generic, TypeVar, Type, Optional, List, Protocol, runtime_checkable
+import heapq
+from itertools import islice
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generic,
+    TypeVar,
+    Type,
+    Optional,
+    List,
+    Protocol,
+    Sequence,
+    Tuple,
+    runtime_checkable,
+)
 
 from pydantic import BaseModel
-from sqlalchemy import select
+from sqlalchemy import ColumnElement, Row, Select, Table, delete, insert, or_, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import class_mapper
 from sqlalchemy.orm.attributes import InstrumentedAttribute
 
+import app.core.config as config
+from app.core.changes.models import ChangeLogModel, ChangeOperation
+from app.core.changes.notifier import change_notifier
+from app.core.sharding.keys import bucket_for_id, bucket_for_key, change_seq_watermark
+from app.core.sharding.models import ShardKeyAliasModel
+from app.core.sharding.router import get_shard_router, shard_key
+
 
 @runtime_checkable
 class HasId(Protocol):
@@ -43,9 +74,42 @@ class BaseDAO(Generic[TModel, TCreateSchema, TUpdateSchema]):
         TUpdateSchema: The Pydantic schema used to update existing model instances.
     """
 
+    # Entity name under which create/update/delete are appended to the change log,
+    # in the same transaction as the change; None records nothing.
+    change_entity: Optional[str] = None
+
     def __init__(self, session: AsyncSession, model_class: Type[TModel]):
         self.session = session
         self.model_class = model_class
+        self.table: Table = model_class.__table__  # type: ignore[attr-defined]
+        # Set when the session is sharded and so is the model's table.
+        router = get_shard_router(session)
+        self.key_column = shard_key(self.table) if router is not None else None
+        self.router = router if self.key_column is not None else None
+
+    def _bind(self, object_id: int) -> Optional[Dict[str, Any]]:
+        """Bind arguments sending a statement about `object_id` to its shard, if sharded."""
+        if self.router is None:
+            return None
+        return {"shard_id": self.router.shard_for_id(object_id)}
+
+    async def _gather(
+        self, statement: Select[Any], key: Callable[[Row[Any]], Any], limit: int, offset: int = 0
+    ) -> List[Row[Any]]:
+        """
+        Run a query on every shard and merge the rows, for sharded sessions.
+
+        Each shard returns its first `offset + limit` rows, so `statement` must be
+        ordered by `key` for the merged page to be correct.
+        """
+        assert self.router is not None
+        per_shard = []
+        for shard_id in self.router.shard_ids:
+            result = await self.session.execute(
+                statement.limit(offset + limit), bind_arguments={"shard_id": shard_id}
+            )
+            per_shard.append(result.all())
+        return list(islice(heapq.merge(*per_shard, key=key), offset, offset + limit))
 
     async def get(self, object_id: int) -> Optional[TModel]:
         """
@@ -58,7 +122,8 @@ class BaseDAO(Generic[TModel, TCreateSchema, TUpdateSchema]):
             Optional[TModel]: The object instance if found, else None.
         """
         result = await self.session.execute(
-            select(self.model_class).where(self.model_class.id == object_id)
+            select(self.model_class).where(self.model_class.id == object_id),
+            bind_arguments=self._bind(object_id),
         )
         return result.scalar_one_or_none()
 
@@ -73,41 +138,476 @@ class BaseDAO(Generic[TModel, TCreateSchema, TUpdateSchema]):
         Returns:
             List[TModel]: A list of model instances.
         """
+        if self.router is not None:
+            statement = select(self.model_class).order_by(self.model_class.id)
+            rows = await self._gather(statement, lambda row: row[0].id, limit, offset)
+            return [row[0] for row in rows]
         result = await self.session.execute(select(self.model_class).offset(offset).limit(limit))
         return list(result.scalars().all())
 
+    def _columns(self, columns: Optional[Sequence[str]]) -> List[ColumnElement[Any]]:
+        mapper_columns = class_mapper(self.model_class).columns
+        if columns is None:
+            return list(mapper_columns)
+        return [mapper_columns[name] for name in columns]
+
+    async def get_row(
+        self, object_id: int, columns: Optional[Sequence[str]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Fetch a single row by primary key as a plain mapping, without building an ORM object.
+
+        Args:
+            object_id (int): The primary key of the object.
+            columns (Optional[Sequence[str]]): Attribute names to select, in output
+                order. Defaults to every mapped column.
+
+        Returns:
+            Optional[Dict[str, Any]]: The row if found, else None.
+        """
+        result = await self.session.execute(
+            select(*self._columns(columns)).where(self.model_class.id == object_id),
+            bind_arguments=self._bind(object_id),
+        )
+        row = result.mappings().one_or_none()
+        return dict(row) if row is not None else None
+
+    async def get_all_rows(
+        self, limit: int = 100, offset: int = 0, columns: Optional[Sequence[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Fetch rows as plain mappings for read-only use.
+
+        Selecting columns instead of entities skips ORM hydration and the session's
+        identity map, which dominates the cost of large read-only list queries.
+
+        Args:
+            limit (int): Maximum number of records to return.
+            offset (int): Number of records to skip before returning results.
+            columns (Optional[Sequence[str]]): Attribute names to select, in output
+                order. Defaults to every mapped column.
+
+        Returns:
+            List[Dict[str, Any]]: One mapping per row, keyed by attribute name.
+        """
+        selected = self._columns(columns)
+        if self.router is not None:
+            # The ID is selected last, as the merge key, and dropped from the output.
+            statement = select(*selected, self.model_class.id).order_by(self.model_class.id)
+            rows = await self._gather(statement, lambda row: row[-1], limit, offset)
+            return [dict(zip(row._fields, row[: len(selected)])) for row in rows]
+        result = await self.session.execute(select(*selected).offset(offset).limit(limit))
+        return [dict(row) for row in result.mappings()]
+
+    def _version_column(self) -> ColumnElement[Any]:
+        column = class_mapper(self.model_class).version_id_col
+        if column is None:
+            raise TypeError(f"{self.model_class.__name__} has no version_id_col")
+        return column
+
+    async def get_version(self, object_id: int) -> Optional[int]:
+        """
+        Fetch only the row version of an object, for cheap conditional requests.
+
+        Requires the model to declare a `version_id_col` mapper argument.
+
+        Args:
+            object_id (int): The primary key of the object.
+
+        Returns:
+            Optional[int]: The current version if the object exists, else None.
+        """
+        result = await self.session.execute(
+            select(self._version_column()).where(self.model_class.id == object_id),
+            bind_arguments=self._bind(object_id),
+        )
+        return result.scalar_one_or_none()
+
+    async def get_versions(self, limit: int = 100, offset: int = 0) -> List[Tuple[int, int]]:
+        """
+        Fetch `(id, version)` pairs for the page `get_all` would return.
+
+        Args:
+            limit (int): Maximum number of records to return.
+            offset (int): Number of records to skip before returning results.
+
+        Returns:
+            List[Tuple[int, int]]: The id and version of each object on the page.
+        """
+        statement = select(self.model_class.id, self._version_column())
+        if self.router is not None:
+            rows = await self._gather(
+                statement.order_by(self.model_class.id), lambda row: row[0], limit, offset
+            )
+        else:
+            rows = list((await self.session.execute(statement.offset(offset).limit(limit))).all())
+        return [(object_id, version) for object_id, version in rows]
+
+    async def _key_owner(self, key: str) -> Optional[int]:
+        """ID of the row aliased to shard key `key`, looked up on the key's shard."""
+        assert self.router is not None
+        # A Core query on the shard's connection skips ORM statement processing.
+        connection = await self.session.connection(
+            bind_arguments={"shard_id": self.router.shard_for_key(key)}
+        )
+        aliases = ShardKeyAliasModel.__table__.c
+        result = await connection.execute(
+            select(aliases.object_id).where(aliases.entity == self.table.name, aliases.key == key)
+        )
+        return result.scalar_one_or_none()
+
+    async def get_by_shard_key(self, key: str) -> Optional[TModel]:
+        """
+        Fetch an object by the value of its shard key column, for sharded tables.
+
+        Looks on the key's shard first, then follows the key's alias if the row was
+        created under another key.
+
+        Args:
+            key (str): The shard key value, e.g. an email address.
+
+        Returns:
+            Optional[TModel]: The object if found, else None.
+        """
+        assert self.router is not None and self.key_column is not None
+        result = await self.session.execute(
+            select(self.model_class).where(self.table.c[self.key_column] == key),
+            bind_arguments={"shard_id": self.router.shard_for_key(key)},
+        )
+        obj = result.scalar_one_or_none()
+        if obj is None:
+            owner = await self._key_owner(key)
+            obj = await self.get(owner) if owner is not None else None
+        return obj
+
+    def _duplicate_key(self) -> IntegrityError:
+        return IntegrityError(
+            None, None, Exception(f"UNIQUE constraint failed: {self.table.name}.{self.key_column}")
+        )
+
+    async def _claim_key(self, key: str, object_id: int) -> None:
+        """
+        Reserve shard key `key` for a row of a sharded table.
+
+        Unique indexes only see one shard, so uniqueness is enforced on the key's
+        shard: by the index, for rows stored there, and through an alias for a row
+        stored elsewhere, which also lets `get_by_shard_key` find that row.
+
+        Raises:
+            IntegrityError: If another row has the key.
+        """
+        assert self.router is not None and self.key_column is not None
+        if await self._key_owner(key) not in (None, object_id):
+            raise self._duplicate_key()
+        bucket = bucket_for_key(key)
+        if bucket == bucket_for_id(object_id):
+            return
+        shard = {"shard_id": self.router.shard_for_key(key)}
+        taken = await self.session.scalar(
+            select(self.model_class.id).where(self.table.c[self.key_column] == key),
+            bind_arguments=shard,
+        )
+        if taken is not None:
+            raise self._duplicate_key()
+        connection = await self.session.connection(bind_arguments=shard)
+        await connection.execute(
+            sqlite_insert(ShardKeyAliasModel).on_conflict_do_nothing(),
+            {"entity": self.table.name, "key": key, "object_id": object_id, "bucket": bucket},
+        )
+
+    async def _release_key(self, key: str, object_id: int) -> None:
+        """Drop the alias of shard key `key` to `object_id`, if it has one."""
+        assert self.router is not None
+        if bucket_for_key(key) == bucket_for_id(object_id):
+            return
+        connection = await self.session.connection(
+            bind_arguments={"shard_id": self.router.shard_for_key(key)}
+        )
+        await connection.execute(
+            delete(ShardKeyAliasModel).where(
+                ShardKeyAliasModel.entity == self.table.name,
+                ShardKeyAliasModel.key == key,
+                ShardKeyAliasModel.object_id == object_id,
+            )
+        )
+
+    def _change_log_entity(self) -> str:
+        if self.change_entity is None:
+            raise TypeError(f"{type(self).__name__} does not record changes")
+        return self.change_entity
+
+    def _change(
+        self, operation: ChangeOperation, values: Dict[str, Any], with_data: bool = True
+    ) -> Dict[str, Any]:
+        """Column values of a change log entry for a row's current column values."""
+        version = class_mapper(self.model_class).version_id_col
+        version_key = version.key if version is not None else None
+        data = {key: value for key, value in values.items() if key != version_key}
+        return {
+            "entity": self._change_log_entity(),
+            "entity_id": values["id"],
+            "operation": operation.value,
+            "version": values.get(version_key) if version_key is not None else None,
+            "data": data if with_data else None,
+        }
+
+    async def _insert_changes(
+        self, entries: List[Dict[str, Any]], shard_id: Optional[str] = None
+    ) -> None:
+        """Append change log entries in the session's transaction, on the rows' shard."""
+        if not entries:
+            return
+        bind = None
+        if self.router is not None and shard_id is not None:
+            bind = {"shard_id": shard_id}
+        connection = await self.session.connection(bind_arguments=bind)
+        if self.router is not None and bind is not None:
+            # Numbered when the shard commits; see `ShardRouter.reserve_change_seqs`.
+            seqs = self.router.reserve_change_seqs(connection, len(entries))
+            for entry, seq in zip(entries, seqs):
+                entry["seq"] = seq
+        await connection.execute(insert(ChangeLogModel), entries)
+
+    async def _record_change(
+        self, operation: ChangeOperation, obj: TModel, with_data: bool = True
+    ) -> None:
+        """Append a change log entry for `obj`, if this DAO records changes."""
+        if self.change_entity is None:
+            return
+        values = {
+            attr.key: getattr(obj, attr.key) for attr in class_mapper(self.model_class).column_attrs
+        }
+        entry = self._change(operation, values, with_data)
+        shard_id = self.router.shard_for_id(obj.id) if self.router is not None else None
+        await self._insert_changes([entry], shard_id)
+
+    async def get_changes(self, since: int = 0, limit: int = 100) -> List[ChangeLogModel]:
+        """
+        Fetch this DAO's change log entries after a sequence number, oldest first.
+
+        Sharded tables keep a change log per shard, numbered as each shard commits.
+        Entries newer than `SHARD_CHANGE_SETTLE_MS` are held back, as another shard
+        may be committing an entry with a slightly lower sequence number.
+
+        Args:
+            since (int): Only entries with a greater `seq` are returned.
+            limit (int): Maximum number of entries to return.
+
+        Returns:
+            List[ChangeLogModel]: The entries, in `seq` order.
+
+        Raises:
+            TypeError: If this DAO does not record changes.
+        """
+        statement = (
+            select(ChangeLogModel)
+            .where(ChangeLogModel.entity == self._change_log_entity(), ChangeLogModel.seq > since)
+            .order_by(ChangeLogModel.seq)
+        )
+        if self.router is not None:
+            watermark = change_seq_watermark(config.SHARD_CHANGE_SETTLE_MS / 1000)
+            statement = statement.where(ChangeLogModel.seq <= watermark)
+            return [row[0] for row in await self._gather(statement, lambda row: row[0].seq, limit)]
+        result = await self.session.execute(statement.limit(limit))
+        return list(result.scalars().all())
+
+    async def end_read(self) -> None:
+        """
+        End the session's read transaction and give its connection back to the pool.
+
+        Reads made afterwards start a new transaction and see changes committed since.
+        """
+        await self.session.rollback()
+
+    async def _commit(self, changed: bool = True) -> None:
+        """Commit, then wake change log readers if changes were recorded."""
+        await self.session.commit()
+        if changed and self.change_entity is not None:
+            change_notifier.notify(self.change_entity)
+
     async def create(self, schema: TCreateSchema) -> TModel:
         """
         Insert a new object using the provided Pydantic creation schema.
 
+        Objects of sharded tables get an ID in the bucket of their shard key.
+
         Args:
             schema (TCreateSchema): Validated creation data.
 
         Returns:
             TModel: The newly persisted object instance.
+
+        Raises:
+            IntegrityError: If the object violates a unique constraint.
         """
-        obj = self.model_class(**schema.model_dump())
+        values = schema.model_dump()
+        if self.router is not None and self.key_column is not None:
+            key = values[self.key_column]
+            # Allocating the ID takes the shard's write lock before the key is checked.
+            (values["id"],) = await self.router.allocate_ids(self.session, bucket_for_key(key), 1)
+            await self._claim_key(key, values["id"])
+        obj = self.model_class(**values)
         self.session.add(obj)
-        await self.session.commit()
+        if self.change_entity is not None:
+            await self.session.flush()
+            await self._record_change(ChangeOperation.CREATE, obj)
+        await self._commit()
         await self.session.refresh(obj)
         return obj
 
+    async def _route_rows(self, rows: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Assign IDs to rows of a sharded table and group them by shard.
+
+        A row whose shard key has an alias goes to the aliased row's shard with that
+        row's ID, so it updates it; every other row gets a new ID in its key's
+        bucket, which is only used if no row on that shard has the key yet.
+        """
+        assert self.router is not None and self.key_column is not None
+        key_column = self.key_column
+        by_home: Dict[str, List[Dict[str, Any]]] = {}
+        for row in rows:
+            by_home.setdefault(self.router.shard_for_key(row[key_column]), []).append(row)
+        batches: Dict[str, List[Dict[str, Any]]] = {}
+        for home, home_rows in by_home.items():
+            result = await self.session.execute(
+                select(ShardKeyAliasModel.key, ShardKeyAliasModel.object_id).where(
+                    ShardKeyAliasModel.entity == self.table.name,
+                    ShardKeyAliasModel.key.in_([row[key_column] for row in home_rows]),
+                ),
+                bind_arguments={"shard_id": home},
+            )
+            owners = {key: object_id for key, object_id in result.all()}
+            by_bucket: Dict[int, List[Dict[str, Any]]] = {}
+            for row in home_rows:
+                owner = owners.get(row[key_column])
+                if owner is None:
+                    by_bucket.setdefault(bucket_for_key(row[key_column]), []).append(row)
+                    continue
+                row["id"] = owner
+                batches.setdefault(self.router.shard_for_id(owner), []).append(row)
+            for bucket, bucket_rows in by_bucket.items():
+                ids = await self.router.allocate_ids(self.session, bucket, len(bucket_rows))
+                for row, object_id in zip(bucket_rows, ids):
+                    row["id"] = object_id
+                batches.setdefault(home, []).extend(bucket_rows)
+        return batches
+
+    async def _write_rows(
+        self, statement: Any, rows: List[Dict[str, Any]], shard_id: Optional[str] = None
+    ) -> int:
+        """Execute an upsert, recording the rows it wrote if this DAO records changes."""
+        bind = {"shard_id": shard_id} if shard_id is not None else None
+        connection = await self.session.connection(bind_arguments=bind)
+        if self.change_entity is None:
+            return (await connection.execute(statement, rows)).rowcount
+        version = class_mapper(self.model_class).version_id_col
+        version_key = version.key if version is not None else None
+        # RETURNING yields only the rows actually inserted or rewritten.
+        result = await connection.execute(statement.returning(*self.table.columns), rows)
+        entries = []
+        for written in result.mappings():
+            created = version_key is not None and written[version_key] == 1
+            operation = ChangeOperation.CREATE if created else ChangeOperation.UPDATE
+            entries.append(self._change(operation, dict(written)))
+        await self._insert_changes(entries, shard_id)
+        return len(entries)
+
+    async def upsert_many(
+        self, rows: Sequence[Dict[str, Any]], conflict_columns: Sequence[str]
+    ) -> int:
+        """
+        Insert rows in bulk, updating existing rows that collide on a unique key.
+
+        Existing rows are only rewritten when a value actually changes. For models
+        with a `version_id_col`, new rows start at version 1 and rewritten rows have
+        their version bumped, so ETags and optimistic concurrency keep working. If the
+        DAO records changes, each inserted or rewritten row is appended to the change
+        log as a create (version 1) or update. Everything is committed in a single
+        transaction. Uses SQLite's `INSERT ... ON CONFLICT DO UPDATE`.
+
+        Rows of sharded tables must collide on their shard key, and are written to
+        each shard in one statement per shard.
+
+        Args:
+            rows (Sequence[Dict[str, Any]]): Column values per row; every row must
+                have the same keys.
+            conflict_columns (Sequence[str]): Columns of the unique constraint that
+                identifies an existing row.
+
+        Returns:
+            int: The number of rows inserted or updated.
+        """
+        if not rows:
+            return 0
+        version = class_mapper(self.model_class).version_id_col
+        version_key = version.key if version is not None else None
+        values = [dict(row) for row in rows]
+        if version_key is not None:
+            for row in values:
+                row[version_key] = 1
+        table_columns = self.table.columns
+        statement = sqlite_insert(self.table)
+        updated = [
+            name
+            for name in values[0]
+            if name not in conflict_columns and name not in (version_key, "id")
+        ]
+        changes: Dict[str, Any] = {name: statement.excluded[name] for name in updated}
+        if version_key is not None:
+            changes[version_key] = table_columns[version_key] + 1
+        statement = statement.on_conflict_do_update(
+            index_elements=list(conflict_columns),
+            set_=changes,
+            where=or_(*(table_columns[name] != statement.excluded[name] for name in updated)),
+        )
+        # Passing the rows as parameters (rather than `.values(rows)`) lets SQLAlchemy
+        # cache the compiled statement and batch the rows into multi-row INSERTs.
+        if self.router is None:
+            written = await self._write_rows(statement, values)
+        else:
+            batches = await self._route_rows(values)
+            written = 0
+            for shard_id, batch in batches.items():
+                written += await self._write_rows(statement, batch, shard_id)
+        await self._commit(changed=written > 0)
+        return written
+
     async def update(self, object_id: int, schema: TUpdateSchema) -> Optional[TModel]:
         """
         Update an existing object using the provided update schema.
 
+        For models with a `version_id_col`, the version is bumped whenever a field
+        actually changes, and the UPDATE only applies if the row still has the
+        version that was read; otherwise `StaleDataError` is raised. Updates that
+        change nothing are not recorded in the change log. Objects of sharded tables
+        keep their ID, and so their shard, when their shard key changes.
+
         Args:
             object_id (int): The primary key of the object to update.
             schema (TUpdateSchema): Partial update data.
 
         Returns:
             Optional[TModel]: The updated object instance, or None if not found.
+
+        Raises:
+            IntegrityError: If the update violates a unique constraint.
         """
         obj = await self.get(object_id)
         if obj:
-            for field, value in schema.model_dump(exclude_unset=True).items():
+            data = schema.model_dump(exclude_unset=True)
+            if self.key_column is not None and self.key_column in data:
+                old_key = getattr(obj, self.key_column)
+                if data[self.key_column] != old_key:
+                    await self._claim_key(data[self.key_column], obj.id)
+                    await self._release_key(old_key, obj.id)
+            for field, value in data.items():
                 setattr(obj, field, value)
-            await self.session.commit()
+            changed = self.change_entity is not None and self.session.is_modified(obj)
+            if changed:
+                await self.session.flush()
+                await self._record_change(ChangeOperation.UPDATE, obj)
+            await self._commit(changed)
             await self.session.refresh(obj)
         return obj
 
@@ -115,6 +615,9 @@ class BaseDAO(Generic[TModel, TCreateSchema, TUpdateSchema]):
         """
         Delete an object by its primary key.
 
+        The change log records the deletion as a tombstone: the object's ID and last
+        version, without its data.
+
         Args:
             object_id (int): The primary key of the object to delete.
 
@@ -123,6 +626,9 @@ class BaseDAO(Generic[TModel, TCreateSchema, TUpdateSchema]):
         """
         obj = await self.get(object_id)
         if obj:
+            await self._record_change(ChangeOperation.DELETE, obj, with_data=False)
+            if self.key_column is not None:
+                await self._release_key(getattr(obj, self.key_column), obj.id)
             await self.session.delete(obj)
-            await self.session.commit()
+            await self._commit()
         return obj
@@ -5,20 +5,94 @@ This module sets up the async database connection, initializes the metadata,
 and provides a dependency for async DB sessions.
 """
 
-from typing import Annotated, AsyncGenerator
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+import asyncio
+import hashlib
+import logging
+from typing import Annotated, Any, AsyncGenerator, Dict, List, Optional, Sequence
+from sqlalchemy import (
+    Column,
+    Connection,
+    String,
+    delete,
+    event,
+    inspect,
+    insert,
+    literal,
+    select,
+    text,
+)
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    create_async_engine,
+    AsyncSession,
+    async_sessionmaker,
+)
 from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.schema import CreateColumn, CreateTable, Table
 from fastapi import Depends
 import app.core.config as config
 
+logger = logging.getLogger(__name__)
+
 # Use in-memory SQLite for test mode
 DATABASE_URL = "sqlite+aiosqlite:///:memory:" if config.TESTING else config.SQLALCHEMY_DATABASE_URL
 
-engine = create_async_engine(DATABASE_URL, echo=True)
+
+def _is_file_database(url: str) -> bool:
+    return make_url(url).database not in (None, "", ":memory:")
+
+
+def _engine_options(url: str) -> Dict[str, Any]:
+    """
+    Pool settings for the given URL. File-backed SQLite otherwise defaults to
+    NullPool, which opens a fresh connection (and aiosqlite thread) per session.
+
+    An in-memory database lives and dies with its one connection. SQLAlchemy's
+    default StaticPool hands that connection to every session at once, which fails
+    under concurrent requests; a one-connection queue pool makes sessions take turns.
+    """
+    if not _is_file_database(url):
+        return {"poolclass": AsyncAdaptedQueuePool, "pool_size": 1, "max_overflow": 0}
+    return {"poolclass": AsyncAdaptedQueuePool, "pool_size": config.DB_POOL_SIZE}
+
+
+def _set_journal_mode(dbapi_connection: Any, connection_record: Any) -> None:
+    # pylint: disable=unused-argument
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={config.SQLITE_JOURNAL_MODE}")
+    cursor.close()
+
+
+def create_database_engine(url: str) -> AsyncEngine:
+    """
+    Create an async engine with the pool and SQLite settings used for every database.
+
+    Args:
+        url (str): The database URL.
+
+    Returns:
+        AsyncEngine: The engine.
+    """
+    database_engine = create_async_engine(url, echo=config.SQL_ECHO, **_engine_options(url))
+    if _is_file_database(url) and config.SQLITE_JOURNAL_MODE:
+        event.listen(database_engine.sync_engine, "connect", _set_journal_mode)
+    return database_engine
+
+
+engine = create_database_engine(DATABASE_URL)
+
+
 AsyncSessionLocal = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 Base = declarative_base()
 
+# Single-row table holding the fingerprint of the schema last created by `init_db`.
+schema_fingerprint = Table(
+    "schema_fingerprint", Base.metadata, Column("fingerprint", String(64), primary_key=True)
+)
+
 
 async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
     """
@@ -32,13 +106,138 @@ async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
         await session.close()
 
 
-async def init_db() -> None:
+def compute_schema_fingerprint() -> str:
+    """
+    Hash the DDL of every table and index registered on `Base.metadata`, plus any
+    raw DDL a model attaches under `table.info["ddl"]` (e.g. full-text shadow tables).
+
+    Returns:
+        str: A hex digest that changes whenever a model's schema changes.
+    """
+    digest = hashlib.sha256()
+    for table in Base.metadata.sorted_tables:
+        if table is schema_fingerprint:
+            continue
+        digest.update(str(CreateTable(table).compile(dialect=engine.dialect)).encode())
+        for index in sorted(table.indexes, key=lambda index: str(index.name)):
+            columns = ",".join(column.name for column in index.columns)
+            digest.update(f"{index.name}({columns}) unique={index.unique}".encode())
+        for statement in table.info.get("ddl", ()):
+            digest.update(statement.encode())
+    return digest.hexdigest()
+
+
+def _stored_fingerprint(conn: Connection) -> Optional[str]:
+    if not inspect(conn).has_table(schema_fingerprint.name):
+        return None
+    return conn.execute(select(schema_fingerprint.c.fingerprint)).scalar()
+
+
+def _column_ddl(conn: Connection, column: Column) -> str:
+    """Column definition for `ALTER TABLE ... ADD COLUMN`, with a default for existing rows."""
+    ddl = str(CreateColumn(column).compile(dialect=conn.dialect))  # type: ignore[no-untyped-call]
+    if column.nullable or column.server_default is not None:
+        return ddl
+    default = column.default
+    if default is None or not getattr(default, "is_scalar", False):
+        raise RuntimeError(
+            f"Cannot add NOT NULL column {column.table.name}.{column.name} to the existing "
+            "table: it has no server_default or scalar default to fill existing rows. "
+            "Give it one, or migrate the database by hand."
+        )
+    value = literal(getattr(default, "arg")).compile(
+        dialect=conn.dialect, compile_kwargs={"literal_binds": True}
+    )
+    return f"{ddl} DEFAULT {value}"
+
+
+def add_missing_columns(conn: Connection, tables: Optional[Sequence[Table]] = None) -> List[str]:
+    """
+    Bring existing tables up to date with their models, which `create_all` never does.
+
+    Columns missing from an existing table are added with `ALTER TABLE ... ADD COLUMN`,
+    existing rows taking the column's default, and indexes missing from it are created.
+    Tables that do not exist yet are left to `create_all`.
+
+    Args:
+        conn (Connection): A connection in the transaction creating the schema.
+        tables (Optional[Sequence[Table]]): Tables to check; defaults to every table on
+            `Base.metadata`.
+
+    Returns:
+        List[str]: The added columns, as `table.column`.
+
+    Raises:
+        RuntimeError: If a missing column is NOT NULL and has no default for existing rows.
+    """
+    inspector = inspect(conn)
+    preparer = conn.dialect.identifier_preparer
+    added = []
+    for table in Base.metadata.sorted_tables if tables is None else tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing:
+                quoted = preparer.format_table(table)  # type: ignore[no-untyped-call]
+                conn.execute(text(f"ALTER TABLE {quoted} ADD COLUMN {_column_ddl(conn, column)}"))
+                added.append(f"{table.name}.{column.name}")
+        indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in indexes:
+                index.create(conn)
+    if added:
+        logger.warning("Added missing column(s) to existing tables: %s", ", ".join(added))
+    return added
+
+
+async def init_db() -> bool:
     """
     Initializes the database by creating all tables.
     This is meant for development/proof-of-concept only.
+
+    When `SCHEMA_FINGERPRINT_CHECK` is enabled, `create_all` is skipped if the
+    fingerprint stored by the previous run matches the current models. Otherwise
+    columns and indexes added to existing models are added to their tables.
+
+    Returns:
+        bool: True if `create_all` ran, False if it was skipped.
+
+    Raises:
+        RuntimeError: If a new NOT NULL column cannot be added to an existing table.
     """
+    fingerprint = compute_schema_fingerprint()
     async with engine.begin() as conn:
+        if config.SCHEMA_FINGERPRINT_CHECK:
+            if await conn.run_sync(_stored_fingerprint) == fingerprint:
+                return False
+        await conn.run_sync(add_missing_columns)
         await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(delete(schema_fingerprint))
+        await conn.execute(insert(schema_fingerprint).values(fingerprint=fingerprint))
+    return True
+
+
+async def warm_up_pool(connections: int) -> int:
+    """
+    Open pooled connections ahead of the first request.
+
+    Args:
+        connections (int): Number of connections to open, capped at the pool size.
+
+    Returns:
+        int: The number of connections opened, 0 for pools that do not keep any.
+    """
+    pool = engine.pool
+    if not isinstance(pool, AsyncAdaptedQueuePool):
+        return 0
+    connections = min(connections, pool.size())
+    if connections <= 0:
+        return 0
+    opened = await asyncio.gather(*(engine.connect() for _ in range(connections)))
+    for conn in opened:
+        await conn.close()
+    return len(opened)
 
 
 SessionDep = Annotated[AsyncSession, Depends(get_async_session)]
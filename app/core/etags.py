@@ -0,0 +1,106 @@
+"""
+Helpers for ETag generation and conditional request matching (RFC 9110, section 13).
+"""
+
+import hashlib
+from typing import Iterable, List, Optional, Tuple
+
+
+def make_etag(*parts: object) -> str:
+    """
+    Build a strong ETag from the values that determine a representation.
+
+    Args:
+        *parts: Values such as primary keys and row versions.
+
+    Returns:
+        str: A quoted entity tag.
+    """
+    digest = hashlib.blake2b(digest_size=12)
+    for part in parts:
+        digest.update(str(part).encode())
+        digest.update(b"\x1f")
+    return f'"{digest.hexdigest()}"'
+
+
+def make_collection_etag(versions: Iterable[Iterable[object]]) -> str:
+    """Build a strong ETag for a list from the `(id, version)` pair of each item."""
+    return make_etag(*(".".join(map(str, item)) for item in versions))
+
+
+def add_coding_suffix(etag: str, coding: str) -> str:
+    """
+    Derive the strong ETag of a content-coded representation, e.g. `"abc"` -> `"abc-gzip"`.
+
+    A strong validator must differ between content-codings (RFC 9110, section 8.8.3).
+    Weak ETags are returned unchanged, since the codings are semantically equivalent.
+
+    Args:
+        etag (str): The ETag of the unencoded representation.
+        coding (str): The content-coding applied, such as 'gzip'.
+
+    Returns:
+        str: The ETag to send with the encoded representation.
+    """
+    if etag.startswith("W/") or not etag.endswith('"'):
+        return etag
+    return f'{etag[:-1]}-{coding}"'
+
+
+def strip_coding_suffixes(header: str, codings: Iterable[str]) -> Tuple[str, Optional[str]]:
+    """
+    Map the tags in an If-Match or If-None-Match header back to unencoded ETags.
+
+    Args:
+        header (str): The header value.
+        codings (Iterable[str]): The content-codings whose suffixes are removed.
+
+    Returns:
+        Tuple[str, Optional[str]]: The header with suffixes removed, and the last
+        coding whose suffix was found, if any.
+    """
+    suffixes = [(f'-{coding}"', coding) for coding in codings]
+    tags = []
+    found = None
+    for tag in _parse_etags(header):
+        for suffix, coding in suffixes:
+            if tag.endswith(suffix):
+                tag = tag[: -len(suffix)] + '"'
+                found = coding
+                break
+        tags.append(tag)
+    return ", ".join(tags), found
+
+
+def _parse_etags(header: str) -> List[str]:
+    return [tag.strip() for tag in header.split(",") if tag.strip()]
+
+
+def _opaque(tag: str) -> str:
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def if_none_match_matches(header: Optional[str], etag: str) -> bool:
+    """
+    Evaluate an If-None-Match header using weak comparison.
+
+    Returns:
+        bool: True if the client's copy is current and a 304 may be sent.
+    """
+    if not header:
+        return False
+    tags = _parse_etags(header)
+    return "*" in tags or _opaque(etag) in {_opaque(tag) for tag in tags}
+
+
+def if_match_matches(header: Optional[str], etag: str) -> bool:
+    """
+    Evaluate an If-Match header using strong comparison.
+
+    Returns:
+        bool: True if the request may proceed (no header, `*`, or a matching strong tag).
+    """
+    if header is None:
+        return True
+    tags = _parse_etags(header)
+    return "*" in tags or (not etag.startswith("W/") and etag in tags)
@@ -0,0 +1,49 @@
+"""
+ASGI middleware attributing event-loop stalls to the request being served.
+
+It sets `current_request` to the request's method and path, and registers the
+task serving it with the loop monitor, so a slow callback captured by
+`LoopMonitor` names the request in flight. Tasks created while the request is
+served inherit the attribution through the monitor's task factory.
+
+Like `ProfilingMiddleware` this is a plain ASGI middleware, so it adds no task
+of its own. Install it outside the other middlewares so their work is
+attributed too.
+"""
+
+import asyncio
+from typing import Optional
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.eventloop.monitor import LoopMonitor, current_request, loop_monitor
+
+
+class LoopMonitorMiddleware:
+    """
+    Middleware that marks the request in flight for the loop monitor.
+
+    Args:
+        app (ASGIApp): The wrapped application.
+        monitor (Optional[LoopMonitor]): Monitor to report to; defaults to the shared
+            `loop_monitor`.
+    """
+
+    def __init__(self, app: ASGIApp, monitor: Optional[LoopMonitor] = None) -> None:
+        self.app = app
+        self.monitor = loop_monitor if monitor is None else monitor
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        task = asyncio.current_task()
+        if scope["type"] != "http" or task is None:
+            await self.app(scope, receive, send)
+            return
+
+        request = f"{scope['method']} {scope['path']}"
+        token = current_request.set(request)
+        self.monitor.track(task, request)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.monitor.track(task, None)
+            current_request.reset(token)
@@ -0,0 +1,250 @@
+"""
+Event-loop lag monitor.
+
+Every request, middleware and template render shares one asyncio loop, so a
+single blocking call delays everything else in flight. The monitor measures how
+late the loop runs a heartbeat task that wakes up every interval, and keeps a
+histogram of that lag.
+
+A watchdog thread notices when the heartbeat is overdue by more than the slow
+threshold while the stall is still going on, and captures the loop thread's
+stack and the request being served at that moment. Once the heartbeat runs
+again, the stall is recorded as a slow callback with its total lag. Stalls that
+end between two watchdog checks are recorded without a stack.
+
+Requests are attributed through `current_request`, set by
+`app.core.eventloop.middleware.LoopMonitorMiddleware`: the monitor installs a
+task factory that remembers the request of every task created while it is set,
+so work running in tasks spawned by `BaseHTTPMiddleware` is attributed as well.
+"""
+
+# pylint: disable=protected-access
+
+import asyncio
+import contextlib
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from weakref import WeakKeyDictionary
+
+import app.core.config as config
+from app.core.metrics.registry import metrics
+
+# Upper bounds of the lag histogram buckets, in milliseconds; a final bucket
+# counts everything above the last bound.
+LAG_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+# Innermost frames kept from a slow callback's stack.
+MAX_STACK_DEPTH = 40
+
+current_request: ContextVar[Optional[str]] = ContextVar("current_request", default=None)
+
+
+class LagHistogram:
+    """
+    Counts of heartbeat lags per `LAG_BUCKETS_MS` bucket.
+
+    Attributes:
+        counts (List[int]): Observations per bucket, the overflow bucket last.
+        total (float): Sum of all lags in milliseconds.
+        max (float): Largest lag in milliseconds.
+    """
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(LAG_BUCKETS_MS) + 1)
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, lag_ms: float) -> None:
+        index = 0
+        while index < len(LAG_BUCKETS_MS) and lag_ms > LAG_BUCKETS_MS[index]:
+            index += 1
+        self.counts[index] += 1
+        self.total += lag_ms
+        self.max = max(self.max, lag_ms)
+
+    def as_dict(self) -> Dict[str, Any]:
+        count = sum(self.counts)
+        return {
+            "count": count,
+            "mean_ms": self.total / count if count else 0.0,
+            "max_ms": self.max,
+            "buckets": [
+                {"le_ms": bound, "count": self.counts[index]}
+                for index, bound in enumerate((*LAG_BUCKETS_MS, None))
+            ],
+        }
+
+
+class SlowCallback:
+    """
+    A stall of the event loop longer than the slow threshold.
+
+    Attributes:
+        started_at (float): Unix time at which the loop stopped responding.
+        lag_ms (float): How late the heartbeat ran, in milliseconds.
+        stack (List[str]): Formatted frames of the loop thread during the stall,
+            outermost first; empty if the stall ended before it was captured.
+        request (Optional[str]): Method and path of the request being served.
+    """
+
+    __slots__ = ("started_at", "lag_ms", "stack", "request")
+
+    def __init__(self, started_at: float, stack: List[str], request: Optional[str]):
+        self.started_at = started_at
+        self.lag_ms = 0.0
+        self.stack = stack
+        self.request = request
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "started_at": self.started_at,
+            "lag_ms": round(self.lag_ms, 3),
+            "stack": self.stack,
+            "request": self.request,
+        }
+
+
+class LoopMonitor:
+    """
+    Heartbeat and watchdog measuring the running event loop's responsiveness.
+
+    Start it from inside the loop to monitor, e.g. in the application lifespan.
+
+    Args:
+        interval_ms (float): Milliseconds between heartbeats and watchdog checks.
+        slow_ms (float): Lag above which a stall is recorded as a slow callback.
+        max_events (int): Number of most recent slow callbacks kept.
+    """
+
+    def __init__(self, interval_ms: float, slow_ms: float, max_events: int):
+        self.interval = interval_ms / 1000
+        self.slow = slow_ms / 1000
+        self.histogram = LagHistogram()
+        self.events: Deque[SlowCallback] = deque(maxlen=max_events)
+        self._requests: "WeakKeyDictionary[asyncio.Task[Any], str]" = WeakKeyDictionary()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id = 0
+        self._previous_factory: Any = None
+        self._factory = self._task_factory
+        self._heartbeat: "Optional[asyncio.Task[None]]" = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        # Monotonic time the heartbeat is due, and the stall captured while it was overdue.
+        self._deadline = 0.0
+        self._pending: Optional[Tuple[float, SlowCallback]] = None
+
+    @property
+    def running(self) -> bool:
+        return self._heartbeat is not None
+
+    def start(self) -> None:
+        """
+        Start the heartbeat on the running loop and the watchdog thread.
+
+        Raises:
+            RuntimeError: If the monitor is already running.
+        """
+        if self.running:
+            raise RuntimeError("LoopMonitor is already running")
+        loop = asyncio.get_running_loop()
+        self._loop = loop
+        self._loop_thread_id = threading.get_ident()
+        self._previous_factory = loop.get_task_factory()
+        loop.set_task_factory(self._factory)
+        self._deadline = time.monotonic() + self.interval
+        self._pending = None
+        self._heartbeat = loop.create_task(self._beat(), name="loop-monitor-heartbeat")
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    async def stop(self) -> None:
+        """Stop the heartbeat and the watchdog, and restore the loop's task factory."""
+        if self._heartbeat is None or self._thread is None or self._loop is None:
+            return
+        self._heartbeat.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._heartbeat
+        self._stop.set()
+        self._thread.join()
+        if self._loop.get_task_factory() is self._factory:
+            self._loop.set_task_factory(self._previous_factory)
+        self._heartbeat = self._thread = None
+
+    def track(self, task: "asyncio.Task[Any]", request: Optional[str]) -> None:
+        """Attribute `task` to `request`, or forget it if `request` is None."""
+        if request is None:
+            self._requests.pop(task, None)
+        else:
+            self._requests[task] = request
+
+    def reset(self) -> None:
+        self.histogram = LagHistogram()
+        self.events.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the lag histogram and the slow callbacks, most recent first."""
+        return {
+            "pid": os.getpid(),
+            "running": self.running,
+            "interval_ms": self.interval * 1000,
+            "slow_ms": self.slow * 1000,
+            "lag": self.histogram.as_dict(),
+            "slow_callbacks": [event.as_dict() for event in reversed(self.events)],
+        }
+
+    def _task_factory(
+        self, loop: asyncio.AbstractEventLoop, coro: Any, **kwargs: Any
+    ) -> "asyncio.Future[Any]":
+        if self._previous_factory is not None:
+            task = self._previous_factory(loop, coro, **kwargs)
+        else:
+            task = asyncio.Task(coro, loop=loop, **kwargs)
+        request = current_request.get()
+        if request is not None:
+            self._requests[task] = request
+        return task
+
+    async def _beat(self) -> None:
+        while True:
+            self._deadline = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.monotonic() - self._deadline)
+            self.histogram.observe(lag * 1000)
+            metrics.observe("loop.lag_ms", lag * 1000)
+            if lag > self.slow:
+                pending = self._pending
+                if pending is not None and pending[0] == self._deadline:
+                    event = pending[1]
+                else:
+                    event = SlowCallback(time.time() - lag, [], None)
+                event.lag_ms = lag * 1000
+                self.events.append(event)
+                metrics.inc("loop.slow_callbacks")
+            self._pending = None
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.interval):
+            deadline = self._deadline
+            overdue = time.monotonic() - deadline
+            if overdue > self.slow and (self._pending is None or self._pending[0] != deadline):
+                self._pending = (deadline, self._capture(overdue))
+
+    def _capture(self, overdue: float) -> SlowCallback:
+        """Record what the loop thread is running now."""
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = traceback.format_stack(frame, MAX_STACK_DEPTH) if frame is not None else []
+        task = asyncio.current_task(self._loop) if self._loop is not None else None
+        request = self._requests.get(task) if task is not None else None
+        return SlowCallback(time.time() - overdue, stack, request)
+
+
+loop_monitor = LoopMonitor(
+    config.LOOP_MONITOR_INTERVAL_MS, config.LOOP_MONITOR_SLOW_MS, config.LOOP_MONITOR_MAX_EVENTS
+)
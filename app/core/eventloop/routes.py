@@ -0,0 +1,47 @@
+"""
+Routes for inspecting the event-loop monitor.
+
+Endpoints:
+    - GET /admin/loop: Shows the heartbeat lag histogram and recent slow callbacks.
+    - GET /admin/loop/stats: Returns the same data as JSON.
+
+Each worker process runs its own event loop and monitor, so under the multi-worker
+launcher both only show the worker that served the request.
+"""
+
+from datetime import datetime
+from typing import Any, Dict
+
+from fastapi import APIRouter, Request
+from fastapi.responses import HTMLResponse
+
+from app.core.eventloop.monitor import LAG_BUCKETS_MS, loop_monitor
+from app.core.templates import get_templates
+
+router = APIRouter(prefix="/admin/loop", tags=["Event Loop"])
+
+
+@router.get("", response_class=HTMLResponse)
+async def get_loop(request: Request) -> Any:
+    """Render the lag histogram and the slow callbacks, most recent first."""
+    snapshot = loop_monitor.snapshot()
+    peak = max((bucket["count"] for bucket in snapshot["lag"]["buckets"]), default=0)
+    return get_templates().TemplateResponse(
+        "loop.html",
+        {
+            "request": request,
+            "snapshot": snapshot,
+            "events": [
+                (datetime.fromtimestamp(event["started_at"]), event)
+                for event in snapshot["slow_callbacks"]
+            ],
+            "peak": peak or 1,
+            "last_bound": LAG_BUCKETS_MS[-1],
+        },
+    )
+
+
+@router.get("/stats")
+async def get_loop_stats() -> Dict[str, Any]:
+    """Return the loop monitor's histogram and slow callbacks."""
+    return loop_monitor.snapshot()
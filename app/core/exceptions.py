@@ -2,7 +2,7 @@
 This module defines custom exceptions for the application.
 
 It includes specific exceptions for handling 'Not Found' errors,
-such as the NotFound exception class.
+such as the NotFound exception class, and for conditional requests.
 """
 
 from fastapi import HTTPException
@@ -29,6 +29,47 @@ class NotFound(HTTPException):
         super().__init__(404, detail)
 
 
+class BadRequest(HTTPException):
+    """
+    Custom exception class for handling 'Bad Request' errors.
+
+    Raised when a request is well-formed but carries a value the application
+    cannot interpret, such as a tampered pagination cursor.
+
+    Attributes:
+        detail (str): A detailed error message describing the reason for the exception.
+    """
+
+    def __init__(self, detail: str = "Bad Request") -> None:
+        """
+        Initializes the BadRequest exception with a 400 status code and a detailed message.
+
+        Args:
+            detail (str): A detailed error message describing the reason for the exception.
+        """
+        super().__init__(400, detail)
+
+
+class UnsupportedMediaType(HTTPException):
+    """
+    Custom exception class for handling 'Unsupported Media Type' errors.
+
+    Raised when a request body is sent in a format the endpoint cannot process.
+
+    Attributes:
+        detail (str): A detailed error message describing the reason for the exception.
+    """
+
+    def __init__(self, detail: str = "Unsupported Media Type") -> None:
+        """
+        Initializes the UnsupportedMediaType exception with a 415 status code and a message.
+
+        Args:
+            detail (str): A detailed error message describing the reason for the exception.
+        """
+        super().__init__(415, detail)
+
+
 class NoContent(HTTPException):
     """
     Custom exception class for handling 'No Content' responses.
@@ -48,3 +89,46 @@ class NoContent(HTTPException):
             description (str): A detailed message describing the reason for the exception.
         """
         super().__init__(204, description)
+
+
+class NotModified(HTTPException):
+    """
+    Custom exception class for 'Not Modified' responses to conditional GETs.
+
+    Raised when the client's cached copy, identified by If-None-Match, is still
+    current. The response carries the ETag and no body.
+
+    Attributes:
+        etag (str): The current entity tag of the resource.
+    """
+
+    def __init__(self, etag: str) -> None:
+        """
+        Initializes the NotModified exception with a 304 status code and the current ETag.
+
+        Args:
+            etag (str): The current entity tag of the resource.
+        """
+        super().__init__(304, headers={"ETag": etag})
+        self.etag = etag
+
+
+class PreconditionFailed(HTTPException):
+    """
+    Custom exception class for handling 'Precondition Failed' errors.
+
+    Raised when an If-Match precondition does not hold, or when a versioned row
+    was changed by another request between being read and written.
+
+    Attributes:
+        detail (str): A detailed error message describing the reason for the exception.
+    """
+
+    def __init__(self, detail: str = "Precondition Failed") -> None:
+        """
+        Initializes the PreconditionFailed exception with a 412 status code and a message.
+
+        Args:
+            detail (str): A detailed error message describing the reason for the exception.
+        """
+        super().__init__(412, detail)
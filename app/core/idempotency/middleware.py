@@ -0,0 +1,145 @@
+"""
+FastAPI middleware making mutating requests safe to retry with an `Idempotency-Key`.
+
+A POST, PUT, PATCH or DELETE under a path prefix with a configured TTL that sends
+an `Idempotency-Key` header runs at most once per client and key within the TTL:
+
+- The first request runs normally, and its response is stored unless it is a
+  5xx error, which leaves the request free to be retried.
+- Duplicates arriving while it runs wait for its response instead of running the
+  handler again, whichever worker process they reach.
+- Later retries are answered from the store, without running the handler, and
+  carry an `Idempotent-Replayed: true` header.
+- Reusing a key for a different request (method, path, query or body) is answered
+  with 422 Unprocessable Entity.
+
+Clients are told apart by `AdmissionMiddleware.client_key`. This middleware sits
+inside `LoggingMiddleware`, so replays are still logged. Streamed uploads are not
+buffered for fingerprinting, so they are passed through.
+"""
+
+import asyncio
+import hashlib
+import time
+from typing import Awaitable, Callable, Dict, Optional
+
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.types import ASGIApp
+
+import app.core.config as config
+from app.core.config import PrefixRules
+from app.core.admission.middleware import AdmissionMiddleware
+from app.core.idempotency.store import IdempotencyStore, StoredResponse, idempotency_store
+from app.core.logging.middleware import LoggingMiddleware
+from app.core.metrics.registry import metrics
+from app.core.responses import buffer_response, stored_response
+
+IDEMPOTENCY_KEY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+MAX_KEY_LENGTH = 255
+MUTATING_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+
+# Seconds between checks of a key held by a request in another worker process.
+POLL_INTERVAL = 0.05
+
+
+class IdempotencyMiddleware(BaseHTTPMiddleware):
+    """
+    Middleware that stores and replays responses to requests with an idempotency key.
+
+    Args:
+        app (ASGIApp): The wrapped application.
+        store (Optional[IdempotencyStore]): Store to use; defaults to the shared
+            `idempotency_store`.
+        ttls (Optional[Dict[str, float]]): Seconds a response is kept, per path prefix.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        store: Optional[IdempotencyStore] = None,
+        ttls: Optional[Dict[str, float]] = None,
+    ) -> None:
+        super().__init__(app)
+        self.store = idempotency_store if store is None else store
+        self.ttls = PrefixRules(config.IDEMPOTENCY_TTLS if ttls is None else ttls)
+
+    def _ttl_for(self, path: str) -> Optional[float]:
+        if any(path.startswith(prefix) for prefix in LoggingMiddleware.UNBUFFERED_BODY_PATHS):
+            return None
+        return self.ttls.match(path)
+
+    async def dispatch(
+        self, request: Request, call_next: Callable[[Request], Awaitable[Response]]
+    ) -> Response:
+        idempotency_key = request.headers.get(IDEMPOTENCY_KEY_HEADER)
+        ttl = self._ttl_for(request.url.path) if request.method in MUTATING_METHODS else None
+        if idempotency_key is None or not ttl:
+            return await call_next(request)
+        if not 0 < len(idempotency_key) <= MAX_KEY_LENGTH:
+            return JSONResponse(
+                {"detail": f"{IDEMPOTENCY_KEY_HEADER} must be 1 to {MAX_KEY_LENGTH} characters"},
+                status_code=400,
+            )
+
+        client = AdmissionMiddleware.client_key(request)
+        key = hashlib.blake2b(f"{client}\n{idempotency_key}".encode(), digest_size=16).digest()
+        fingerprint = hashlib.blake2b(
+            f"{request.method} {request.url.path}?{request.url.query}\n".encode()
+            + await request.body(),
+            digest_size=16,
+        ).digest()
+
+        while True:
+            waiter = self.store.waiter(key)
+            if waiter is not None:
+                metrics.inc("idempotency.waits")
+                # Shielded: a waiter that gives up must not cancel the shared future.
+                entry = await asyncio.shield(waiter)
+            else:
+                claimed, entry = await self.store.claim(key, fingerprint)
+                if claimed:
+                    break
+                if entry is None:
+                    # Held by a request in another worker; check again shortly.
+                    metrics.inc("idempotency.waits")
+                    await asyncio.sleep(POLL_INTERVAL)
+                    continue
+            if entry is not None:
+                return _replay(entry, fingerprint)
+            # The original request stored nothing; run it again, unless another
+            # duplicate got there first.
+
+        metrics.inc("idempotency.executions")
+        stored: Optional[StoredResponse] = None
+        try:
+            response = await call_next(request)
+            if response.status_code >= 500:
+                return response
+            response = await buffer_response(response)
+            stored = StoredResponse(
+                response.status_code,
+                response.headers.items(),
+                response.body,
+                fingerprint,
+                time.time() + ttl,
+            )
+            return response
+        finally:
+            await self.store.finish(key, stored)
+
+
+def _replay(entry: StoredResponse, fingerprint: bytes) -> Response:
+    if entry.fingerprint != fingerprint:
+        metrics.inc("idempotency.conflicts")
+        return JSONResponse(
+            {"detail": f"{IDEMPOTENCY_KEY_HEADER} was already used for a different request"},
+            status_code=422,
+        )
+    metrics.inc("idempotency.replays")
+    return stored_response(
+        entry.status_code, [*entry.headers, (REPLAYED_HEADER.lower(), "true")], entry.body
+    )
@@ -0,0 +1,38 @@
+"""
+SQLAlchemy model for idempotency keys, kept in the main database so every worker
+process sees the same keys.
+
+Tables:
+    - idempotency_keys: One row per client and key. A row without a status code is
+      in flight: the request holding it is still running. Otherwise it holds the
+      response replayed to retries until it expires.
+"""
+
+from typing import List, Optional
+from sqlalchemy import JSON, LargeBinary
+from sqlalchemy.orm import Mapped, mapped_column
+from app.core.database import Base
+
+
+class IdempotencyKeyModel(Base):
+    """
+    ORM model for one idempotency key and its stored response.
+
+    Attributes:
+        key (bytes): Digest of the client and the `Idempotency-Key` header.
+        fingerprint (bytes): Digest of the request that claimed the key.
+        status_code (Optional[int]): Status of the stored response; None while in flight.
+        headers (Optional[List[List[str]]]): Raw `[name, value]` header pairs, in order.
+        body (Optional[bytes]): Encoded response body.
+        expires_at (float): Unix time after which the row is dropped; for in-flight
+            keys, the end of the holder's lease.
+    """
+
+    __tablename__ = "idempotency_keys"
+
+    key: Mapped[bytes] = mapped_column(LargeBinary(16), primary_key=True)
+    fingerprint: Mapped[bytes] = mapped_column(LargeBinary(16))
+    status_code: Mapped[Optional[int]]
+    headers: Mapped[Optional[List[List[str]]]] = mapped_column(JSON)
+    body: Mapped[Optional[bytes]] = mapped_column(LargeBinary)
+    expires_at: Mapped[float] = mapped_column(index=True)
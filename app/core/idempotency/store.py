@@ -0,0 +1,152 @@
+"""
+Database-backed store of responses to requests carrying an `Idempotency-Key`.
+
+Keys live in the main database (see `app.core.idempotency.models`), so a retry is
+recognized whichever worker process it reaches. Rows are keyed by a 16-byte digest
+of the client and key, hold only the status, raw headers, encoded body and the
+fingerprint of the original request, and expire after their TTL.
+
+The first request with a key claims it by inserting an in-flight row; a duplicate
+whose insert conflicts does not run the request. Duplicates in the same process
+wait on the holder's future, and receive its stored response once it finishes;
+duplicates in other processes poll the row. A request that fails deletes its row,
+so the next duplicate runs it afresh. An in-flight row expires after
+`IDEMPOTENCY_LEASE_SECONDS`, so a key held by a worker that died is freed.
+"""
+
+import asyncio
+import time
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+import app.core.config as config
+from app.core.database import AsyncSessionLocal
+from app.core.idempotency.models import IdempotencyKeyModel
+
+# Seconds between sweeps deleting every expired row; expired rows are otherwise
+# only replaced when their own key is claimed again.
+PURGE_INTERVAL = 60.0
+
+
+class StoredResponse:
+    """
+    A response kept for replay to retries of the same request.
+
+    Attributes:
+        status_code (int): HTTP status code.
+        headers (List[Tuple[str, str]]): Raw response headers, repeated names included.
+        body (bytes): Encoded response body.
+        fingerprint (bytes): Digest of the request that produced the response.
+        expires_at (float): Unix time after which the entry is dropped.
+    """
+
+    __slots__ = ("status_code", "headers", "body", "fingerprint", "expires_at")
+
+    def __init__(
+        self,
+        status_code: int,
+        headers: List[Tuple[str, str]],
+        body: bytes,
+        fingerprint: bytes,
+        expires_at: float,
+    ):
+        self.status_code = status_code
+        self.headers = headers
+        self.body = body
+        self.fingerprint = fingerprint
+        self.expires_at = expires_at
+
+
+class IdempotencyStore:
+    """
+    TTL store of responses by idempotency key, with in-flight request tracking.
+
+    Args:
+        lease (float): Seconds an in-flight key stays claimed if its holder never
+            finishes.
+    """
+
+    def __init__(self, lease: float):
+        self.lease = lease
+        self._in_flight: Dict[bytes, "asyncio.Future[Optional[StoredResponse]]"] = {}
+        self._next_purge = 0.0
+
+    def waiter(self, key: bytes) -> "Optional[asyncio.Future[Optional[StoredResponse]]]":
+        """
+        Future of the request in this process holding `key`, if any.
+
+        It resolves to the holder's stored response, or None if it stored nothing.
+        """
+        return self._in_flight.get(key)
+
+    async def claim(
+        self, key: bytes, fingerprint: bytes, now: Optional[float] = None
+    ) -> Tuple[bool, Optional[StoredResponse]]:
+        """
+        Claim `key` for the request with `fingerprint`, unless it is taken.
+
+        Returns:
+            Tuple[bool, Optional[StoredResponse]]: `(True, None)` if the caller now
+            holds the key and must call `finish`; `(False, entry)` with the live stored
+            response; or `(False, None)` if another request holds the key.
+        """
+        now = time.time() if now is None else now
+        table = IdempotencyKeyModel.__table__
+        async with AsyncSessionLocal() as session:
+            row = (await session.execute(select(table).where(table.c.key == key))).first()
+            if row is not None and row.expires_at > now:
+                if row.status_code is None:
+                    return False, None
+                headers = [(name, value) for name, value in row.headers]
+                return False, StoredResponse(
+                    row.status_code, headers, row.body, row.fingerprint, row.expires_at
+                )
+            if now >= self._next_purge:
+                self._next_purge = now + PURGE_INTERVAL
+                await session.execute(delete(table).where(table.c.expires_at <= now))
+            elif row is not None:
+                await session.execute(
+                    delete(table).where(table.c.key == key, table.c.expires_at <= now)
+                )
+            claimed = await session.scalar(
+                sqlite_insert(table)
+                .values(key=key, fingerprint=fingerprint, expires_at=now + self.lease)
+                .on_conflict_do_nothing(index_elements=["key"])
+                .returning(table.c.key)
+            )
+            await session.commit()
+        if claimed is None:
+            return False, None
+        self._in_flight[key] = asyncio.get_running_loop().create_future()
+        return True, None
+
+    async def finish(self, key: bytes, entry: Optional[StoredResponse]) -> None:
+        """Release `key`, storing `entry` if given, and hand it to waiting duplicates."""
+        table = IdempotencyKeyModel.__table__
+        try:
+            async with AsyncSessionLocal() as session:
+                if entry is None:
+                    await session.execute(
+                        delete(table).where(table.c.key == key, table.c.status_code.is_(None))
+                    )
+                else:
+                    await session.execute(
+                        update(table)
+                        .where(table.c.key == key)
+                        .values(
+                            status_code=entry.status_code,
+                            headers=[[name, value] for name, value in entry.headers],
+                            body=entry.body,
+                            expires_at=entry.expires_at,
+                        )
+                    )
+                await session.commit()
+        finally:
+            waiter = self._in_flight.pop(key, None)
+            if waiter is not None and not waiter.done():
+                waiter.set_result(entry)
+
+
+idempotency_store = IdempotencyStore(config.IDEMPOTENCY_LEASE_SECONDS)
@@ -0,0 +1,130 @@
+"""
+Multi-worker production launcher.
+
+Forks N uvicorn workers that share one listening socket, plus a single log writer
+process that owns all inserts into the API log table (see `app.core.logging.writer`).
+Worker supervision reuses uvicorn's `Multiprocess`: workers that die or stop
+answering health pings are replaced, SIGHUP restarts them, and SIGTTIN/SIGTTOU
+add or remove one. The writer process is restarted the same way if it dies.
+
+Shutdown (SIGINT/SIGTERM) is ordered so no log record is lost: workers finish
+their in-flight requests first, then the writer drains whatever is left on the
+queue and exits. The writer ignores SIGINT and SIGTERM sent to the process group
+and only stops on the queue's sentinel; workers are not started until it does.
+"""
+
+import argparse
+import asyncio
+import logging
+import multiprocessing
+from functools import partial
+from socket import socket
+from typing import Any, List, Optional
+
+import uvicorn
+from uvicorn.supervisors.multiprocess import Multiprocess
+
+import app.core.config as config
+import app.main  # pylint: disable=unused-import  # registers every model on Base.metadata
+from app.core.database import init_db
+from app.core.logging.writer import run_log_writer, set_log_queue
+
+logger = logging.getLogger("uvicorn.error")
+
+spawn = multiprocessing.get_context("spawn")
+
+# Seconds between checks that a starting log writer is still alive.
+WRITER_READY_POLL_INTERVAL = 0.1
+
+
+def _serve_worker(
+    server_config: uvicorn.Config, log_queue: Any, sockets: Optional[List[socket]] = None
+) -> None:
+    """Worker process body: send log records to the writer, then serve on the shared socket."""
+    set_log_queue(log_queue)
+    uvicorn.Server(server_config).run(sockets=sockets)
+
+
+class WorkerSupervisor(Multiprocess):
+    """
+    uvicorn's worker supervisor, extended with the dedicated log writer process.
+
+    Args:
+        server_config (uvicorn.Config): Configuration shared by all workers.
+        sockets (List[socket]): Listening sockets bound by the parent process.
+    """
+
+    def __init__(self, server_config: uvicorn.Config, sockets: List[socket]):
+        self.log_queue = spawn.Queue(maxsize=config.LOG_QUEUE_SIZE)
+        self.writer: Optional[multiprocessing.process.BaseProcess] = None
+        super().__init__(
+            server_config,
+            target=partial(_serve_worker, server_config, self.log_queue),
+            sockets=sockets,
+        )
+
+    def start_writer(self) -> None:
+        """
+        Start the writer and wait until it ignores SIGINT and SIGTERM.
+
+        Until then, the spawned interpreter is still importing the app, and a signal
+        sent to the process group would kill it with records still to come.
+        """
+        ready = spawn.Event()
+        self.writer = spawn.Process(
+            target=run_log_writer, args=(self.log_queue, ready), name="log-writer"
+        )
+        self.writer.start()
+        while not ready.wait(WRITER_READY_POLL_INTERVAL):
+            if not self.writer.is_alive():
+                # keep_subprocess_alive starts it again on its next check.
+                logger.warning("Log writer process [%s] exited during startup", self.writer.pid)
+                return
+        logger.info("Started log writer process [%s]", self.writer.pid)
+
+    def keep_subprocess_alive(self) -> None:
+        super().keep_subprocess_alive()
+        if self.should_exit.is_set() or self.writer is None or self.writer.is_alive():
+            return
+        logger.warning("Log writer process [%s] died, restarting", self.writer.pid)
+        self.start_writer()
+
+    def drain_writer(self) -> None:
+        """Signal the writer to flush the queue and wait for it to exit."""
+        if self.writer is None:
+            return
+        self.log_queue.put(None, timeout=config.GRACEFUL_SHUTDOWN_TIMEOUT)
+        self.writer.join(config.GRACEFUL_SHUTDOWN_TIMEOUT)
+        if self.writer.is_alive():
+            # The writer ignores SIGTERM, so it has to be killed.
+            logger.warning("Log writer did not drain in time, killing it")
+            self.writer.kill()
+            self.writer.join()
+
+    def run(self) -> None:
+        self.start_writer()
+        try:
+            super().run()
+        finally:
+            self.drain_writer()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Parse command-line options and run the supervisor until it is signalled to stop."""
+    parser = argparse.ArgumentParser(description="Run the API with multiple worker processes.")
+    parser.add_argument("--host", default=config.SERVER_HOST)
+    parser.add_argument("--port", type=int, default=config.SERVER_PORT)
+    parser.add_argument("--workers", type=int, default=config.WORKERS)
+    args = parser.parse_args(argv)
+
+    server_config = uvicorn.Config(
+        "app.main:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        timeout_graceful_shutdown=int(config.GRACEFUL_SHUTDOWN_TIMEOUT),
+    )
+    # Create the schema once up front; workers then find a matching fingerprint.
+    asyncio.run(init_db())
+    sock = server_config.bind_socket()
+    WorkerSupervisor(server_config, sockets=[sock]).run()
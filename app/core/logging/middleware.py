@@ -4,8 +4,9 @@ FastAPI middleware for detailed HTTP request and response logging.
 This middleware automatically captures and logs key request and response data,
 including method, URL, headers, body content, status codes, processing duration,
 user identity, and client IP. Logs are persisted asynchronously to a separate
-SQLite database, supporting advanced debugging, performance monitoring, and
-auditing use cases.
+SQLite database (through the log writer process when running under the
+multi-worker launcher), supporting advanced debugging, performance monitoring,
+and auditing use cases.
 
 Note:
     Use this middleware in secure, trusted environments to avoid potential
@@ -18,8 +19,9 @@ from starlette.requests import Request
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.responses import Response, StreamingResponse
 from starlette.types import Message
-from app.core.database import AsyncSessionLocal
-from app.core.logging.models import APILog
+from app.core.cache.middleware import CACHE_STATUS_HEADER
+from app.core.logging.models import eastern_now
+from app.core.logging.writer import persist_log
 
 
 class LoggingMiddleware(BaseHTTPMiddleware):
@@ -35,6 +37,8 @@ class LoggingMiddleware(BaseHTTPMiddleware):
     - Execution time in milliseconds
     - User identity (via 'X-User-Id' header)
     - Client IP address
+    - Response cache status (via the 'X-Cache' header set by the response cache)
+    - The request's profile, when `ProfilingMiddleware` sampled it
 
     All logs are stored in a separate SQLite database defined in the logging module.
 
@@ -44,7 +48,19 @@ class LoggingMiddleware(BaseHTTPMiddleware):
     """
 
     # Paths that should not be logged
-    EXCLUDED_PATHS = ["/admin/logs", "/admin/logs/partial", "/openapi.json", "/docs"]
+    EXCLUDED_PATHS = [
+        "/admin/logs",
+        "/admin/logs/partial",
+        "/admin/metrics",
+        "/admin/profiles",
+        "/admin/loop",
+        "/openapi.json",
+        "/docs",
+    ]
+
+    # Paths whose request bodies are streamed uploads; buffering them for the log
+    # would hold the whole upload in memory and consume the stream.
+    UNBUFFERED_BODY_PATHS = ["/users/imports"]
 
     async def dispatch(
         self, request: Request, call_next: Callable[[Request], Awaitable[Response]]
@@ -55,8 +71,11 @@ class LoggingMiddleware(BaseHTTPMiddleware):
 
         start_time = time.perf_counter()
 
-        # Read and buffer the request body once
-        body_bytes = await request.body()
+        # Read and buffer the request body once, unless it is a streamed upload
+        streamed_upload = request.method == "POST" and any(
+            request.url.path.startswith(path) for path in self.UNBUFFERED_BODY_PATHS
+        )
+        body_bytes = b"" if streamed_upload else await request.body()
 
         # Continue processing the request
         response = await call_next(request)
@@ -105,24 +124,26 @@ class LoggingMiddleware(BaseHTTPMiddleware):
         duration_ms = (time.perf_counter() - start_time) * 1000
 
         # Build and persist log entry
-        log = APILog(
-            method=request.method,
-            path=request.url.path,
-            query_string=str(request.url.query),
-            request_body=body_bytes.decode("utf-8", errors="ignore") if body_bytes else None,
-            response_body=response_body,
-            status_code=response.status_code,
-            duration_ms=duration_ms,
-            user_id=request.headers.get("X-User-Id"),
-            client_host=request.client.host if request.client else None,
+        await persist_log(
+            {
+                "created_at": eastern_now(),
+                "method": request.method,
+                "path": request.url.path,
+                "query_string": str(request.url.query),
+                "request_body": (
+                    "[Streamed Upload]"
+                    if streamed_upload
+                    else body_bytes.decode("utf-8", errors="ignore") if body_bytes else None
+                ),
+                "response_body": response_body,
+                "status_code": response.status_code,
+                "duration_ms": duration_ms,
+                "user_id": request.headers.get("X-User-Id"),
+                "client_host": request.client.host if request.client else None,
+                "cache_status": response.headers.get(CACHE_STATUS_HEADER),
+                # Set by ProfilingMiddleware when this request was profiled.
+                "profile": getattr(request.state, "profile", None),
+            }
         )
 
-        # Save to database
-        db = AsyncSessionLocal()
-        try:
-            db.add(log)
-            await db.commit()
-        finally:
-            await db.close()
-
         return response
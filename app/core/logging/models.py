@@ -2,18 +2,24 @@
 Database model for logging detailed API request and response interactions.
 
 This module defines the SQLAlchemy ORM model `APILog`, which captures
-comprehensive logging data for monitoring, debugging, and analytical purposes.
+comprehensive logging data for monitoring, debugging, and analytical purposes,
+and `APILogProfile`, which stores the profile of a sampled request next to its log.
 """
 
-from sqlalchemy import DateTime
+from sqlalchemy import JSON, DateTime, ForeignKey, Text
 from sqlalchemy.orm import Mapped, mapped_column
 from datetime import datetime
 import pytz
-from typing import Optional
+from typing import Any, Dict, List, Optional
 
 from app.core.database import Base
 
 
+def eastern_now() -> datetime:
+    """Return the current time in the Eastern timezone used for log timestamps."""
+    return datetime.now(pytz.timezone("America/New_York"))
+
+
 class APILog(Base):
     """
     SQLAlchemy model representing logs of API requests and responses.
@@ -33,6 +39,8 @@ class APILog(Base):
         duration_ms (Mapped[float]): Time taken to fulfill the request, in milliseconds.
         user_id (Mapped[Optional[str]]): Identifier of the authenticated user, if available.
         client_host (Mapped[Optional[str]]): IP address or hostname of the requesting client.
+        cache_status (Mapped[Optional[str]]): 'HIT' or 'MISS' for responses handled by the
+            response cache, None for uncached routes.
 
     Note:
         - All timestamps are stored in Eastern Time (America/New_York)
@@ -43,9 +51,7 @@ class APILog(Base):
     __tablename__ = "api_logs"
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    created_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), default=lambda: datetime.now(pytz.timezone("America/New_York"))
-    )
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=eastern_now)
     method: Mapped[str]
     path: Mapped[str]
     query_string: Mapped[str]
@@ -55,3 +61,39 @@ class APILog(Base):
     duration_ms: Mapped[float]
     user_id: Mapped[Optional[str]]
     client_host: Mapped[Optional[str]]
+    cache_status: Mapped[Optional[str]]
+
+
+class APILogProfile(Base):
+    """
+    SQLAlchemy model storing the sampling profile of a single logged request.
+
+    Attributes:
+        id (Mapped[int]): Primary key.
+        log_id (Mapped[int]): The `APILog` entry of the profiled request.
+        trigger (Mapped[str]): 'header' for requests that asked to be profiled,
+            'sampled' for requests picked by a per-route sample rate.
+        duration_ms (Mapped[float]): Wall-clock time spent profiling.
+        interval_ms (Mapped[float]): Sampling interval.
+        sample_count (Mapped[int]): Number of stack samples taken.
+        running_samples (Mapped[int]): Samples taken while the request's task was
+            running on the event loop; the rest were taken while it was awaiting.
+        functions (Mapped[List[Dict[str, Any]]]): Per-function self and total sample
+            counts, sorted by self samples.
+        stacks (Mapped[str]): Samples in collapsed-stack format (`a;b;c count` per
+            line), as read by flame graph tools.
+    """
+
+    __tablename__ = "api_log_profiles"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    log_id: Mapped[int] = mapped_column(
+        ForeignKey("api_logs.id", ondelete="CASCADE"), unique=True, index=True
+    )
+    trigger: Mapped[str]
+    duration_ms: Mapped[float]
+    interval_ms: Mapped[float]
+    sample_count: Mapped[int]
+    running_samples: Mapped[int]
+    functions: Mapped[List[Dict[str, Any]]] = mapped_column(JSON)
+    stacks: Mapped[str] = mapped_column(Text)
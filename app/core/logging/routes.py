@@ -10,7 +10,7 @@ Endpoints:
     - GET /admin/logs/partial: Returns partial template for AJAX updates.
 
 Dependencies:
-    - Jinja2Templates for HTML templating.
+    - Jinja2Templates for HTML templating, created lazily on first render.
     - Async SQLAlchemy session for asynchronous database access.
 """
 
@@ -19,7 +19,6 @@ from math import ceil
 # FastAPI imports grouped together
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
 
 # SQLAlchemy imports
 from sqlalchemy import func, select
@@ -28,9 +27,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 # Local imports
 from app.core.database import get_async_session
 from app.core.logging.models import APILog
+from app.core.templates import get_templates
 
 router = APIRouter(prefix="/admin/logs", tags=["Logs"])
-templates = Jinja2Templates(directory="app/templates")
 
 
 @router.get("")
@@ -59,7 +58,7 @@ async def get_logs(
     )
     logs = result.scalars().all()
 
-    return templates.TemplateResponse(
+    return get_templates().TemplateResponse(
         "logs.html",
         {
             "request": request,
@@ -100,7 +99,7 @@ async def get_logs_partial(
     )
     logs = result.scalars().all()
 
-    return templates.TemplateResponse(
+    return get_templates().TemplateResponse(
         "partials/_logs_table.html",
         {
             "request": request,
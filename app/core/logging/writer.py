@@ -0,0 +1,141 @@
+"""
+Persistence of API log records, either in-process or via a dedicated writer process.
+
+By default `LoggingMiddleware` writes each record straight to the database. When
+the app runs under the multi-worker launcher (`app.core.launcher`), every worker
+is given a shared multiprocessing queue instead: records are put on the queue and
+a single writer process owns all inserts into `api_logs`, batching them so the
+workers never contend for the SQLite write lock over log rows.
+"""
+
+import asyncio
+import logging
+import queue
+import signal
+from typing import Any, Dict, List, Optional
+
+import app.core.config as config
+from app.core.database import AsyncSessionLocal
+from app.core.logging.models import APILog, APILogProfile
+
+logger = logging.getLogger(__name__)
+
+# Set in worker processes by the launcher; None means write in-process.
+_log_queue: Optional[Any] = None
+
+
+def set_log_queue(log_queue: Optional[Any]) -> None:
+    """
+    Route log records to a queue consumed by the writer process.
+
+    Args:
+        log_queue: A `multiprocessing.Queue` shared with the writer, or None to
+            go back to writing records in-process.
+    """
+    global _log_queue
+    _log_queue = log_queue
+
+
+async def write_logs(records: List[Dict[str, Any]]) -> None:
+    """
+    Insert a batch of log records in a single transaction.
+
+    A record may carry a `profile` entry with the column values of an
+    `APILogProfile`, which is stored linked to the record's log row.
+
+    Args:
+        records (List[Dict[str, Any]]): Column values for each `APILog` row.
+    """
+    db = AsyncSessionLocal()
+    try:
+        logs = []
+        profiles = []
+        for record in records:
+            profile = record.get("profile")
+            log = APILog(**{key: value for key, value in record.items() if key != "profile"})
+            logs.append(log)
+            if profile is not None:
+                profiles.append((log, profile))
+        db.add_all(logs)
+        if profiles:
+            await db.flush()
+            db.add_all([APILogProfile(log_id=log.id, **profile) for log, profile in profiles])
+        await db.commit()
+    finally:
+        await db.close()
+
+
+async def persist_log(record: Dict[str, Any]) -> None:
+    """
+    Persist a single log record, handing it to the writer process if one is configured.
+
+    Records are dropped with a warning when the writer falls behind and the queue
+    is full, so request handling never blocks on logging.
+
+    Args:
+        record (Dict[str, Any]): Column values for an `APILog` row.
+    """
+    if _log_queue is None:
+        await write_logs([record])
+        return
+    try:
+        _log_queue.put_nowait(record)
+    except queue.Full:
+        logger.warning(
+            "Log queue full, dropping record for %s %s", record["method"], record["path"]
+        )
+
+
+async def drain_log_queue(log_queue: Any, batch_size: int = config.LOG_WRITER_BATCH_SIZE) -> int:
+    """
+    Consume records from `log_queue` and write them in batches until a `None` sentinel arrives.
+
+    Every record queued before the sentinel is written before returning.
+
+    Args:
+        log_queue: The queue shared with the workers.
+        batch_size (int): Maximum number of records written per transaction.
+
+    Returns:
+        int: The number of records written.
+    """
+    written = 0
+    stopping = False
+    while not stopping:
+        batch = [await asyncio.to_thread(log_queue.get)]
+        while batch[-1] is not None and len(batch) < batch_size:
+            try:
+                batch.append(log_queue.get_nowait())
+            except queue.Empty:
+                break
+        stopping = batch[-1] is None
+        records = [record for record in batch if record is not None]
+        if not records:
+            continue
+        try:
+            await write_logs(records)
+            written += len(records)
+        except Exception:  # pylint: disable=broad-exception-caught
+            logger.exception("Failed to write %d log record(s)", len(records))
+    return written
+
+
+def run_log_writer(log_queue: Any, ready: Optional[Any] = None) -> None:
+    """
+    Entry point of the writer process.
+
+    SIGINT and SIGTERM are ignored so that Ctrl+C in a terminal or a SIGTERM sent to
+    the whole process group does not stop the writer before the launcher has drained
+    the workers; the writer exits once `WorkerSupervisor.drain_writer` queues the
+    sentinel, or is killed if it does not drain in time.
+
+    Args:
+        log_queue: The `multiprocessing.Queue` shared with the workers.
+        ready: A `multiprocessing.Event` set once the signals are ignored; until
+            then, a signal sent to the process group still kills the writer.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    if ready is not None:
+        ready.set()
+    asyncio.run(drain_log_queue(log_queue))
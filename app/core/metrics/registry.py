@@ -0,0 +1,79 @@
+"""
+In-process metrics registry.
+
+Middleware and services record counters and timing summaries here; the current
+values are exported as JSON by `app.core.metrics.routes`. Values are per process,
+so each worker under the multi-worker launcher reports its own.
+"""
+
+from typing import Any, Dict
+
+
+class Summary:
+    """
+    Running count, total and maximum of an observed value.
+
+    Attributes:
+        count (int): Number of observations.
+        total (float): Sum of all observed values.
+        max (float): Largest observed value.
+    """
+
+    __slots__ = ("count", "total", "max")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.total / self.count if self.count else 0.0,
+            "max": self.max,
+        }
+
+
+class MetricsRegistry:
+    """
+    Named counters and summaries.
+
+    Names are dotted strings such as `admission.rejected.capacity`; metrics are
+    created on first use.
+    """
+
+    def __init__(self) -> None:
+        self._counters: Dict[str, float] = {}
+        self._summaries: Dict[str, Summary] = {}
+
+    def inc(self, name: str, amount: float = 1.0) -> None:
+        """Add `amount` to the counter `name`."""
+        self._counters[name] = self._counters.get(name, 0.0) + amount
+
+    def observe(self, name: str, value: float) -> None:
+        """Record one observation of `value` in the summary `name`."""
+        summary = self._summaries.get(name)
+        if summary is None:
+            summary = self._summaries[name] = Summary()
+        summary.observe(value)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the current value of every counter and summary."""
+        return {
+            "counters": dict(self._counters),
+            "summaries": {name: summary.as_dict() for name, summary in self._summaries.items()},
+        }
+
+    def reset(self) -> None:
+        self._counters.clear()
+        self._summaries.clear()
+
+
+metrics = MetricsRegistry()
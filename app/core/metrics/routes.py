@@ -0,0 +1,20 @@
+"""
+Routes for exporting in-process metrics.
+
+Endpoints:
+    - GET /admin/metrics: Returns every counter and summary as JSON.
+"""
+
+from typing import Any, Dict
+
+from fastapi import APIRouter
+
+from app.core.metrics.registry import metrics
+
+router = APIRouter(prefix="/admin/metrics", tags=["Metrics"])
+
+
+@router.get("")
+async def get_metrics() -> Dict[str, Any]:
+    """Return a snapshot of this process's metrics."""
+    return metrics.snapshot()
@@ -0,0 +1,104 @@
+"""
+ASGI middleware that profiles individual requests on demand.
+
+A request is profiled when it carries `X-Profile: <token>` matching
+`PROFILING_TOKEN`, or when it is picked at random by the sample rate of its path
+prefix (`PROFILING_SAMPLE_RATES`). The profile is handed to `LoggingMiddleware`
+through `request.state.profile` and stored next to the request's `APILog` entry;
+see `/admin/profiles`.
+
+Unlike the other middlewares this is a plain ASGI middleware: `BaseHTTPMiddleware`
+runs the wrapped app in a separate task, while `TaskSampler` attributes samples
+to the task it is started in. Install it innermost so that task is the one
+running the route. When profiling is disabled the middleware is not installed,
+so unprofiled deployments pay nothing.
+"""
+
+import hmac
+import random
+from typing import Dict, Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+import app.core.config as config
+from app.core.config import PrefixRules
+from app.core.metrics.registry import metrics
+from app.core.profiling.sampler import TaskSampler
+
+PROFILE_HEADER = b"x-profile"
+
+
+class ProfilingMiddleware:
+    """
+    Middleware that samples the stacks of selected requests.
+
+    Args:
+        app (ASGIApp): The wrapped application.
+        token (Optional[str]): Value of the 'X-Profile' header that requests a
+            profile; None disables header-triggered profiling.
+        sample_rates (Optional[Dict[str, float]]): Fraction of requests profiled per
+            path prefix; the longest matching prefix applies.
+        interval_ms (float): Sampling interval in milliseconds.
+        max_concurrent (int): Requests profiled at the same time; others run unprofiled.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        token: Optional[str] = config.PROFILING_TOKEN,
+        sample_rates: Optional[Dict[str, float]] = None,
+        interval_ms: float = config.PROFILING_INTERVAL_MS,
+        max_concurrent: int = config.PROFILING_MAX_CONCURRENT,
+    ) -> None:
+        self.app = app
+        self.token = token.encode() if token else None
+        self.sample_rates = PrefixRules(
+            config.PROFILING_SAMPLE_RATES if sample_rates is None else sample_rates
+        )
+        self.interval = interval_ms / 1000
+        self.max_concurrent = max_concurrent
+        self.active = 0
+
+    def _trigger(self, scope: Scope) -> Optional[str]:
+        if self.token is not None:
+            for name, value in scope["headers"]:
+                if name == PROFILE_HEADER and hmac.compare_digest(value, self.token):
+                    return "header"
+        rate = self.sample_rates.match(scope["path"])
+        if rate is not None and random.random() < rate:
+            return "sampled"
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        trigger = self._trigger(scope) if scope["type"] == "http" else None
+        if trigger is None or self.active >= self.max_concurrent:
+            await self.app(scope, receive, send)
+            return
+
+        self.active += 1
+        sampler = TaskSampler(self.interval)
+        finished = False
+
+        def finish() -> None:
+            nonlocal finished
+            if finished:
+                return
+            finished = True
+            sampler.stop()
+            self.active -= 1
+            scope.setdefault("state", {})["profile"] = sampler.profile(trigger)
+            metrics.inc(f"profiling.profiles.{trigger}")
+            metrics.observe("profiling.duration_ms", sampler.duration * 1000)
+
+        async def send_profiled(message: Message) -> None:
+            # LoggingMiddleware builds the log record as soon as the last body chunk
+            # arrives, so the profile has to be in place before it is sent.
+            if message["type"] == "http.response.body" and not message.get("more_body"):
+                finish()
+            await send(message)
+
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_profiled)
+        finally:
+            finish()
@@ -0,0 +1,85 @@
+"""
+Routes for viewing stored request profiles via a web-based interface.
+
+Endpoints:
+    - GET /admin/profiles: Lists recent profiled requests.
+    - GET /admin/profiles/{profile_id}: Shows a profile as a sorted function table.
+    - GET /admin/profiles/{profile_id}/collapsed: Returns the profile's collapsed
+      stacks as plain text, for flame graph tools such as speedscope or flamegraph.pl.
+"""
+
+from math import ceil
+from typing import Any, Tuple
+
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import HTMLResponse, PlainTextResponse
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_async_session
+from app.core.exceptions import NotFound
+from app.core.logging.models import APILog, APILogProfile
+from app.core.templates import get_templates
+
+router = APIRouter(prefix="/admin/profiles", tags=["Profiles"])
+
+
+async def _get_profile(session: AsyncSession, profile_id: int) -> Tuple[APILogProfile, APILog]:
+    result = await session.execute(
+        select(APILogProfile, APILog)
+        .join(APILog, APILog.id == APILogProfile.log_id)
+        .where(APILogProfile.id == profile_id)
+    )
+    row = result.one_or_none()
+    if row is None:
+        raise NotFound("Profile Not Found!")
+    return row[0], row[1]
+
+
+@router.get("", response_class=HTMLResponse)
+async def get_profiles(
+    request: Request,
+    page: int = Query(1, ge=1),
+    per_page: int = Query(25, le=100),
+    session: AsyncSession = Depends(get_async_session),
+) -> Any:
+    """Render the list of profiled requests, most recent first."""
+    count_stmt = select(func.count()).select_from(APILogProfile)  # pylint: disable=not-callable
+    total = (await session.execute(count_stmt)).scalar() or 0
+    result = await session.execute(
+        select(APILogProfile, APILog)
+        .join(APILog, APILog.id == APILogProfile.log_id)
+        .order_by(APILog.created_at.desc())
+        .offset((page - 1) * per_page)
+        .limit(per_page)
+    )
+    return get_templates().TemplateResponse(
+        "profiles.html",
+        {
+            "request": request,
+            "rows": result.all(),
+            "page": page,
+            "total_pages": max(1, ceil(total / per_page)),
+            "per_page": per_page,
+        },
+    )
+
+
+@router.get("/{profile_id}", response_class=HTMLResponse)
+async def get_profile(
+    request: Request, profile_id: int, session: AsyncSession = Depends(get_async_session)
+) -> Any:
+    """Render one profile as a table of functions sorted by self time."""
+    profile, log = await _get_profile(session, profile_id)
+    return get_templates().TemplateResponse(
+        "profile.html", {"request": request, "profile": profile, "log": log}
+    )
+
+
+@router.get("/{profile_id}/collapsed", response_class=PlainTextResponse)
+async def get_profile_stacks(
+    profile_id: int, session: AsyncSession = Depends(get_async_session)
+) -> Any:
+    """Return the profile's samples in collapsed-stack format."""
+    profile, _ = await _get_profile(session, profile_id)
+    return PlainTextResponse(profile.stacks + "\n")
@@ -0,0 +1,148 @@
+"""
+Wall-clock sampling profiler scoped to a single asyncio task.
+
+A background thread wakes up every interval and records where the profiled task
+is: if the task is running on the event loop, the loop thread's current Python
+stack (including synchronous calls made by the task); otherwise the chain of
+coroutines the task is suspended in, ending in an `[await]` marker. Other
+requests served concurrently by the same loop are never attributed to the task.
+
+Work the task hands to other threads (e.g. `anyio.to_thread`) shows up as time
+spent awaiting, at the call that offloaded it.
+"""
+
+# pylint: disable=protected-access
+
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from types import CodeType, FrameType
+from typing import Any, Dict, List, Optional
+
+AWAIT_MARKER = "[await]"
+
+# Number of functions kept in a profile's summary table.
+MAX_FUNCTIONS = 100
+
+
+def _label(code: CodeType) -> str:
+    path = os.path.relpath(code.co_filename) if os.path.isabs(code.co_filename) else ""
+    if path.startswith(".."):
+        path = os.path.join(*code.co_filename.split(os.sep)[-2:])
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{name} ({path or code.co_filename}:{code.co_firstlineno})"
+
+
+def _running_stack(frame: Optional[FrameType], root: Optional[CodeType]) -> List[str]:
+    """Labels of the loop thread's frames from the task's root coroutine down."""
+    codes: List[CodeType] = []
+    while frame is not None:
+        codes.append(frame.f_code)
+        if frame.f_code is root:
+            break
+        frame = frame.f_back
+    return [_label(code) for code in reversed(codes)]
+
+
+def _suspended_stack(coroutine: Any) -> List[str]:
+    """Labels of a suspended task's coroutine chain, outermost first."""
+    labels = []
+    while coroutine is not None:
+        frame = getattr(coroutine, "cr_frame", None) or getattr(coroutine, "gi_frame", None)
+        if frame is None:
+            break
+        labels.append(_label(frame.f_code))
+        coroutine = getattr(coroutine, "cr_await", None) or getattr(coroutine, "gi_yieldfrom", None)
+    labels.append(AWAIT_MARKER)
+    return labels
+
+
+class TaskSampler:
+    """
+    Samples the stack of one asyncio task from a background thread.
+
+    Create and start it from inside the task to profile.
+
+    Args:
+        interval (float): Seconds between samples.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        task = asyncio.current_task()
+        if task is None:
+            raise RuntimeError("TaskSampler must be created inside an asyncio task")
+        self.task = task
+        self.loop = asyncio.get_running_loop()
+        self.root = getattr(self.task.get_coro(), "cr_code", None)
+        self.samples: "Counter[str]" = Counter()
+        self.running_samples = 0
+        self.duration = 0.0
+        self._thread_id = threading.get_ident()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="task-sampler", daemon=True)
+        self._started = 0.0
+
+    def start(self) -> None:
+        self._started = time.perf_counter()
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.duration = time.perf_counter() - self._started
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def sample(self) -> None:
+        """Record the task's current stack once."""
+        if asyncio.current_task(self.loop) is self.task:
+            stack = _running_stack(sys._current_frames().get(self._thread_id), self.root)
+            self.running_samples += 1
+        else:
+            stack = _suspended_stack(self.task.get_coro())
+        if stack:
+            self.samples[";".join(stack)] += 1
+
+    def collapsed(self) -> str:
+        """Samples in collapsed-stack format, heaviest stacks first."""
+        return "\n".join(f"{stack} {count}" for stack, count in self.samples.most_common())
+
+    def functions(self) -> List[Dict[str, Any]]:
+        """Self and total (inclusive) samples per function, sorted by self samples."""
+        own: "Counter[str]" = Counter()
+        total: "Counter[str]" = Counter()
+        for stack, count in self.samples.items():
+            frames = stack.split(";")
+            own[frames[-1]] += count
+            for frame in set(frames):
+                total[frame] += count
+        sample_count = sum(self.samples.values()) or 1
+        ranked = sorted(total, key=lambda name: (-own[name], -total[name], name))
+        return [
+            {
+                "function": name,
+                "self_samples": own[name],
+                "self_pct": round(100 * own[name] / sample_count, 1),
+                "total_samples": total[name],
+                "total_pct": round(100 * total[name] / sample_count, 1),
+            }
+            for name in ranked[:MAX_FUNCTIONS]
+        ]
+
+    def profile(self, trigger: str) -> Dict[str, Any]:
+        """Column values of an `APILogProfile` for the collected samples."""
+        return {
+            "trigger": trigger,
+            "duration_ms": round(self.duration * 1000, 3),
+            "interval_ms": self.interval * 1000,
+            "sample_count": sum(self.samples.values()),
+            "running_samples": self.running_samples,
+            "functions": self.functions(),
+            "stacks": self.collapsed(),
+        }
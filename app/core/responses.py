@@ -0,0 +1,149 @@
+"""
+Fast JSON serialization for read-only responses.
+
+FastAPI normally validates every returned ORM object against the route's
+`response_model` and then encodes the result with the stdlib JSON encoder. For
+data read straight from the database that validation is redundant. The helpers
+here serialize plain row mappings (see `BaseDAO.get_all_rows`) to JSON bytes
+using a precompiled pydantic `TypeAdapter` instead, producing exactly the bytes
+FastAPI would have sent.
+
+Sparse fieldsets (`?fields=id,email`) use the same path: `select_fields` validates
+the requested names against the response schema, and `sparse_serializer` returns
+a cached serializer for a schema generated with just those fields.
+
+Middlewares that store responses for later replay (the response cache and
+idempotency keys) buffer them with `buffer_response` and rebuild them with
+`stored_response`, keeping the raw header list so repeated headers survive.
+"""
+
+# pylint: disable=invalid-name
+
+from functools import lru_cache
+from typing import (
+    Any,
+    Dict,
+    Generic,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    TypeVar,
+)
+
+from pydantic import BaseModel, TypeAdapter, create_model
+from starlette.responses import Response
+from typing_extensions import TypedDict
+
+TSchema = TypeVar("TSchema", bound=BaseModel)
+
+
+class JSONBytesResponse(Response):
+    """Response whose content is already-encoded JSON bytes."""
+
+    media_type = "application/json"
+
+
+async def buffer_response(response: Response) -> Response:
+    """
+    Read the body of a streamed response, such as the one `call_next` returns.
+
+    Args:
+        response (Response): The streamed response; its body iterator is consumed.
+
+    Returns:
+        Response: The same status, raw headers and body, held in memory.
+    """
+    body_iterator = response.body_iterator  # type: ignore[attr-defined]
+    body = b"".join([chunk async for chunk in body_iterator])
+    return stored_response(response.status_code, response.headers.items(), body)
+
+
+def stored_response(status_code: int, headers: Sequence[Tuple[str, str]], body: bytes) -> Response:
+    """Response with exactly `headers`, in order, keeping repeated names such as `set-cookie`."""
+    response = Response(content=body, status_code=status_code)
+    response.raw_headers = [
+        (name.encode("latin-1"), value.encode("latin-1")) for name, value in headers
+    ]
+    return response
+
+
+class RowSerializer(Generic[TSchema]):
+    """
+    Serializes database rows shaped like `schema` without validating them.
+
+    Rows are described by a TypedDict mirroring the schema's fields, so pydantic-core
+    encodes them directly instead of building a model instance per row. Rows must
+    contain exactly `fields`, in that order, which `BaseDAO.get_all_rows(columns=...)`
+    guarantees; the output then matches FastAPI's encoding of `schema` byte for byte.
+
+    Args:
+        schema (Type[TSchema]): The response schema whose JSON output is reproduced.
+    """
+
+    def __init__(self, schema: Type[TSchema]):
+        self.schema = schema
+        self.fields: Tuple[str, ...] = tuple(schema.model_fields)
+        row_type: Any = TypedDict(  # type: ignore[misc]
+            f"{schema.__name__}Row",
+            {name: field.annotation for name, field in schema.model_fields.items()},
+        )
+        self._row_adapter: TypeAdapter[Any] = TypeAdapter(row_type)
+        list_type: Any = List[row_type]  # type: ignore[valid-type]
+        self._list_adapter: TypeAdapter[Any] = TypeAdapter(list_type)
+
+    def dump_row(self, row: Mapping[str, Any]) -> bytes:
+        """Encode a single row as a JSON object."""
+        return self._row_adapter.dump_json(row)
+
+    def dump_rows(self, rows: Sequence[Dict[str, Any]]) -> bytes:
+        """Encode a list of rows as a JSON array."""
+        return self._list_adapter.dump_json(rows)
+
+
+def select_fields(schema: Type[BaseModel], fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """
+    Parse a comma-separated sparse fieldset against a response schema.
+
+    Args:
+        schema (Type[BaseModel]): The full response schema.
+        fields (Optional[str]): Requested field names, e.g. 'id,email'.
+
+    Returns:
+        Optional[Tuple[str, ...]]: The distinct requested fields in schema order, or
+        None if no fieldset was requested or it covers every field.
+
+    Raises:
+        ValueError: If the fieldset is empty or names an unknown field.
+    """
+    if fields is None:
+        return None
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    if not requested:
+        raise ValueError("fields must name at least one field")
+    unknown = requested.difference(schema.model_fields)
+    if unknown:
+        raise ValueError(
+            f"Unknown fields: {', '.join(sorted(unknown))}; "
+            f"expected any of: {', '.join(schema.model_fields)}"
+        )
+    if len(requested) == len(schema.model_fields):
+        return None
+    return tuple(name for name in schema.model_fields if name in requested)
+
+
+@lru_cache(maxsize=128)
+def partial_schema(schema: Type[TSchema], fields: Tuple[str, ...]) -> Type[BaseModel]:
+    """A model with only `fields` of `schema`, with the same types, in that order."""
+    definitions: Dict[str, Any] = {
+        name: (schema.model_fields[name].annotation, ...) for name in fields
+    }
+    return create_model(f"{schema.__name__}_{'_'.join(fields)}", **definitions)
+
+
+@lru_cache(maxsize=128)
+def sparse_serializer(schema: Type[TSchema], fields: Tuple[str, ...]) -> RowSerializer[BaseModel]:
+    """The serializer for rows holding `fields` of `schema`, built once per fieldset."""
+    return RowSerializer(partial_schema(schema, fields))
@@ -5,7 +5,10 @@ Module for registering routes in the FastAPI application.
 from fastapi import FastAPI
 
 from app.users.routes import router as user_router
+from app.core.eventloop.routes import router as eventloop_router
 from app.core.logging.routes import router as logging_router
+from app.core.metrics.routes import router as metrics_router
+from app.core.profiling.routes import router as profiling_router
 
 
 def register_routes(app: FastAPI) -> None:
@@ -17,3 +20,6 @@ def register_routes(app: FastAPI) -> None:
     """
     app.include_router(user_router)
     app.include_router(logging_router)
+    app.include_router(metrics_router)
+    app.include_router(profiling_router)
+    app.include_router(eventloop_router)
@@ -5,22 +5,89 @@ This module initializes the FastAPI application, sets up the database,
 includes routers, and defines custom exception handlers.
 """
 
-from typing import AsyncGenerator
+import logging
+import time
+from typing import AsyncGenerator, Dict, Iterator
 from fastapi import FastAPI
-from contextlib import asynccontextmanager
-from app.core.database import init_db
+from contextlib import asynccontextmanager, contextmanager
+import app.core.config as config
+from app.core.database import init_db, warm_up_pool
 from app.core.router import register_routes
 from app.core.logging.middleware import LoggingMiddleware
+from app.core.admission.middleware import AdmissionMiddleware
+from app.core.cache.middleware import ResponseCacheMiddleware
+from app.core.compression.middleware import CompressionMiddleware
+from app.core.eventloop.middleware import LoopMonitorMiddleware
+from app.core.eventloop.monitor import loop_monitor
+from app.core.idempotency.middleware import IdempotencyMiddleware
+from app.core.profiling.middleware import ProfilingMiddleware
+from app.core.sharding.router import enable_sharding
+
+logger = logging.getLogger(__name__)
+
+
+@contextmanager
+def _timed(timings: Dict[str, float], phase: str) -> Iterator[None]:
+    """Record the wall time of the enclosed block, in milliseconds, under `phase`."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[phase] = (time.perf_counter() - start) * 1000
 
 
 @asynccontextmanager
-async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:  # pylint: disable=unused-argument
-    await init_db()
+async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
+    timings: Dict[str, float] = app.state.startup_timings
+    with _timed(timings, "init_db"):
+        schema_created = await init_db()
+        shard_router = getattr(app.state, "shard_router", None)
+        if shard_router is not None:
+            await shard_router.create_schema()
+    with _timed(timings, "pool_warmup"):
+        warmed = await warm_up_pool(config.DB_POOL_WARMUP)
+    logger.info(
+        "Startup finished in %.1f ms (%s); schema %s, %d pooled connection(s) opened",
+        sum(timings.values()),
+        ", ".join(f"{phase}={ms:.1f}ms" for phase, ms in timings.items()),
+        "created" if schema_created else "unchanged",
+        warmed,
+    )
+    if config.LOOP_MONITOR_ENABLED:
+        loop_monitor.start()
     yield
+    await loop_monitor.stop()
+    if shard_router is not None:
+        await shard_router.dispose()
 
 
 def create_app() -> FastAPI:
-    app = FastAPI(lifespan=lifespan)
-    app.add_middleware(LoggingMiddleware)
-    register_routes(app)
+    timings: Dict[str, float] = {}
+    with _timed(timings, "create_app"):
+        app = FastAPI(lifespan=lifespan)
+        if config.SHARD_URLS:
+            app.state.shard_router = enable_sharding(config.SHARD_URLS)
+        if config.PROFILING_ENABLED:
+            # Innermost, so the profiled task is the one running the route.
+            app.add_middleware(ProfilingMiddleware, token=config.PROFILING_TOKEN)
+        if config.RESPONSE_CACHE_ENABLED:
+            # Inside LoggingMiddleware, so cache hits are still logged.
+            app.add_middleware(ResponseCacheMiddleware)
+        if config.IDEMPOTENCY_ENABLED:
+            # Inside LoggingMiddleware too, so replays are logged.
+            app.add_middleware(IdempotencyMiddleware)
+        if config.REQUEST_LOGGING_ENABLED:
+            app.add_middleware(LoggingMiddleware)
+        if config.COMPRESSION_ENABLED:
+            # Outside LoggingMiddleware, so logged bodies stay uncompressed.
+            app.add_middleware(CompressionMiddleware)
+        if config.LOOP_MONITOR_ENABLED:
+            # Outside every middleware but admission, so their work is attributed to
+            # the request when the loop stalls.
+            app.add_middleware(LoopMonitorMiddleware)
+        if config.ADMISSION_ENABLED:
+            # Added last so it is outermost: rejected requests skip all other work.
+            app.add_middleware(AdmissionMiddleware)
+        register_routes(app)
+    app.state.startup_timings = timings
     return app
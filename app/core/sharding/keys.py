@@ -0,0 +1,96 @@
+"""
+Bucket, shard and identifier arithmetic for hash-sharded storage.
+
+Rows are spread over a fixed number of logical buckets, and buckets over shards
+with jump consistent hashing, so growing or shrinking the shard list at its end
+only moves the buckets that change owner. A new row is placed in the bucket of
+its shard key (e.g. the user's email), and the bucket is encoded in its ID:
+
+    id = bucket_sequence * BUCKET_COUNT + bucket
+
+`bucket_sequence` is a per-bucket counter stored next to the bucket's rows, so IDs
+are globally unique without any coordination between shards, and any ID routes to
+its shard with no lookup. IDs stay well below 2**53, so JavaScript clients can
+read them as numbers.
+
+Change log sequence numbers must order changes across shards. In sharded mode
+they are ticks of a 10-microsecond clock, allocated per shard so they never go
+backwards, with the shard index in the low bits. They are allocated as a shard
+commits, so they follow commit order:
+
+    seq = tick << SHARD_BITS | shard_index
+"""
+
+import hashlib
+import time
+from typing import Optional
+
+# Fixed for the lifetime of a deployment: IDs encode their bucket.
+BUCKET_COUNT = 1024
+
+# Change sequence numbers reserve this many low bits for the shard index.
+SHARD_BITS = 4
+MAX_SHARDS = 1 << SHARD_BITS
+
+# Change sequence clock: 10 microsecond ticks since 2025-01-01 UTC.
+_SEQ_EPOCH = 1735689600.0
+_SEQ_TICK = 1e-5
+
+
+def bucket_for_key(key: str) -> int:
+    """Bucket of a shard key value."""
+    digest = hashlib.blake2b(key.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % BUCKET_COUNT
+
+
+def bucket_for_id(object_id: int) -> int:
+    """Bucket encoded in an ID."""
+    return object_id % BUCKET_COUNT
+
+
+def make_id(bucket_sequence: int, bucket: int) -> int:
+    """ID of the `bucket_sequence`-th row created in `bucket`."""
+    return bucket_sequence * BUCKET_COUNT + bucket
+
+
+def jump_hash(key: int, num_buckets: int) -> int:
+    """
+    Jump consistent hash (Lamping and Veach, 2014).
+
+    Maps `key` to one of `num_buckets` slots such that going from n to n + 1 slots
+    only moves about 1 / (n + 1) of the keys, all of them to the new slot.
+    """
+    slot, candidate = -1, 0
+    while candidate < num_buckets:
+        slot = candidate
+        key = (key * 2862933555777941757 + 1) & 0xFFFFFFFFFFFFFFFF
+        candidate = int((slot + 1) * (float(1 << 31) / float((key >> 33) + 1)))
+    return slot
+
+
+def shard_for_bucket(bucket: int, shard_count: int) -> int:
+    """Index of the shard that owns `bucket`."""
+    return jump_hash(bucket, shard_count)
+
+
+def change_seq_tick(now: Optional[float] = None) -> int:
+    """Change sequence clock reading for a wall-clock time, by default now."""
+    return int(((time.time() if now is None else now) - _SEQ_EPOCH) / _SEQ_TICK)
+
+
+def make_change_seq(tick: int, shard_index: int) -> int:
+    """Change sequence number allocated at `tick` on the given shard."""
+    return tick << SHARD_BITS | shard_index
+
+
+def change_seq_watermark(settle_seconds: float, now: Optional[float] = None) -> int:
+    """
+    Highest change sequence number that is safe to hand to readers.
+
+    Sequence numbers are taken by the last statement of a shard's transaction,
+    just before SQLite commits it (see `app.core.sharding.router`). A number at or
+    below the watermark was thus taken at least `settle_seconds` ago, and its
+    change is committed unless that final commit itself took longer than that.
+    """
+    now = time.time() if now is None else now
+    return make_change_seq(change_seq_tick(now - settle_seconds), MAX_SHARDS - 1)
@@ -0,0 +1,49 @@
+"""
+SQLAlchemy models for the bookkeeping tables kept on every shard.
+
+Tables:
+    - shard_counters: Per-bucket ID sequences ('bucket:<n>', moved with the bucket
+      by rebalancing) and the shard's change sequence clock ('change_seq').
+    - shard_key_aliases: Shard keys whose owner lives outside the key's bucket,
+      because the key changed after the row was created. Each alias is stored in
+      the bucket of its key, so lookups by key and uniqueness checks stay on the
+      key's shard.
+"""
+
+from sqlalchemy import String
+from sqlalchemy.orm import Mapped, mapped_column
+from app.core.database import Base
+
+
+class ShardCounterModel(Base):
+    """
+    ORM model for a counter stored on a shard.
+
+    Attributes:
+        name (str): Counter name.
+        value (int): Last value handed out.
+    """
+
+    __tablename__ = "shard_counters"
+
+    name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    value: Mapped[int]
+
+
+class ShardKeyAliasModel(Base):
+    """
+    ORM model mapping a shard key to a row stored outside the key's bucket.
+
+    Attributes:
+        entity (str): Table of the row, e.g. 'users'.
+        key (str): The shard key value, e.g. an email address.
+        object_id (int): ID of the row that owns the key.
+        bucket (int): Bucket of `key`, which decides where the alias is stored.
+    """
+
+    __tablename__ = "shard_key_aliases"
+
+    entity: Mapped[str] = mapped_column(String(64), primary_key=True)
+    key: Mapped[str] = mapped_column(String(255), primary_key=True)
+    object_id: Mapped[int]
+    bucket: Mapped[int] = mapped_column(index=True)
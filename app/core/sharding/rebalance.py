@@ -0,0 +1,135 @@
+"""
+Offline rebalancing of sharded storage after the shard list changed.
+
+Shards may only be appended to or removed from the end of `SHARD_URLS`. Jump
+consistent hashing then only moves the buckets whose owner changed: when growing
+from n to n + 1 shards, about 1 / (n + 1) of every old shard moves to the new one.
+Rows are copied to their new shard and deleted from the old one in batches, each
+committed on the target before the source, so an interrupted run can simply be
+restarted. Stop the API while it runs.
+
+Usage:
+    python -m app.core.sharding.rebalance --from-urls URL1,URL2 --to-urls URL1,URL2,URL3
+"""
+
+import argparse
+import asyncio
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy import RowMapping, Table, delete, select, tuple_
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from app.core.changes.models import ChangeLogModel
+from app.core.database import create_database_engine
+from app.core.sharding.keys import bucket_for_id, shard_for_bucket
+from app.core.sharding.models import ShardCounterModel, ShardKeyAliasModel
+from app.core.sharding.router import ShardRouter, shard_tables
+
+BATCH_SIZE = 1000
+
+
+def _row_bucket(table: Table, row: RowMapping) -> Optional[int]:
+    """Bucket a row of a shard table belongs to, or None for per-shard rows."""
+    if table is ShardCounterModel.__table__:
+        prefix, _, bucket = row["name"].partition(":")
+        return int(bucket) if prefix == "bucket" else None
+    if table is ShardKeyAliasModel.__table__:
+        return row["bucket"]
+    if table is ChangeLogModel.__table__:
+        return bucket_for_id(row["entity_id"])
+    return bucket_for_id(row["id"])
+
+
+async def _move_table(
+    table: Table, index: int, engines: Sequence[AsyncEngine], shard_count: int
+) -> int:
+    """Move the rows of one table off shard `index` that now belong elsewhere."""
+    primary_key = tuple_(*table.primary_key.columns)
+    moved = 0
+    last: Optional[RowMapping] = None
+    async with engines[index].connect() as source:
+        while True:
+            statement = select(table).order_by(*table.primary_key.columns).limit(BATCH_SIZE)
+            if last is not None:
+                statement = statement.where(
+                    primary_key > tuple_(*(last[c.name] for c in table.primary_key))
+                )
+            rows = (await source.execute(statement)).mappings().all()
+            await source.commit()
+            if not rows:
+                return moved
+            last = rows[-1]
+            moves: Dict[int, List[RowMapping]] = {}
+            for row in rows:
+                bucket = _row_bucket(table, row)
+                target = shard_for_bucket(bucket, shard_count) if bucket is not None else index
+                if target != index:
+                    moves.setdefault(target, []).append(row)
+            for target, target_rows in moves.items():
+                await _copy_and_delete(table, source, engines[target], target_rows)
+                moved += len(target_rows)
+
+
+async def _copy_and_delete(
+    table: Table, source: AsyncConnection, target: AsyncEngine, rows: List[RowMapping]
+) -> None:
+    async with target.begin() as conn:
+        await conn.execute(
+            sqlite_insert(table).on_conflict_do_nothing(), [dict(row) for row in rows]
+        )
+    primary_key = tuple_(*table.primary_key.columns)
+    keys = [tuple(row[column.name] for column in table.primary_key) for row in rows]
+    await source.execute(delete(table).where(primary_key.in_(keys)))
+    await source.commit()
+
+
+async def rebalance(from_urls: Sequence[str], to_urls: Sequence[str]) -> Dict[str, int]:
+    """
+    Move rows between shards after `SHARD_URLS` changed from `from_urls` to `to_urls`.
+
+    Args:
+        from_urls (Sequence[str]): The shard URLs the data was written with.
+        to_urls (Sequence[str]): The new shard URLs.
+
+    Returns:
+        Dict[str, int]: Number of rows moved, per table.
+
+    Raises:
+        ValueError: If one list is not a prefix of the other.
+    """
+    common = min(len(from_urls), len(to_urls))
+    if list(from_urls[:common]) != list(to_urls[:common]):
+        raise ValueError("Shards can only be added or removed at the end of the list")
+    urls = from_urls if len(from_urls) > len(to_urls) else to_urls
+    engines = [create_database_engine(url) for url in urls]
+    moved = {table.name: 0 for table in shard_tables()}
+    try:
+        await ShardRouter(engines[: len(to_urls)]).create_schema()
+        for index in range(len(from_urls)):
+            for table in shard_tables():
+                moved[table.name] += await _move_table(table, index, engines, len(to_urls))
+    finally:
+        for engine in engines:
+            await engine.dispose()
+    return moved
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Parse command-line options and rebalance the shards."""
+    parser = argparse.ArgumentParser(description="Move sharded rows after SHARD_URLS changed.")
+    parser.add_argument("--from-urls", required=True, help="Previous comma-separated SHARD_URLS")
+    parser.add_argument("--to-urls", required=True, help="New comma-separated SHARD_URLS")
+    args = parser.parse_args(argv)
+    from_urls = [url.strip() for url in args.from_urls.split(",") if url.strip()]
+    to_urls = [url.strip() for url in args.to_urls.split(",") if url.strip()]
+    try:
+        moved = asyncio.run(rebalance(from_urls, to_urls))
+    except ValueError as exc:
+        parser.error(str(exc))
+    for name, count in moved.items():
+        print(f"{name}: {count} row(s) moved")
+
+
+if __name__ == "__main__":
+    main()
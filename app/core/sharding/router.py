@@ -0,0 +1,259 @@
+"""
+Routing of sharded tables across several SQLite databases.
+
+A table is sharded by setting `table.info["shard_key"]` to the name of the column
+whose hash places new rows (see `app.core.sharding.keys`). Sharded tables, the
+change log and the shard bookkeeping tables live on every shard database; all
+other tables stay in the main database.
+
+Sessions are SQLAlchemy `ShardedSession`s: a single session spans the main
+database and every shard. Objects are flushed to the shard encoded in their ID,
+`session.get` goes straight to that shard, and statements that do not name a
+shard run on the main database, or on every shard for sharded models. `BaseDAO`
+finds the router in `session.info` and names shards explicitly. Each shard has
+its own write lock, so writes to different shards run in parallel. A commit
+touching several shards commits them one after another, and is not atomic across
+them.
+"""
+
+from functools import partial
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from sqlalchemy import Connection, Table, bindparam, event, func, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession
+from sqlalchemy.ext.horizontal_shard import ShardedSession
+from sqlalchemy.orm import Mapper, ORMExecuteState
+
+from app.core.changes.models import ChangeLogModel
+from app.core.database import (
+    AsyncSessionLocal,
+    Base,
+    add_missing_columns,
+    create_database_engine,
+    engine,
+)
+from app.core.sharding.keys import (
+    MAX_SHARDS,
+    SHARD_BITS,
+    bucket_for_id,
+    bucket_for_key,
+    change_seq_tick,
+    make_change_seq,
+    make_id,
+    shard_for_bucket,
+)
+from app.core.sharding.models import ShardCounterModel, ShardKeyAliasModel
+
+SHARD_KEY_INFO = "shard_key"
+MAIN_SHARD = "main"
+
+_CHANGE_SEQ_COUNTER = "change_seq"
+# Key in a shard connection's `info` counting the change entries awaiting a number.
+_PENDING_CHANGE_SEQS = "pending_change_seqs"
+
+
+def shard_key(table: Table) -> Optional[str]:
+    """Name of the shard key column of a sharded table, or None for unsharded tables."""
+    return table.info.get(SHARD_KEY_INFO)
+
+
+def shard_tables() -> List[Table]:
+    """Tables created on every shard database."""
+    tables = [table for table in Base.metadata.sorted_tables if shard_key(table)]
+    return tables + [
+        ChangeLogModel.__table__,
+        ShardCounterModel.__table__,
+        ShardKeyAliasModel.__table__,
+    ]
+
+
+def _counter_upsert(value: Any) -> Any:
+    """`INSERT ... ON CONFLICT` bumping a named counter and returning its new value."""
+    counters = ShardCounterModel.__table__
+    statement = sqlite_insert(counters).values(
+        name=bindparam("name"), value=bindparam("start") + bindparam("count")
+    )
+    return statement.on_conflict_do_update(
+        index_elements=["name"], set_={"value": value + bindparam("count")}
+    ).returning(counters.c.value)
+
+
+# The ID sequence of a bucket grows by one per row; the change sequence clock
+# never goes backwards and jumps ahead to the current tick.
+_NEXT_IDS = _counter_upsert(ShardCounterModel.__table__.c.value)
+_NEXT_CHANGE_SEQS = _counter_upsert(
+    func.max(ShardCounterModel.__table__.c.value, bindparam("start"))
+)
+
+
+def _assign_change_seqs(shard_index: int, connection: Connection) -> None:
+    """
+    Replace a committing transaction's placeholder change sequence numbers.
+
+    Runs as the transaction's last statements, right before SQLite commits it. The
+    change sequence counter update takes the shard's write lock, so a change is
+    numbered no earlier than the moment it commits, however long the rest of the
+    session's commit took.
+    """
+    count = connection.info.pop(_PENDING_CHANGE_SEQS, 0)
+    if not count:
+        return
+    params = {"name": _CHANGE_SEQ_COUNTER, "start": change_seq_tick(), "count": count}
+    last = connection.execute(_NEXT_CHANGE_SEQS, params).scalar_one()
+    first = make_change_seq(last - count + 1, shard_index)
+    seq = ChangeLogModel.__table__.c.seq
+    # Placeholder -1 - k becomes the k-th number reserved.
+    connection.execute(
+        update(ChangeLogModel.__table__)
+        .where(seq < 0)
+        .values(seq=first - (seq + 1) * (1 << SHARD_BITS))
+    )
+
+
+def _discard_change_seqs(connection: Connection) -> None:
+    connection.info.pop(_PENDING_CHANGE_SEQS, None)
+
+
+class ShardRouter:
+    """
+    Maps buckets, IDs and shard keys to shard databases.
+
+    Args:
+        engines (Sequence[AsyncEngine]): One engine per shard, in `SHARD_URLS` order.
+        main (AsyncEngine): Engine of the main database, for unsharded tables.
+
+    Raises:
+        ValueError: If there are no shards, or more than change sequence numbers can encode.
+    """
+
+    def __init__(self, engines: Sequence[AsyncEngine], main: AsyncEngine = engine):
+        if not 0 < len(engines) <= MAX_SHARDS:
+            raise ValueError(f"Between 1 and {MAX_SHARDS} shards are supported")
+        self.engines = list(engines)
+        self.main = main
+        self.shard_ids = [f"shard{index}" for index in range(len(engines))]
+        for index, shard in enumerate(self.engines):
+            event.listen(shard.sync_engine, "commit", partial(_assign_change_seqs, index))
+            event.listen(shard.sync_engine, "rollback", _discard_change_seqs)
+
+    def shard_for_bucket(self, bucket: int) -> str:
+        return self.shard_ids[shard_for_bucket(bucket, len(self.shard_ids))]
+
+    def shard_for_id(self, object_id: int) -> str:
+        return self.shard_for_bucket(bucket_for_id(object_id))
+
+    def shard_for_key(self, key: str) -> str:
+        return self.shard_for_bucket(bucket_for_key(key))
+
+    def shard_index(self, shard_id: str) -> int:
+        return self.shard_ids.index(shard_id)
+
+    def _shard_chooser(self, mapper: Mapper[Any], instance: Any, clause: Any = None) -> str:
+        # pylint: disable=unused-argument
+        if shard_key(mapper.local_table):  # type: ignore[arg-type]
+            return self.shard_for_id(instance.id)
+        return MAIN_SHARD
+
+    def _identity_chooser(
+        self, mapper: Mapper[Any], primary_key: Sequence[Any], **kw: Any
+    ) -> List[str]:
+        # pylint: disable=unused-argument
+        if shard_key(mapper.local_table):  # type: ignore[arg-type]
+            return [self.shard_for_id(primary_key[0])]
+        return [MAIN_SHARD]
+
+    def _execute_chooser(self, orm_context: ORMExecuteState) -> Iterable[str]:
+        mapper = orm_context.bind_mapper
+        if mapper is not None and shard_key(mapper.local_table):  # type: ignore[arg-type]
+            return self.shard_ids
+        return [MAIN_SHARD]
+
+    def session_options(self) -> Dict[str, Any]:
+        """Keyword arguments that make a session factory create sharded sessions."""
+        shards = {MAIN_SHARD: self.main.sync_engine}
+        shards.update(
+            (shard_id, shard.sync_engine) for shard_id, shard in zip(self.shard_ids, self.engines)
+        )
+        return {
+            "bind": None,
+            "sync_session_class": ShardedSession,
+            "shards": shards,
+            "shard_chooser": self._shard_chooser,
+            "identity_chooser": self._identity_chooser,
+            "execute_chooser": self._execute_chooser,
+            "info": {"shard_router": self},
+        }
+
+    async def create_schema(self) -> None:
+        """Create the sharded and bookkeeping tables on every shard, or add their new columns."""
+        for shard in self.engines:
+            async with shard.begin() as conn:
+                await conn.run_sync(add_missing_columns, shard_tables())
+                await conn.run_sync(Base.metadata.create_all, tables=shard_tables())
+
+    async def allocate_ids(self, session: AsyncSession, bucket: int, count: int) -> List[int]:
+        """
+        Reserve IDs for new rows in a bucket, in the session's transaction on its shard.
+
+        Args:
+            session (AsyncSession): A sharded session.
+            bucket (int): Bucket of the new rows.
+            count (int): Number of IDs to reserve.
+
+        Returns:
+            List[int]: The IDs, ascending.
+        """
+        connection = await session.connection(
+            bind_arguments={"shard_id": self.shard_for_bucket(bucket)}
+        )
+        last = (
+            await connection.execute(
+                _NEXT_IDS, {"name": f"bucket:{bucket}", "start": 0, "count": count}
+            )
+        ).scalar_one()
+        return [make_id(sequence, bucket) for sequence in range(last - count + 1, last + 1)]
+
+    def reserve_change_seqs(self, connection: AsyncConnection, count: int) -> List[int]:
+        """
+        Reserve change log sequence numbers in a shard connection's transaction.
+
+        The real numbers are only taken when the transaction commits, as its last
+        statement (see `_assign_change_seqs`). Until then the entries carry
+        placeholder numbers, negative and unique within the transaction.
+
+        Args:
+            connection (AsyncConnection): The session's connection to the shard the
+                changes are written to.
+            count (int): Number of sequence numbers to reserve.
+
+        Returns:
+            List[int]: Placeholder numbers for the entries, in order.
+        """
+        reserved = connection.info.get(_PENDING_CHANGE_SEQS, 0)
+        connection.info[_PENDING_CHANGE_SEQS] = reserved + count
+        return list(range(-reserved - 1, -reserved - count - 1, -1))
+
+    async def dispose(self) -> None:
+        for shard in self.engines:
+            await shard.dispose()
+
+
+def get_shard_router(session: AsyncSession) -> Optional[ShardRouter]:
+    """The router of a sharded session, or None for a plain session."""
+    return session.info.get("shard_router")
+
+
+def enable_sharding(urls: Sequence[str]) -> ShardRouter:
+    """
+    Create an engine per shard URL and make `AsyncSessionLocal` create sharded sessions.
+
+    Args:
+        urls (Sequence[str]): Shard database URLs, in order.
+
+    Returns:
+        ShardRouter: The router, whose `create_schema` must run before first use.
+    """
+    router = ShardRouter([create_database_engine(url) for url in urls])
+    AsyncSessionLocal.configure(**router.session_options())
+    return router
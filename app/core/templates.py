@@ -0,0 +1,18 @@
+"""
+Shared Jinja2 templates for the HTML admin pages.
+
+The environment is built on first use rather than at import time, so workers
+that never serve an admin page do not pay for it during startup.
+"""
+
+from functools import lru_cache
+
+from fastapi.templating import Jinja2Templates
+
+TEMPLATES_DIRECTORY = "app/templates"
+
+
+@lru_cache(maxsize=None)
+def get_templates() -> Jinja2Templates:
+    """Return the process-wide Jinja2Templates instance, creating it on first call."""
+    return Jinja2Templates(directory=TEMPLATES_DIRECTORY)
@@ -3,13 +3,32 @@ Data Access Object (DAO) implementation for the User domain.
 
 This module defines the `UserDAO`, which provides async persistence methods
 for user-related operations. It extends the generic `BaseDAO` to inherit
-CRUD capabilities and serves as the foundation for more complex user-specific
-queries and database interactions.
+CRUD capabilities and adds user-specific lookups: exact email lookup and
+ranked full-text search over the `users_fts` index. User changes are recorded in
+the change log under the 'users' entity.
 """
 
+# pylint: disable=not-callable
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from pydantic import BaseModel
+from sqlalchemy import (
+    ColumnElement,
+    Integer,
+    and_,
+    column,
+    func,
+    literal,
+    literal_column,
+    or_,
+    select,
+    table,
+    true,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.dao import BaseDAO
-from app.users.models import UserModel
+from app.users.models import USERS_FTS_TABLE, UserImportJobModel, UserModel
 from app.users.schemas import UserCreate, UserUpdate
 
 
@@ -17,16 +36,138 @@ class UserDAO(BaseDAO[UserModel, UserCreate, UserUpdate]):
     """
     Async DAO for the User domain.
 
-    Inherits all CRUD methods from BaseDAO and provides a centralized point
-    for future user-specific persistence operations, such as:
-
-    - `get_by_email(email: str)`
-    - `get_active_users()`
-    - `search_users(...)`
+    Inherits all CRUD methods from BaseDAO and adds user-specific queries.
 
     Args:
         session (AsyncSession): SQLAlchemy async session injected via dependency.
     """
 
+    change_entity: str = "users"
+
     def __init__(self, session: AsyncSession):
         super().__init__(session, model_class=UserModel)
+
+    async def get_by_email(self, email: str) -> Optional[UserModel]:
+        """
+        Fetch a user by exact email address, using the unique index on `email`.
+
+        Args:
+            email (str): The email address to look up.
+
+        Returns:
+            Optional[UserModel]: The user if found, else None.
+        """
+        if self.router is not None:
+            return await self.get_by_shard_key(email)
+        result = await self.session.execute(select(UserModel).where(UserModel.email == email))
+        return result.scalar_one_or_none()
+
+    async def search_users(
+        self,
+        match: str,
+        columns: Sequence[str],
+        limit: int = 20,
+        after: Optional[Tuple[float, int]] = None,
+        max_ranked: int = 1000,
+    ) -> List[Dict[str, Any]]:
+        """
+        Run a full-text search and return matching users as plain row mappings.
+
+        bm25 needs statistics over every matching row, which is cheap for selective
+        queries but costs a scan of the whole match list for broad ones (e.g. a
+        trigram shared by most emails). Searches matching at most `max_ranked` rows
+        are therefore ordered by bm25 score (best first), then id; broader searches
+        get a score of 0 and are ordered by id, which FTS5 streams from the index.
+        Each row carries the selected columns plus its `score`, for building the
+        next cursor.
+
+        Args:
+            match (str): An FTS5 MATCH expression over `users_fts`.
+            columns (Sequence[str]): Attribute names to select, in output order.
+            limit (int): Maximum number of rows to return.
+            after (Optional[Tuple[float, int]]): `(score, id)` of the last row of the
+                previous page; only rows after it are returned.
+            max_ranked (int): Largest match count that is ranked by bm25.
+
+        Returns:
+            List[Dict[str, Any]]: One mapping per matching user.
+        """
+        fts: ColumnElement[Any] = literal_column(USERS_FTS_TABLE)
+        rowid = table(USERS_FTS_TABLE, column("rowid", Integer)).c.rowid
+        matching = select(rowid).where(fts.op("MATCH")(match))
+        count = select(func.count()).select_from(matching.limit(max_ranked + 1).subquery())
+        if self.router is None:
+            candidates = await self.session.scalar(count) or 0
+        else:
+            # Each shard indexes its own users; the ranking decision is made for all
+            # of them, so pages keep one order. Each count is capped at
+            # `max_ranked + 1`, so the sum exceeds `max_ranked` exactly when the total does.
+            candidates = 0
+            for shard_id in self.router.shard_ids:
+                shard = {"shard_id": shard_id}
+                candidates += await self.session.scalar(count, bind_arguments=shard) or 0
+        score, last_id = after if after is not None else (None, None)
+
+        if candidates <= max_ranked:
+            hits = matching.add_columns(func.bm25(fts).label("score")).subquery()
+            keyset = (
+                or_(hits.c.score > score, and_(hits.c.score == score, hits.c.rowid > last_id))
+                if after is not None
+                else true()
+            )
+        else:
+            if last_id is not None:
+                matching = matching.where(rowid > last_id)
+            hits = (
+                matching.add_columns(literal(0.0).label("score"))
+                .order_by(rowid)
+                .limit(limit)
+                .subquery()
+            )
+            keyset = true()
+
+        statement = (
+            select(*self._columns(columns), hits.c.score, hits.c.rowid)
+            .join(hits, UserModel.id == hits.c.rowid)
+            .where(keyset)
+            .order_by(hits.c.score, hits.c.rowid)
+            .limit(limit)
+        )
+        if self.router is not None:
+            # bm25 scores are computed against each shard's own index statistics.
+            rows = await self._gather(statement, lambda row: (row[-2], row[-1]), limit)
+        else:
+            rows = list((await self.session.execute(statement)).all())
+        return [dict(zip(row._fields, row[:-1])) for row in rows]
+
+
+class UserImportJobDAO(BaseDAO[UserImportJobModel, BaseModel, BaseModel]):
+    """
+    Async DAO for bulk user import jobs.
+
+    Jobs are created from an accepted upload and then mutated in place by the
+    import runner, so only creation is added on top of BaseDAO.
+
+    Args:
+        session (AsyncSession): SQLAlchemy async session injected via dependency.
+    """
+
+    def __init__(self, session: AsyncSession):
+        super().__init__(session, model_class=UserImportJobModel)
+
+    async def create_job(self, file_format: str, total_bytes: int) -> UserImportJobModel:
+        """
+        Register a pending import job.
+
+        Args:
+            file_format (str): Upload format, 'csv' or 'ndjson'.
+            total_bytes (int): Size of the spooled upload.
+
+        Returns:
+            UserImportJobModel: The persisted job.
+        """
+        job = UserImportJobModel(format=file_format, total_bytes=total_bytes, errors=[])
+        self.session.add(job)
+        await self.session.commit()
+        await self.session.refresh(job)
+        return job
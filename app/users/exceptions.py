@@ -27,3 +27,18 @@ class UserNotFound(NotFound):
         Initializes the UserNotFound exception with a descriptive message.
         """
         super().__init__("User Not Found!")
+
+
+class ImportJobNotFound(NotFound):
+    """
+    Exception raised when a bulk user import job cannot be found.
+
+    Attributes:
+        detail (str): A human-readable error message.
+    """
+
+    def __init__(self) -> None:
+        """
+        Initializes the ImportJobNotFound exception with a descriptive message.
+        """
+        super().__init__("Import Job Not Found!")
@@ -0,0 +1,269 @@
+"""
+Background bulk imports of users from CSV or NDJSON uploads.
+
+An upload is streamed to a temporary file, never held in memory, and an import
+job is registered and returned immediately. A background task then parses the
+file incrementally, validates rows with `UserCreate` in chunks, and upserts each
+chunk on email in a single transaction together with the job's progress
+counters. File reading, parsing and validation run in a worker thread so the
+event loop keeps serving requests while an import runs.
+
+Jobs run inside the process that accepted the upload; a job interrupted by a
+restart stays in the 'running' state.
+"""
+
+import asyncio
+import csv
+import json
+import logging
+import os
+import tempfile
+import time
+from enum import Enum
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Set
+
+import anyio
+from pydantic import ValidationError
+
+import app.core.config as config
+from app.core.cache.store import response_cache
+from app.core.database import AsyncSessionLocal
+from app.core.exceptions import UnsupportedMediaType
+from app.core.logging.models import eastern_now
+from app.users.dao import UserDAO, UserImportJobDAO
+from app.users.exceptions import ImportJobNotFound
+from app.users.models import UserImportJobModel
+from app.users.schemas import UserCreate
+from app.users.service import USERS_CACHE_TAG
+
+logger = logging.getLogger(__name__)
+
+# Strong references to running import tasks, which the event loop only holds weakly.
+_running_imports: Set["asyncio.Task[None]"] = set()
+
+
+class ImportFormat(str, Enum):
+    """Supported upload formats."""
+
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+
+CONTENT_TYPES = {
+    "text/csv": ImportFormat.CSV,
+    "application/x-ndjson": ImportFormat.NDJSON,
+    "application/ndjson": ImportFormat.NDJSON,
+    "application/jsonl": ImportFormat.NDJSON,
+}
+
+
+def format_for_content_type(content_type: Optional[str]) -> ImportFormat:
+    """
+    Map a request Content-Type to an upload format.
+
+    Raises:
+        UnsupportedMediaType: If the content type is not CSV or NDJSON.
+    """
+    media_type = (content_type or "").split(";", 1)[0].strip().lower()
+    if media_type not in CONTENT_TYPES:
+        raise UnsupportedMediaType(f"Expected one of: {', '.join(CONTENT_TYPES)}")
+    return CONTENT_TYPES[media_type]
+
+
+class ImportChunk:
+    """
+    One validated chunk of an upload.
+
+    Attributes:
+        rows (List[Dict[str, Any]]): Valid rows, ready for upsert.
+        errors (List[Dict[str, Any]]): Row number and messages of rejected rows.
+        processed (int): Number of rows parsed, valid or not.
+    """
+
+    def __init__(self) -> None:
+        self.rows: List[Dict[str, Any]] = []
+        self.errors: List[Dict[str, Any]] = []
+        self.processed = 0
+
+
+class RecordReader:
+    """
+    Incrementally parses an uploaded file, tracking how many bytes were consumed.
+
+    Blocking; call `read_chunk` from a worker thread.
+
+    Args:
+        path (str): Path of the spooled upload.
+        file_format (ImportFormat): Upload format. CSV files need a header row with
+            the `UserCreate` field names; NDJSON files hold one JSON object per line.
+    """
+
+    def __init__(self, path: str, file_format: ImportFormat):
+        self.bytes_read = 0
+        self._file = open(path, "rb")  # pylint: disable=consider-using-with
+        self._row_number = 0
+        lines = self._lines()
+        # CSV rows are parsed by the csv module; NDJSON lines are parsed per record
+        # in `read_chunk`, so one malformed line only rejects that row.
+        self._records: Iterator[Any] = (
+            csv.DictReader(lines)
+            if file_format is ImportFormat.CSV
+            else (line for line in lines if line.strip())
+        )
+
+    def _lines(self) -> Iterator[str]:
+        encoding = "utf-8-sig"  # Tolerate a byte order mark on the first line.
+        for raw in self._file:
+            self.bytes_read += len(raw)
+            yield raw.decode(encoding)
+            encoding = "utf-8"
+
+    def read_chunk(self, size: int) -> ImportChunk:
+        """Parse and validate up to `size` rows."""
+        chunk = ImportChunk()
+        for record in self._records:
+            self._row_number += 1
+            chunk.processed += 1
+            try:
+                if isinstance(record, str):
+                    record = _parse_json(record)
+                if not isinstance(record, dict) or None in record:
+                    raise ValueError("Expected an object with first_name, last_name and email")
+                chunk.rows.append(UserCreate.model_validate(record).model_dump())
+            except ValidationError as exc:
+                messages = [f"{'.'.join(map(str, e['loc']))}: {e['msg']}" for e in exc.errors()]
+                chunk.errors.append({"row": self._row_number, "errors": messages})
+            except ValueError as exc:
+                chunk.errors.append({"row": self._row_number, "errors": [str(exc)]})
+            if chunk.processed >= size:
+                break
+        return chunk
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def _parse_json(line: str) -> Any:
+    try:
+        return json.loads(line)
+    except json.JSONDecodeError as exc:
+        raise ValueError(f"Invalid JSON: {exc.msg}") from exc
+
+
+class UserImportService:
+    """
+    Accepts bulk user uploads and reports the progress of their import jobs.
+
+    Args:
+        dao (UserImportJobDAO): The data access object for import jobs.
+    """
+
+    def __init__(self, dao: UserImportJobDAO):
+        self.dao = dao
+
+    async def create_import(
+        self, chunks: AsyncIterator[bytes], file_format: ImportFormat
+    ) -> UserImportJobModel:
+        """
+        Spool an upload to a temporary file and start importing it in the background.
+
+        Args:
+            chunks (AsyncIterator[bytes]): The request body stream.
+            file_format (ImportFormat): Format of the upload.
+
+        Returns:
+            UserImportJobModel: The pending job.
+        """
+        fd, path = tempfile.mkstemp(
+            prefix="user-import-", suffix=f".{file_format.value}", dir=config.IMPORT_UPLOAD_DIR
+        )
+        os.close(fd)
+        total_bytes = 0
+        try:
+            async with await anyio.open_file(path, "wb") as upload:
+                async for chunk in chunks:
+                    total_bytes += len(chunk)
+                    await upload.write(chunk)
+            job = await self.dao.create_job(file_format.value, total_bytes)
+        except BaseException:
+            os.remove(path)
+            raise
+        task = asyncio.create_task(run_import_job(job.id, path))
+        _running_imports.add(task)
+        task.add_done_callback(_running_imports.discard)
+        return job
+
+    async def get_import(self, job_id: int) -> UserImportJobModel:
+        """
+        Retrieve an import job.
+
+        Raises:
+            ImportJobNotFound: If no job with the given ID exists.
+        """
+        job = await self.dao.get(job_id)
+        if not job:
+            raise ImportJobNotFound()
+        return job
+
+
+async def run_import_job(
+    job_id: int,
+    path: str,
+    chunk_size: Optional[int] = None,
+    max_errors: Optional[int] = None,
+) -> None:
+    """
+    Import a spooled upload, recording progress on the job after every chunk.
+
+    The upload file is removed when the job ends, whether it succeeds or fails.
+
+    Args:
+        job_id (int): The job to run.
+        path (str): Path of the spooled upload.
+        chunk_size (Optional[int]): Rows per transaction. Defaults to `IMPORT_CHUNK_SIZE`.
+        max_errors (Optional[int]): Row errors kept on the job. Defaults to `IMPORT_MAX_ERRORS`.
+    """
+    chunk_size = chunk_size or config.IMPORT_CHUNK_SIZE
+    max_errors = config.IMPORT_MAX_ERRORS if max_errors is None else max_errors
+    async with AsyncSessionLocal() as session:
+        job = await UserImportJobDAO(session).get(job_id)
+        if job is None:
+            os.remove(path)
+            return
+        users = UserDAO(session)
+        job.status = "running"
+        await session.commit()
+        started = time.perf_counter()
+        reader: Optional[RecordReader] = None
+        try:
+            reader = await anyio.to_thread.run_sync(RecordReader, path, ImportFormat(job.format))
+            while True:
+                chunk = await anyio.to_thread.run_sync(reader.read_chunk, chunk_size)
+                if not chunk.processed:
+                    break
+                job.processed_rows += chunk.processed
+                job.imported_rows += len(chunk.rows)
+                job.failed_rows += len(chunk.errors)
+                if chunk.errors and len(job.errors) < max_errors:
+                    job.errors = [*job.errors, *chunk.errors][:max_errors]
+                job.bytes_read = reader.bytes_read
+                job.elapsed_seconds = time.perf_counter() - started
+                # The job's counters are flushed in the same transaction as the rows.
+                if chunk.rows:
+                    await users.upsert_many(chunk.rows, conflict_columns=("email",))
+                    response_cache.invalidate_tag(USERS_CACHE_TAG)
+                else:
+                    await session.commit()
+            job.status = "completed"
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            logger.exception("User import job %s failed", job_id)
+            await session.rollback()
+            job.status = "failed"
+            job.error = str(exc)
+        finally:
+            if reader is not None:
+                reader.close()
+            os.remove(path)
+        job.elapsed_seconds = time.perf_counter() - started
+        job.finished_at = eastern_now()
+        await session.commit()
@@ -8,16 +8,35 @@ with Pydantic via `from_orm` or `from_attributes`.
 
 Tables:
     - users: Stores user profile information.
+    - users_fts: SQLite FTS5 trigram index over first name, last name and email,
+      kept in sync with `users` by triggers. Created alongside `users` on SQLite only.
+    - user_import_jobs: Progress and errors of bulk user imports.
 
 Fields:
     - id (int): Auto-incrementing primary key.
     - first_name (str): The user's first name (max 100 characters).
     - last_name (str): The user's last name (max 100 characters).
     - email (str): The user's unique email address (max 255 characters).
+    - version (int): Row version, incremented by SQLAlchemy on every update.
 """
 
-from sqlalchemy import Column, Integer, String
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from sqlalchemy import (
+    JSON,
+    Column,
+    Connection,
+    DateTime,
+    Integer,
+    MetaData,
+    String,
+    event,
+    inspect,
+    text,
+)
+from sqlalchemy.orm import Mapped, mapped_column
 from app.core.database import Base
+from app.core.logging.models import eastern_now
 
 
 class UserModel(Base):
@@ -30,6 +49,8 @@ class UserModel(Base):
         first_name (str): First name, max 100 characters.
         last_name (str): Last name, max 100 characters.
         email (str): Email address, max 255 characters, must be unique.
+        version (int): Row version used for ETags and optimistic concurrency; the
+            mapper bumps it on every UPDATE and checks it on UPDATE/DELETE.
     """
 
     __tablename__ = "users"
@@ -38,3 +59,92 @@ class UserModel(Base):
     first_name = Column(String(100), nullable=False)
     last_name = Column(String(100), nullable=False)
     email = Column(String(255), nullable=False, unique=True, index=True)
+    # The server default fills in rows that predate the column when it is added.
+    version = Column(Integer, nullable=False, server_default="1")
+
+    __mapper_args__ = {"version_id_col": version}
+
+
+class UserImportJobModel(Base):
+    """
+    ORM model tracking a bulk user import.
+
+    Attributes:
+        id (int): Unique identifier for the job.
+        status (str): 'pending', 'running', 'completed' or 'failed'.
+        format (str): Upload format, 'csv' or 'ndjson'.
+        total_bytes (int): Size of the uploaded file.
+        bytes_read (int): Bytes of the upload parsed so far.
+        processed_rows (int): Data rows parsed so far.
+        imported_rows (int): Rows inserted or updated.
+        failed_rows (int): Rows rejected by validation.
+        errors (List[Dict[str, Any]]): Row number and messages of the first rejected rows.
+        error (Optional[str]): Reason the whole job failed, if it did.
+        elapsed_seconds (float): Processing time so far.
+        created_at (datetime): When the upload was accepted.
+        finished_at (Optional[datetime]): When processing ended.
+    """
+
+    __tablename__ = "user_import_jobs"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    status: Mapped[str] = mapped_column(String(16), default="pending")
+    format: Mapped[str] = mapped_column(String(16))
+    total_bytes: Mapped[int] = mapped_column(default=0)
+    bytes_read: Mapped[int] = mapped_column(default=0)
+    processed_rows: Mapped[int] = mapped_column(default=0)
+    imported_rows: Mapped[int] = mapped_column(default=0)
+    failed_rows: Mapped[int] = mapped_column(default=0)
+    errors: Mapped[List[Dict[str, Any]]] = mapped_column(JSON, default=list)
+    error: Mapped[Optional[str]]
+    elapsed_seconds: Mapped[float] = mapped_column(default=0.0)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=eastern_now)
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+
+
+USERS_FTS_TABLE = "users_fts"
+
+# External-content FTS5 table: it stores only the trigram index and reads column
+# values from `users`, so the triggers must feed it the old values on delete.
+USERS_FTS_DDL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {USERS_FTS_TABLE} USING fts5("
+    "first_name, last_name, email, content='users', content_rowid='id', tokenize='trigram')",
+    f"CREATE TRIGGER IF NOT EXISTS users_fts_ai AFTER INSERT ON users BEGIN "
+    f"INSERT INTO {USERS_FTS_TABLE}(rowid, first_name, last_name, email) "
+    "VALUES (new.id, new.first_name, new.last_name, new.email); END",
+    f"CREATE TRIGGER IF NOT EXISTS users_fts_ad AFTER DELETE ON users BEGIN "
+    f"INSERT INTO {USERS_FTS_TABLE}({USERS_FTS_TABLE}, rowid, first_name, last_name, email) "
+    "VALUES ('delete', old.id, old.first_name, old.last_name, old.email); END",
+    f"CREATE TRIGGER IF NOT EXISTS users_fts_au AFTER UPDATE OF first_name, last_name, email "
+    f"ON users BEGIN "
+    f"INSERT INTO {USERS_FTS_TABLE}({USERS_FTS_TABLE}, rowid, first_name, last_name, email) "
+    "VALUES ('delete', old.id, old.first_name, old.last_name, old.email); "
+    f"INSERT INTO {USERS_FTS_TABLE}(rowid, first_name, last_name, email) "
+    "VALUES (new.id, new.first_name, new.last_name, new.email); END",
+)
+
+UserModel.__table__.info["ddl"] = USERS_FTS_DDL
+# Users are hash-sharded by email when `SHARD_URLS` is set (see `app.core.sharding`).
+UserModel.__table__.info["shard_key"] = "email"
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _create_users_fts(target: MetaData, connection: Connection, **kw: Any) -> None:
+    """Create the search index, backfilling it when added to an existing `users` table."""
+    # pylint: disable=unused-argument
+    if connection.dialect.name != "sqlite":
+        return
+    existed = inspect(connection).has_table(USERS_FTS_TABLE)
+    for statement in USERS_FTS_DDL:
+        connection.execute(text(statement))
+    if not existed:
+        connection.execute(
+            text(f"INSERT INTO {USERS_FTS_TABLE}({USERS_FTS_TABLE}) VALUES ('rebuild')")
+        )
+
+
+@event.listens_for(UserModel.__table__, "before_drop")
+def _drop_users_fts(target: Any, connection: Connection, **kw: Any) -> None:
+    # pylint: disable=unused-argument
+    if connection.dialect.name == "sqlite":
+        connection.execute(text(f"DROP TABLE IF EXISTS {USERS_FTS_TABLE}"))
@@ -1,15 +1,42 @@
 """
 Asynchronous API routes for the User domain.
 Includes OpenAPI documentation, pagination, and dependency injection.
+
+Read routes emit strong ETags derived from each user's row version and answer
+If-None-Match with 304 Not Modified after loading only the versions. PATCH and
+DELETE honour If-Match for optimistic concurrency.
+
+`/search`, `/by-email`, `/changes` and `/imports` are declared before `/{user_id}` so that
+they are not captured by the ID route.
 """
 
-from fastapi import APIRouter, Depends, Query
-from app.users.schemas import UserCreate, UserResponse, UserUpdate
+from fastapi import APIRouter, Depends, Header, Query, Request, Response
+from pydantic import EmailStr
+from app.users.schemas import (
+    UserChangesResponse,
+    UserCreate,
+    UserImportJobResponse,
+    UserResponse,
+    UserSearchResponse,
+    UserUpdate,
+    user_response_serializer,
+)
+from app.users.imports import UserImportService, format_for_content_type
+from app.users.search import MIN_TERM_LENGTH, SearchMode
 from app.users.service import UserService
-from app.users.dao import UserDAO
+from app.users.dao import UserDAO, UserImportJobDAO
 from app.core.database import get_async_session
+from app.core.etags import (
+    if_match_matches,
+    if_none_match_matches,
+    make_collection_etag,
+    make_etag,
+)
+from app.core.exceptions import BadRequest, NotModified, PreconditionFailed
+from app.core.responses import JSONBytesResponse, select_fields, sparse_serializer
+import app.core.config as config
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Any
+from typing import Any, Iterable, Optional, Tuple
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
@@ -18,41 +45,239 @@ def get_user_service(session: AsyncSession = Depends(get_async_session)) -> User
     return UserService(UserDAO(session))
 
 
+def get_user_import_service(
+    session: AsyncSession = Depends(get_async_session),
+) -> UserImportService:
+    return UserImportService(UserImportJobDAO(session))
+
+
+def user_etag(user_id: Any, version: Any) -> str:
+    return make_etag(user_id, version)
+
+
+def user_list_etag(versions: Iterable[Iterable[object]], fields: Optional[Tuple[str, ...]]) -> str:
+    """ETag of a page of users, which differs per sparse fieldset."""
+    etag = make_collection_etag(versions)
+    return etag if fields is None else make_etag(etag, *fields)
+
+
+def user_fields(
+    fields: Optional[str] = Query(
+        None, description="Comma-separated user fields to return, e.g. `id,email`"
+    ),
+) -> Optional[Tuple[str, ...]]:
+    """Validate a sparse fieldset against `UserResponse`; None means every field."""
+    try:
+        return select_fields(UserResponse, fields)
+    except ValueError as exc:
+        raise BadRequest(str(exc)) from exc
+
+
+async def check_if_match(service: UserService, user_id: int, if_match: Optional[str]) -> None:
+    """Raise PreconditionFailed unless the user's current ETag satisfies If-Match."""
+    if if_match is None:
+        return
+    current = await service.get_user(user_id)
+    if not if_match_matches(if_match, user_etag(current.id, current.version)):
+        raise PreconditionFailed()
+
+
 @router.post("", response_model=UserResponse, status_code=201, summary="Create a new user")
 async def create_user(
-    user_data: UserCreate, service: UserService = Depends(get_user_service)
+    user_data: UserCreate, response: Response, service: UserService = Depends(get_user_service)
 ) -> Any:
     """Create a new user with the provided data."""
-    return await service.create_user(user_data)
+    user = await service.create_user(user_data)
+    response.headers["ETag"] = user_etag(user.id, user.version)
+    return user
+
+
+@router.get("/search", response_model=UserSearchResponse, summary="Search users")
+async def search_users(
+    q: str = Query(
+        ...,
+        min_length=MIN_TERM_LENGTH,
+        max_length=255,
+        description="Text matched against first name, last name and email",
+    ),
+    mode: SearchMode = Query(SearchMode.PREFIX, description="Prefix or fuzzy matching"),
+    limit: int = Query(20, ge=1, le=100, description="Maximum users to return"),
+    cursor: Optional[str] = Query(None, description="Cursor returned with the previous page"),
+    service: UserService = Depends(get_user_service),
+) -> Any:
+    """Search users by name or email, ranked by relevance, with keyset pagination."""
+    items, next_cursor = await service.search_users(
+        q, user_response_serializer.fields, mode=mode, limit=limit, cursor=cursor
+    )
+    return {"items": items, "next_cursor": next_cursor}
+
+
+@router.get("/by-email", response_model=UserResponse, summary="Get user by email")
+async def get_user_by_email(
+    response: Response,
+    email: EmailStr = Query(..., description="Exact email address"),
+    service: UserService = Depends(get_user_service),
+) -> Any:
+    """Retrieve a user by their exact email address."""
+    user = await service.get_user_by_email(email)
+    response.headers["ETag"] = user_etag(user.id, user.version)
+    return user
+
+
+@router.get("/changes", response_model=UserChangesResponse, summary="Get the user change feed")
+async def get_user_changes(
+    response: Response,
+    since: int = Query(0, ge=0, description="Last sequence number seen; 0 for the whole feed"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum changes to return"),
+    wait: float = Query(
+        0,
+        ge=0,
+        le=config.CHANGES_MAX_WAIT,
+        description="Seconds to wait for a change when there are none yet (long polling)",
+    ),
+    service: UserService = Depends(get_user_service),
+) -> Any:
+    """
+    List user creations, updates and deletions after `since`, oldest first.
+
+    Keep calling with the returned `next_since` to follow the feed; deleted users
+    appear as tombstones without user data.
+    """
+    changes = await service.get_user_changes(since=since, limit=limit, wait=wait)
+    response.headers["Cache-Control"] = "no-store"
+    return {"items": changes, "next_since": changes[-1].seq if changes else since}
+
+
+@router.post(
+    "/imports",
+    response_model=UserImportJobResponse,
+    status_code=202,
+    summary="Bulk import users from CSV or NDJSON",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "text/csv": {"schema": {"type": "string"}},
+                "application/x-ndjson": {"schema": {"type": "string"}},
+            },
+        }
+    },
+)
+async def create_user_import(
+    request: Request,
+    response: Response,
+    service: UserImportService = Depends(get_user_import_service),
+) -> Any:
+    """
+    Stream the request body to disk and import it in the background.
+
+    Send CSV (with a `first_name,last_name,email` header) as `text/csv`, or one
+    JSON object per line as `application/x-ndjson`. Existing users are updated
+    by email. Poll the returned job for progress.
+    """
+    file_format = format_for_content_type(request.headers.get("content-type"))
+    job = await service.create_import(request.stream(), file_format)
+    response.headers["Location"] = f"{router.prefix}/imports/{job.id}"
+    return job
+
+
+@router.get(
+    "/imports/{job_id}", response_model=UserImportJobResponse, summary="Get import job status"
+)
+async def get_user_import(
+    job_id: int,
+    response: Response,
+    service: UserImportService = Depends(get_user_import_service),
+) -> Any:
+    """Report progress, throughput and rejected rows of an import job."""
+    job = await service.get_import(job_id)
+    # Progress changes continuously; keep it out of the response cache.
+    response.headers["Cache-Control"] = "no-store"
+    return job
 
 
 @router.get("/{user_id}", response_model=UserResponse, summary="Get user by ID")
-async def get_user(user_id: int, service: UserService = Depends(get_user_service)) -> Any:
+async def get_user(
+    user_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    service: UserService = Depends(get_user_service),
+) -> Any:
     """Retrieve a user by their unique ID."""
-    return await service.get_user(user_id)
+    if if_none_match:
+        etag = user_etag(user_id, await service.get_user_version(user_id))
+        if if_none_match_matches(if_none_match, etag):
+            raise NotModified(etag)
+    if config.FAST_JSON_RESPONSES:
+        row = await service.get_user_row(
+            user_id, columns=(*user_response_serializer.fields, "version")
+        )
+        etag = user_etag(user_id, row.pop("version"))
+        return JSONBytesResponse(user_response_serializer.dump_row(row), headers={"ETag": etag})
+    user = await service.get_user(user_id)
+    response.headers["ETag"] = user_etag(user.id, user.version)
+    return user
 
 
 @router.get("", response_model=list[UserResponse], summary="List all users")
 async def get_all_users(
+    response: Response,
     limit: int = Query(100, le=1000, description="Maximum users to return"),
     offset: int = Query(0, description="Number of users to skip"),
+    fields: Optional[Tuple[str, ...]] = Depends(user_fields),
+    if_none_match: Optional[str] = Header(None),
     service: UserService = Depends(get_user_service),
 ) -> Any:
-    """Retrieve a paginated list of users."""
-    return await service.get_all_users(limit=limit, offset=offset)
+    """
+    Retrieve a paginated list of users.
+
+    With `fields`, only those columns are selected and each user carries only those
+    fields.
+    """
+    if if_none_match:
+        etag = user_list_etag(await service.get_user_versions(limit=limit, offset=offset), fields)
+        if if_none_match_matches(if_none_match, etag):
+            raise NotModified(etag)
+    if fields is not None or config.FAST_JSON_RESPONSES:
+        serializer = (
+            user_response_serializer if fields is None else sparse_serializer(UserResponse, fields)
+        )
+        # The ID and version are needed for the ETag even when not requested.
+        extra = tuple(name for name in ("id", "version") if name not in serializer.fields)
+        rows = await service.get_all_user_rows(
+            (*serializer.fields, *extra), limit=limit, offset=offset
+        )
+        etag = user_list_etag(((row["id"], row["version"]) for row in rows), fields)
+        for row in rows:
+            for name in extra:
+                del row[name]
+        return JSONBytesResponse(serializer.dump_rows(rows), headers={"ETag": etag})
+    users = await service.get_all_users(limit=limit, offset=offset)
+    response.headers["ETag"] = make_collection_etag((user.id, user.version) for user in users)
+    return users
 
 
 @router.patch("/{user_id}", response_model=UserResponse, summary="Update user by ID")
 async def update_user(
     user_id: int,
     user_data: UserUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
     service: UserService = Depends(get_user_service),
 ) -> Any:
     """Partially update fields for a user by ID."""
-    return await service.update_user(user_id, user_data)
+    await check_if_match(service, user_id, if_match)
+    user = await service.update_user(user_id, user_data)
+    response.headers["ETag"] = user_etag(user.id, user.version)
+    return user
 
 
 @router.delete("/{user_id}", response_model=UserResponse, summary="Delete user by ID")
-async def delete_user(user_id: int, service: UserService = Depends(get_user_service)) -> Any:
+async def delete_user(
+    user_id: int,
+    if_match: Optional[str] = Header(None),
+    service: UserService = Depends(get_user_service),
+) -> Any:
     """Delete a user by their unique ID."""
+    await check_if_match(service, user_id, if_match)
     return await service.delete_user(user_id)
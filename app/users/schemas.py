@@ -5,8 +5,11 @@ These schemas enforce validation rules and structure for user-related
 operations, including input validation and output serialization.
 """
 
-from pydantic import BaseModel, Field, EmailStr, ConfigDict
-from typing import Optional
+from datetime import datetime
+from pydantic import BaseModel, Field, EmailStr, ConfigDict, computed_field
+from typing import List, Optional
+from app.core.changes.models import ChangeOperation
+from app.core.responses import RowSerializer
 
 
 class UserNameMixin(BaseModel):
@@ -42,3 +45,84 @@ class UserUpdate(BaseModel):
     email: Optional[EmailStr] = Field(default=None, max_length=255)
 
     model_config = ConfigDict(from_attributes=True, strict=True, extra="forbid")
+
+
+class UserSearchResponse(BaseModel):
+    """Schema for a page of user search results."""
+
+    items: List[UserResponse]
+    next_cursor: Optional[str] = Field(
+        default=None, description="Cursor for the next page, or null on the last page"
+    )
+
+
+class UserChange(BaseModel):
+    """Schema for one entry of the user change feed."""
+
+    seq: int = Field(..., description="Sequence number; pass the last one seen as `since`")
+    operation: ChangeOperation
+    id: int = Field(..., validation_alias="entity_id", description="ID of the changed user")
+    version: Optional[int] = Field(
+        default=None, description="User version after the change, or the last one for deletes"
+    )
+    user: Optional[UserResponse] = Field(
+        default=None,
+        validation_alias="data",
+        description="The user after the change; null for deletes",
+    )
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class UserChangesResponse(BaseModel):
+    """Schema for a page of the user change feed."""
+
+    items: List[UserChange]
+    next_since: int = Field(..., description="Value of `since` for the next request")
+
+
+class UserImportRowError(BaseModel):
+    """A rejected row of a bulk import."""
+
+    row: int = Field(..., description="1-based data row number in the upload")
+    errors: List[str]
+
+
+class UserImportJobResponse(BaseModel):
+    """Schema for returning the status of a bulk user import."""
+
+    id: int
+    status: str
+    format: str
+    total_bytes: int
+    bytes_read: int
+    processed_rows: int
+    imported_rows: int
+    failed_rows: int
+    errors: List[UserImportRowError]
+    error: Optional[str]
+    elapsed_seconds: float
+    created_at: datetime
+    finished_at: Optional[datetime]
+
+    model_config = ConfigDict(from_attributes=True)
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def progress(self) -> float:
+        """Fraction of the upload parsed so far."""
+        if self.total_bytes == 0:
+            return 1.0 if self.status == "completed" else 0.0
+        return round(self.bytes_read / self.total_bytes, 4)
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def rows_per_second(self) -> float:
+        """Parsing and import throughput."""
+        if self.elapsed_seconds <= 0:
+            return 0.0
+        return round(self.processed_rows / self.elapsed_seconds, 1)
+
+
+# Precompiled serializer for the fast JSON path of read-only user routes.
+user_response_serializer = RowSerializer(UserResponse)
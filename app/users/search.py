@@ -0,0 +1,83 @@
+"""
+Query building helpers for user search.
+
+User search is backed by the `users_fts` FTS5 table, whose trigram tokenizer
+indexes every three-character substring of first name, last name and email,
+case-insensitively. Two modes are supported:
+
+- `prefix`: every search term must start one of the fields (`^ "term"`), which is
+  what typeahead boxes need.
+- `fuzzy`: any trigram of any term may match; rows sharing more trigrams with the
+  query rank higher, so small typos still find the intended user.
+
+Results are ranked by bm25 and paginated with an opaque keyset cursor encoding
+the `(score, id)` of the last row returned.
+"""
+
+import base64
+import json
+from enum import Enum
+from typing import List, Optional, Tuple
+
+# The trigram tokenizer cannot match substrings shorter than this.
+MIN_TERM_LENGTH = 3
+
+
+class SearchMode(str, Enum):
+    """Supported user search modes."""
+
+    PREFIX = "prefix"
+    FUZZY = "fuzzy"
+
+
+def _quote(term: str) -> str:
+    return '"' + term.replace('"', '""') + '"'
+
+
+def _trigrams(term: str) -> List[str]:
+    return [term[i : i + MIN_TERM_LENGTH] for i in range(len(term) - MIN_TERM_LENGTH + 1)]
+
+
+def build_match_query(query: str, mode: SearchMode) -> Optional[str]:
+    """
+    Translate free text into an FTS5 MATCH expression.
+
+    Terms shorter than `MIN_TERM_LENGTH` are ignored, since the trigram index
+    cannot match them. Every term is quoted, so FTS5 operators in user input are
+    treated as plain text.
+
+    Args:
+        query (str): The text typed by the user.
+        mode (SearchMode): How terms are matched.
+
+    Returns:
+        Optional[str]: The MATCH expression, or None if no term is long enough.
+    """
+    terms = [term for term in query.lower().split() if len(term) >= MIN_TERM_LENGTH]
+    if not terms:
+        return None
+    if mode is SearchMode.PREFIX:
+        return " AND ".join(f"^ {_quote(term)}" for term in terms)
+    trigrams = dict.fromkeys(trigram for term in terms for trigram in _trigrams(term))
+    return " OR ".join(_quote(trigram) for trigram in trigrams)
+
+
+def encode_cursor(score: float, user_id: int) -> str:
+    """Encode the position after a search result as an opaque cursor."""
+    return base64.urlsafe_b64encode(json.dumps([score, user_id]).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[float, int]:
+    """
+    Decode a cursor produced by `encode_cursor`.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        score, user_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (TypeError, ValueError) as exc:
+        raise ValueError("Invalid cursor") from exc
+    if not isinstance(score, (int, float)) or not isinstance(user_id, int):
+        raise ValueError("Invalid cursor")
+    return float(score), user_id
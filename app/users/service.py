@@ -7,12 +7,23 @@ for user-related operations. It acts as an intermediary between the web layer
 application logic, error handling, and validation coordination.
 """
 
-from typing import List
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from sqlalchemy.orm.exc import StaleDataError
+import app.core.config as config
+from app.core.cache.store import response_cache
+from app.core.changes.models import ChangeLogModel
+from app.core.changes.notifier import change_notifier
+from app.core.exceptions import BadRequest, PreconditionFailed
 from app.users.dao import UserDAO
 from app.users.models import UserModel
 from app.users.schemas import UserCreate, UserUpdate
+from app.users.search import SearchMode, build_match_query, decode_cursor, encode_cursor
 from app.users.exceptions import UserNotFound
 
+# Response cache tag covering every cached `/users...` response.
+USERS_CACHE_TAG = "users"
+
 
 class UserService:
     """
@@ -22,6 +33,7 @@ class UserService:
     - Orchestrates calls to the UserDAO.
     - Applies domain-specific validation and rules.
     - Raises domain-specific exceptions to signal business errors.
+    - Invalidates cached user responses after every mutation.
     """
 
     def __init__(self, dao: UserDAO):
@@ -64,6 +76,169 @@ class UserService:
         """
         return await self.dao.get_all(limit=limit, offset=offset)
 
+    async def get_user_by_email(self, email: str) -> UserModel:
+        """
+        Retrieve a single user by exact email address.
+
+        Args:
+            email (str): The email address of the user to retrieve.
+
+        Returns:
+            UserModel: The user with the specified email.
+
+        Raises:
+            UserNotFound: If no user with the given email exists.
+        """
+        user = await self.dao.get_by_email(email)
+        if not user:
+            raise UserNotFound()
+        return user
+
+    async def search_users(
+        self,
+        query: str,
+        columns: Sequence[str],
+        mode: SearchMode = SearchMode.PREFIX,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Search users by first name, last name and email.
+
+        Args:
+            query (str): The text to search for.
+            columns (Sequence[str]): Attribute names to return for each user.
+            mode (SearchMode, optional): Prefix or fuzzy matching. Defaults to prefix.
+            limit (int, optional): Maximum number of users to return. Defaults to 20.
+            cursor (Optional[str], optional): Cursor returned with the previous page.
+
+        Returns:
+            Tuple[List[Dict[str, Any]], Optional[str]]: The ranked page of users and
+            the cursor for the next page, or None if this is the last page.
+
+        Raises:
+            BadRequest: If the cursor is malformed.
+        """
+        try:
+            after = decode_cursor(cursor) if cursor else None
+        except ValueError as exc:
+            raise BadRequest("Invalid cursor") from exc
+        match = build_match_query(query, mode)
+        if match is None:
+            return [], None
+        rows = await self.dao.search_users(
+            match, columns, limit=limit + 1, after=after, max_ranked=config.SEARCH_MAX_RANKED
+        )
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1]["score"], rows[-1]["id"])
+        for row in rows:
+            del row["score"]
+        return rows, next_cursor
+
+    async def get_user_changes(
+        self, since: int = 0, limit: int = 100, wait: float = 0
+    ) -> List[ChangeLogModel]:
+        """
+        Retrieve user changes recorded after a sequence number, oldest first.
+
+        With `wait`, an empty result is not returned right away: the request waits up
+        to `wait` seconds for a change, woken by changes made in this process and
+        re-reading the change log every `CHANGES_POLL_INTERVAL` seconds to catch
+        changes made by other workers.
+
+        Args:
+            since (int, optional): Only changes with a greater sequence number are returned.
+            limit (int, optional): Maximum number of changes to return. Defaults to 100.
+            wait (float, optional): Seconds to wait for a change if there are none yet.
+
+        Returns:
+            List[ChangeLogModel]: The changes, in sequence order; empty if none arrived
+            in time.
+        """
+        entity = self.dao.change_entity
+        deadline = time.monotonic() + wait
+        while True:
+            # Subscribe before reading, so a change committed in between still wakes us.
+            subscription = change_notifier.subscribe(entity)
+            changes = await self.dao.get_changes(since=since, limit=limit)
+            remaining = deadline - time.monotonic()
+            if changes or remaining <= 0:
+                change_notifier.unsubscribe(entity, subscription)
+                return changes
+            # Let the next read see new commits, and free the connection while waiting.
+            await self.dao.end_read()
+            await change_notifier.wait(
+                entity, subscription, min(remaining, config.CHANGES_POLL_INTERVAL)
+            )
+
+    async def get_user_version(self, user_id: int) -> int:
+        """
+        Retrieve only the current row version of a user.
+
+        Args:
+            user_id (int): The ID of the user.
+
+        Returns:
+            int: The user's version.
+
+        Raises:
+            UserNotFound: If no user with the given ID exists.
+        """
+        version = await self.dao.get_version(user_id)
+        if version is None:
+            raise UserNotFound()
+        return version
+
+    async def get_user_versions(self, limit: int = 100, offset: int = 0) -> List[Tuple[int, int]]:
+        """
+        Retrieve the `(id, version)` pairs of a page of users.
+
+        Args:
+            limit (int, optional): Maximum number of users to return. Defaults to 100.
+            offset (int, optional): Number of records to skip. Defaults to 0.
+
+        Returns:
+            List[Tuple[int, int]]: The id and version of each user on the page.
+        """
+        return await self.dao.get_versions(limit=limit, offset=offset)
+
+    async def get_user_row(self, user_id: int, columns: Sequence[str]) -> Dict[str, Any]:
+        """
+        Retrieve a single user as a plain row mapping, for read-only responses.
+
+        Args:
+            user_id (int): The ID of the user to retrieve.
+            columns (Sequence[str]): Attribute names to select, in output order.
+
+        Returns:
+            Dict[str, Any]: The selected columns of the user.
+
+        Raises:
+            UserNotFound: If no user with the given ID exists.
+        """
+        row = await self.dao.get_row(user_id, columns=columns)
+        if row is None:
+            raise UserNotFound()
+        return row
+
+    async def get_all_user_rows(
+        self, columns: Sequence[str], limit: int = 100, offset: int = 0
+    ) -> List[Dict[str, Any]]:
+        """
+        Retrieve a paginated list of users as plain row mappings, for read-only responses.
+
+        Args:
+            columns (Sequence[str]): Attribute names to select, in output order.
+            limit (int, optional): Maximum number of users to return. Defaults to 100.
+            offset (int, optional): Number of records to skip. Defaults to 0.
+
+        Returns:
+            List[Dict[str, Any]]: One mapping per user.
+        """
+        return await self.dao.get_all_rows(limit=limit, offset=offset, columns=columns)
+
     async def create_user(self, user: UserCreate) -> UserModel:
         """
         Create a new user from validated input data.
@@ -74,7 +249,9 @@ class UserService:
         Returns:
             UserModel: The newly created user record.
         """
-        return await self.dao.create(user)
+        created_user = await self.dao.create(user)
+        response_cache.invalidate_tag(USERS_CACHE_TAG)
+        return created_user
 
     async def update_user(self, user_id: int, user: UserUpdate) -> UserModel:
         """
@@ -89,10 +266,15 @@ class UserService:
 
         Raises:
             UserNotFound: If no user with the given ID exists.
+            PreconditionFailed: If the user was modified concurrently.
         """
-        updated_user = await self.dao.update(user_id, user)
+        try:
+            updated_user = await self.dao.update(user_id, user)
+        except StaleDataError as exc:
+            raise PreconditionFailed("User was modified concurrently") from exc
         if not updated_user:
             raise UserNotFound()
+        response_cache.invalidate_tag(USERS_CACHE_TAG)
         return updated_user
 
     async def delete_user(self, user_id: int) -> UserModel:
@@ -107,8 +289,13 @@ class UserService:
 
         Raises:
             UserNotFound: If no user with the given ID exists.
+            PreconditionFailed: If the user was modified concurrently.
         """
-        deleted_user = await self.dao.delete(user_id)
+        try:
+            deleted_user = await self.dao.delete(user_id)
+        except StaleDataError as exc:
+            raise PreconditionFailed("User was modified concurrently") from exc
         if not deleted_user:
             raise UserNotFound()
+        response_cache.invalidate_tag(USERS_CACHE_TAG)
         return deleted_user
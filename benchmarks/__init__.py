@@ -0,0 +1,7 @@
+"""
+Benchmark and load-test suite for the users API and the request logging pipeline.
+
+Run `python -m benchmarks --help` for usage. Each scenario (transport x database x
+request logging) runs in a fresh interpreter, because the database URL and the
+middleware stack are fixed when the app is imported.
+"""
@@ -0,0 +1,164 @@
+"""
+Command line entry point for the benchmark suite.
+
+Examples:
+    python -m benchmarks run --output results.json
+    python -m benchmarks run --transport socket --database file --logging off
+    python -m benchmarks run --database file --logging off --shards 0,2,4
+    python -m benchmarks compare baseline.json results.json --threshold 0.1
+"""
+
+# pylint: disable=invalid-name
+
+import argparse
+import functools
+import itertools
+import json
+import os
+import platform
+import sqlite3
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+from benchmarks.compare import find_regressions
+from benchmarks.scenario import ROUTES
+
+CHOICES = {
+    "transport": ("inprocess", "socket"),
+    "database": ("memory", "file"),
+    "logging": ("on", "off"),
+    # Number of file-backed SQLite shards holding the users; 0 leaves sharding off.
+    "shards": ("0", "2", "4"),
+}
+
+# Dimensions that do not run every choice unless asked to.
+DEFAULTS = {"shards": ("0",)}
+
+
+def _scenario_env(database: str, logging: str, shards: str, directory: str) -> Dict[str, str]:
+    env = {
+        **os.environ,
+        "SQL_ECHO": "false",
+        "REQUEST_LOGGING_ENABLED": "true" if logging == "on" else "false",
+        # Benchmark clients share one address; do not rate limit them.
+        "RATE_LIMIT_PER_SECOND": "0",
+        "RESPONSE_CACHE_ENABLED": "false",
+    }
+    if database == "memory":
+        env["TESTING"] = "true"
+    else:
+        env["TESTING"] = "false"
+        env["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(directory, 'bench.db')}"
+    env["SHARD_URLS"] = ",".join(
+        f"sqlite+aiosqlite:///{os.path.join(directory, f'shard{index}.db')}"
+        for index in range(int(shards))
+    )
+    return env
+
+
+def run_benchmarks(args: argparse.Namespace) -> Dict[str, Any]:
+    """Run every selected scenario in its own interpreter and collect the results."""
+    results: List[Dict[str, Any]] = []
+    for transport, database, logging, shards in itertools.product(
+        args.transport, args.database, args.logging, args.shards
+    ):
+        scenario = f"{transport}/{database}/logging-{logging}"
+        if shards != "0":
+            scenario += f"/shards-{shards}"
+        print(f"running {scenario}", file=sys.stderr)
+        with tempfile.TemporaryDirectory() as directory:
+            completed = subprocess.run(
+                [
+                    sys.executable,
+                    "-m",
+                    "benchmarks.scenario",
+                    f"--transport={transport}",
+                    f"--requests={args.requests}",
+                    f"--concurrency={args.concurrency}",
+                ],
+                env=_scenario_env(database, logging, shards, directory),
+                stdout=subprocess.PIPE,
+                check=True,
+                text=True,
+            )
+        for result in json.loads(completed.stdout.strip().splitlines()[-1]):
+            results.append({"scenario": scenario, **result})
+    return {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+        },
+        "results": results,
+    }
+
+
+def _print_table(report: Dict[str, Any]) -> None:
+    print(f"{'scenario':<41} {'route':<11} {'rps':>9} {'p50 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for result in report["results"]:
+        print(
+            f"{result['scenario']:<41} {result['route']:<11} {result['throughput_rps']:>9} "
+            f"{result['p50_ms']:>9} {result['p99_ms']:>9} {result['errors']:>7}"
+        )
+
+
+def _selection(value: str, name: str) -> List[str]:
+    selected = CHOICES[name] if value == "all" else tuple(value.split(","))
+    unknown = set(selected) - set(CHOICES[name])
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown {name}: {', '.join(sorted(unknown))}")
+    return list(selected)
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help=f"benchmark the {', '.join(ROUTES)} routes")
+    for name, choices in CHOICES.items():
+        run.add_argument(
+            f"--{name}",
+            type=functools.partial(_selection, name=name),
+            default=list(DEFAULTS.get(name, choices)),
+            help=f"comma-separated subset of {', '.join(choices)}, or 'all'",
+        )
+    run.add_argument("--requests", type=int, default=500, help="requests per route")
+    run.add_argument("--concurrency", type=int, default=16, help="concurrent clients")
+    run.add_argument("--output", help="write the results to this JSON file")
+
+    compare = commands.add_parser("compare", help="fail if results regressed against a baseline")
+    compare.add_argument("baseline")
+    compare.add_argument("current")
+    compare.add_argument(
+        "--threshold", type=float, default=0.1, help="allowed relative change (default 0.1)"
+    )
+
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        report = run_benchmarks(args)
+        _print_table(report)
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as output:
+                json.dump(report, output, indent=2)
+        return 0
+
+    with open(args.baseline, encoding="utf-8") as baseline_file:
+        baseline = json.load(baseline_file)
+    with open(args.current, encoding="utf-8") as current_file:
+        current = json.load(current_file)
+    regressions = find_regressions(baseline, current, args.threshold)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    if not regressions:
+        print(f"no regressions beyond {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
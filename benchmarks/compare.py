@@ -0,0 +1,51 @@
+"""
+Comparison of two benchmark result files.
+"""
+
+from typing import Any, Dict, List, Tuple
+
+# Metrics compared between runs, and whether a higher value is better.
+METRICS: Tuple[Tuple[str, bool], ...] = (
+    ("throughput_rps", True),
+    ("p50_ms", False),
+    ("p99_ms", False),
+)
+
+
+def _key(result: Dict[str, Any]) -> Tuple[str, str]:
+    return result["scenario"], result["route"]
+
+
+def find_regressions(
+    baseline: Dict[str, Any], current: Dict[str, Any], threshold: float
+) -> List[str]:
+    """
+    List every metric that got worse by more than `threshold`.
+
+    Results are matched on scenario and route; results present in only one of
+    the files are ignored.
+
+    Args:
+        baseline (Dict[str, Any]): Results of the reference run.
+        current (Dict[str, Any]): Results of the run under test.
+        threshold (float): Allowed relative change, e.g. 0.1 for 10%.
+
+    Returns:
+        List[str]: One human-readable line per regression.
+    """
+    reference = {_key(result): result for result in baseline["results"]}
+    regressions = []
+    for result in current["results"]:
+        before = reference.get(_key(result))
+        if before is None:
+            continue
+        for metric, higher_is_better in METRICS:
+            old, new = before[metric], result[metric]
+            if not old:
+                continue
+            change = (new - old) / old
+            worse = -change if higher_is_better else change
+            if worse > threshold:
+                scenario, route = _key(result)
+                regressions.append(f"{scenario} {route}: {metric} {old} -> {new} ({change:+.1%})")
+    return regressions
@@ -0,0 +1,76 @@
+"""
+Closed-loop load generation and latency statistics.
+"""
+
+import asyncio
+import math
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Sequence
+
+import httpx
+
+# Issues request number `i` and returns the response.
+RequestFactory = Callable[[httpx.AsyncClient, int], Awaitable[httpx.Response]]
+
+
+def percentile(sorted_values: Sequence[float], fraction: float) -> float:
+    """
+    Nearest-rank percentile of already sorted values.
+
+    Args:
+        sorted_values (Sequence[float]): Values in ascending order.
+        fraction (float): Percentile as a fraction, e.g. 0.99.
+
+    Returns:
+        float: The percentile, or 0.0 for no values.
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+async def run_load(
+    client: httpx.AsyncClient, make_request: RequestFactory, requests: int, concurrency: int
+) -> Dict[str, Any]:
+    """
+    Issue `requests` requests from `concurrency` concurrent workers.
+
+    Each worker sends its next request as soon as the previous one completes, so
+    throughput is what the server sustains at that concurrency.
+
+    Args:
+        client (httpx.AsyncClient): Client bound to the app under test.
+        make_request (RequestFactory): Issues request number `i`.
+        requests (int): Total number of requests.
+        concurrency (int): Number of concurrent workers.
+
+    Returns:
+        Dict[str, Any]: Request and error counts, throughput and latency percentiles.
+    """
+    latencies: List[float] = []
+    errors = 0
+    next_index = 0
+
+    async def worker() -> None:
+        nonlocal errors, next_index
+        while next_index < requests:
+            index = next_index
+            next_index += 1
+            started = time.perf_counter()
+            response = await make_request(client, index)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests": requests,
+        "errors": errors,
+        "throughput_rps": round(requests / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+    }
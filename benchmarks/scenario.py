@@ -0,0 +1,144 @@
+"""
+Run the CRUD benchmark for one scenario and print its results as JSON.
+
+Invoked by `python -m benchmarks run` in a fresh interpreter whose environment
+selects the database and middleware stack; not meant to be run directly.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List
+
+import httpx
+
+from benchmarks.load import RequestFactory, run_load
+
+ROUTES = ("create", "get", "list", "list_fields", "update", "delete")
+
+
+def _route_requests(ids: List[int]) -> Dict[str, RequestFactory]:
+    """Request factories per route; `create` records the new ids for the others."""
+
+    async def create(client: httpx.AsyncClient, i: int) -> httpx.Response:
+        payload = {"first_name": "Bench", "last_name": f"User{i}", "email": f"bench{i}@example.com"}
+        response = await client.post("/users", json=payload)
+        if response.status_code == 201:
+            ids.append(response.json()["id"])
+        return response
+
+    async def get(client: httpx.AsyncClient, i: int) -> httpx.Response:
+        return await client.get(f"/users/{ids[i % len(ids)]}")
+
+    async def list_users(client: httpx.AsyncClient, i: int) -> httpx.Response:
+        # pylint: disable=unused-argument
+        return await client.get("/users", params={"limit": 100})
+
+    async def list_fields(client: httpx.AsyncClient, i: int) -> httpx.Response:
+        # pylint: disable=unused-argument
+        return await client.get("/users", params={"limit": 100, "fields": "id,email"})
+
+    async def update(client: httpx.AsyncClient, i: int) -> httpx.Response:
+        return await client.patch(f"/users/{ids[i % len(ids)]}", json={"last_name": f"Up{i}"})
+
+    async def delete(client: httpx.AsyncClient, i: int) -> httpx.Response:
+        return await client.delete(f"/users/{ids[i]}")
+
+    return {
+        "create": create,
+        "get": get,
+        "list": list_users,
+        "list_fields": list_fields,
+        "update": update,
+        "delete": delete,
+    }
+
+
+@asynccontextmanager
+async def _inprocess_client() -> AsyncIterator[httpx.AsyncClient]:
+    # Imported here so the app reads the environment prepared by the parent.
+    from app.main import app  # pylint: disable=import-outside-toplevel
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            yield client
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return int(sock.getsockname()[1])
+
+
+@asynccontextmanager
+async def _socket_client(concurrency: int) -> AsyncIterator[httpx.AsyncClient]:
+    port = _free_port()
+    command = [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port)]
+    server = subprocess.Popen(  # pylint: disable=consider-using-with
+        [*command, "--log-level", "warning", "--no-access-log"], env=os.environ.copy()
+    )
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    try:
+        async with httpx.AsyncClient(
+            base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=30
+        ) as client:
+            deadline = time.monotonic() + 30
+            while True:
+                try:
+                    await client.get("/openapi.json")
+                    break
+                except httpx.TransportError:
+                    if time.monotonic() > deadline or server.poll() is not None:
+                        raise RuntimeError("uvicorn did not start") from None
+                    await asyncio.sleep(0.1)
+            yield client
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+async def run_scenario(transport: str, requests: int, concurrency: int) -> List[Dict[str, Any]]:
+    """
+    Benchmark every route in order against a fresh database.
+
+    Args:
+        transport (str): 'inprocess' (ASGI calls) or 'socket' (local uvicorn).
+        requests (int): Requests per route.
+        concurrency (int): Concurrent clients.
+
+    Returns:
+        List[Dict[str, Any]]: One result per route.
+    """
+    ids: List[int] = []
+    factories = _route_requests(ids)
+    client_context = (
+        _inprocess_client() if transport == "inprocess" else _socket_client(concurrency)
+    )
+    results = []
+    async with client_context as client:
+        for route in ROUTES:
+            count = min(requests, len(ids)) if route == "delete" else requests
+            result = await run_load(client, factories[route], count, concurrency)
+            results.append({"route": route, **result})
+    return results
+
+
+def main(argv: List[str]) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--transport", choices=("inprocess", "socket"), required=True)
+    parser.add_argument("--requests", type=int, required=True)
+    parser.add_argument("--concurrency", type=int, required=True)
+    args = parser.parse_args(argv)
+    results = asyncio.run(run_scenario(args.transport, args.requests, args.concurrency))
+    json.dump(results, sys.stdout)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,11 @@
+"""
+Production entry point: runs the API across multiple worker processes.
+
+Usage:
+    python serve.py --workers 4 --host 0.0.0.0 --port 8000
+"""
+
+from app.core.launcher import main
+
+if __name__ == "__main__":
+    main()
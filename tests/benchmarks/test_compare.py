@@ -0,0 +1,41 @@
+"""
+Tests for benchmark statistics and regression detection.
+"""
+
+from typing import Any, Dict
+
+from benchmarks.compare import find_regressions
+from benchmarks.load import percentile
+
+
+def _report(throughput: float, p99: float) -> Dict[str, Any]:
+    return {
+        "results": [
+            {
+                "scenario": "inprocess/memory/logging-on",
+                "route": "get",
+                "throughput_rps": throughput,
+                "p50_ms": 1.0,
+                "p99_ms": p99,
+            }
+        ]
+    }
+
+
+def test_percentile_uses_nearest_rank() -> None:
+    values = [float(value) for value in range(1, 101)]
+    assert percentile(values, 0.5) == 50.0
+    assert percentile(values, 0.99) == 99.0
+    assert percentile([], 0.99) == 0.0
+
+
+def test_changes_within_threshold_pass() -> None:
+    assert not find_regressions(_report(100, 10), _report(95, 10.5), threshold=0.1)
+    assert not find_regressions(_report(100, 10), _report(200, 5), threshold=0.1)
+
+
+def test_throughput_drop_and_latency_rise_are_regressions() -> None:
+    regressions = find_regressions(_report(100, 10), _report(80, 12), threshold=0.1)
+    assert len(regressions) == 2
+    assert "throughput_rps" in regressions[0]
+    assert "p99_ms" in regressions[1]
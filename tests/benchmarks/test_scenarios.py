@@ -0,0 +1,23 @@
+"""
+Tests for the environment each benchmark scenario runs in.
+"""
+
+import os
+
+from benchmarks.__main__ import _scenario_env
+
+
+def test_unsharded_scenario_clears_shard_urls() -> None:
+    env = _scenario_env("memory", "off", "0", "/tmp/bench")
+    assert env["TESTING"] == "true"
+    assert env["SHARD_URLS"] == ""
+
+
+def test_sharded_scenario_gets_one_file_database_per_shard() -> None:
+    env = _scenario_env("file", "on", "4", "/tmp/bench")
+    urls = env["SHARD_URLS"].split(",")
+    assert urls == [
+        f"sqlite+aiosqlite:///{os.path.join('/tmp/bench', f'shard{index}.db')}"
+        for index in range(4)
+    ]
+    assert env["DATABASE_URL"] not in urls
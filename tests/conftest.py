@@ -1,16 +1,76 @@
 """
 This module contains fixtures for setting up the test environment.
+
+Tests run against an in-memory database, so every pytest-xdist worker
+(`pytest -n auto`) gets its own. The schema is created once per session. Each test
+then runs inside an outer transaction on the database's single connection: every
+session the app opens joins it through a SAVEPOINT, so DAO commits only release
+savepoints, and the test ends with a single rollback.
 """
 
+import os
+
+# Must be set before the app is imported, as the engine is created at import time.
+os.environ.setdefault("TESTING", "true")
+
+# pylint: disable=wrong-import-position
+from typing import Any, AsyncIterator
+
 import pytest
-from app.core.database import Base, engine
+import pytest_asyncio
+from sqlalchemy import Connection, event
 
+from app.core.database import AsyncSessionLocal, Base, engine
 
-@pytest.fixture(autouse=True)
-async def reset_db() -> None:
-    """
-    Fixture to reset the database before each test.
-    """
+
+# pysqlite (and so aiosqlite) only emits BEGIN lazily before DML and commits on its
+# own, which breaks SAVEPOINTs inside an outer transaction. Let SQLAlchemy emit
+# BEGIN itself instead; see the "Serializable isolation / Savepoints" recipe in
+# SQLAlchemy's SQLite dialect documentation.
+@event.listens_for(engine.sync_engine, "connect")
+def _disable_driver_transactions(dbapi_connection: Any, connection_record: Any) -> None:
+    # pylint: disable=unused-argument
+    dbapi_connection.isolation_level = None
+
+
+@event.listens_for(engine.sync_engine, "begin")
+def _begin(conn: Connection) -> None:
+    conn.exec_driver_sql("BEGIN")
+
+
+async def _create_schema() -> None:
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
         await conn.run_sync(Base.metadata.create_all)
+
+
+@pytest_asyncio.fixture(scope="session", name="db_schema")
+async def fixture_db_schema() -> None:
+    """
+    Fixture to create the database schema once per test session.
+    """
+    await _create_schema()
+
+
+@pytest.fixture(autouse=True)
+async def db_transaction(request: pytest.FixtureRequest, db_schema: None) -> AsyncIterator[None]:
+    """
+    Fixture to run each test inside a transaction that is rolled back afterwards.
+
+    Tests marked `commits` run without it, against the engine's real transactions,
+    and the schema is recreated after them instead.
+    """
+    # pylint: disable=unused-argument
+    if request.node.get_closest_marker("commits"):
+        yield
+        await _create_schema()
+        return
+    session_options = dict(AsyncSessionLocal.kw)
+    async with engine.connect() as conn:
+        transaction = await conn.begin()
+        AsyncSessionLocal.configure(bind=conn, join_transaction_mode="create_savepoint")
+        try:
+            yield
+        finally:
+            AsyncSessionLocal.kw = session_options
+            await transaction.rollback()
@@ -0,0 +1,126 @@
+"""
+Tests for admission control and per-client rate limiting.
+"""
+
+import asyncio
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from httpx import ASGITransport, AsyncClient
+
+import app.core.config as config
+from app.core.admission.limits import ConcurrencyGate, TokenBucketStore
+from app.core.admission.middleware import AdmissionMiddleware
+
+
+class TestTokenBucketStore:
+    """Unit tests for the token bucket store."""
+
+    def test_burst_then_refill(self) -> None:
+        buckets = TokenBucketStore(rate=1, burst=2, idle_ttl=60, max_entries=10)
+        assert buckets.consume("a", now=0) == 0
+        assert buckets.consume("a", now=0) == 0
+        assert buckets.consume("a", now=0) == 1.0
+        assert buckets.consume("a", now=1) == 0
+
+    def test_clients_are_independent(self) -> None:
+        buckets = TokenBucketStore(rate=1, burst=1, idle_ttl=60, max_entries=10)
+        assert buckets.consume("a", now=0) == 0
+        assert buckets.consume("b", now=0) == 0
+
+    def test_idle_and_excess_entries_are_evicted(self) -> None:
+        buckets = TokenBucketStore(rate=1, burst=1, idle_ttl=10, max_entries=2)
+        buckets.consume("a", now=0)
+        buckets.consume("b", now=5)
+        buckets.consume("c", now=12)
+        assert len(buckets) == 2
+        buckets.consume("c", now=30)
+        assert len(buckets) == 1
+
+
+class TestConcurrencyGate:
+    """Unit tests for the concurrency gate."""
+
+    async def test_rejects_after_timeout_when_full(self) -> None:
+        gate = ConcurrencyGate(1)
+        assert await gate.acquire(0)
+        assert not await gate.acquire(0)
+        assert not await gate.acquire(0.01)
+
+    async def test_release_hands_slot_to_waiter(self) -> None:
+        gate = ConcurrencyGate(1)
+        assert await gate.acquire(0)
+        waiter = asyncio.create_task(gate.acquire(1))
+        await asyncio.sleep(0)
+        gate.release()
+        assert await waiter
+        assert gate.in_flight == 1
+
+
+def test_rate_limited_client_gets_429() -> None:
+    app = FastAPI()
+    app.add_middleware(AdmissionMiddleware, rate=0.001, burst=1, route_limits={})
+
+    @app.get("/ping")
+    async def ping() -> dict:
+        return {}
+
+    client = TestClient(app)
+    assert client.get("/ping", headers={"X-User-Id": "noisy"}).status_code == 200
+    response = client.get("/ping", headers={"X-User-Id": "noisy"})
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+    assert client.get("/ping", headers={"X-User-Id": "quiet"}).status_code == 200
+
+
+async def test_request_over_capacity_gets_503() -> None:
+    app = FastAPI()
+    app.add_middleware(
+        AdmissionMiddleware, max_in_flight=1, route_limits={}, queue_timeout=0.01, rate=0
+    )
+    release = asyncio.Event()
+
+    @app.get("/hold")
+    async def hold() -> dict:
+        await release.wait()
+        return {}
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        held = asyncio.create_task(client.get("/hold"))
+        await asyncio.sleep(0.05)
+        rejected = await client.get("/hold")
+        release.set()
+        assert (await held).status_code == 200
+    assert rejected.status_code == 503
+    assert rejected.headers["Retry-After"] == "1"
+
+
+async def test_long_polls_do_not_hold_the_parent_prefix_slots() -> None:
+    assert "/users/changes" in config.ADMISSION_ROUTE_LIMITS
+    app = FastAPI()
+    app.add_middleware(
+        AdmissionMiddleware,
+        route_limits={"/users/changes": 2, "/users": 2},
+        queue_timeout=0.01,
+        rate=0,
+    )
+    release = asyncio.Event()
+
+    @app.get("/users/changes")
+    async def changes() -> dict:
+        await release.wait()
+        return {}
+
+    @app.get("/users")
+    async def users() -> dict:
+        return {}
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        polls = [asyncio.create_task(client.get("/users/changes")) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        assert (await client.get("/users")).status_code == 200
+        assert (await client.get("/users/changes")).status_code == 503
+        release.set()
+        assert [(await poll).status_code for poll in polls] == [200, 200]
@@ -0,0 +1,138 @@
+"""
+Tests for response compression.
+"""
+
+import json
+import zlib
+from typing import AsyncIterator
+
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from app.core.compression.codecs import StreamCompressor, is_compressible, negotiate_encoding
+from app.core.compression.middleware import CompressionMiddleware
+from app.core.database import AsyncSessionLocal
+from app.core.logging.models import APILog
+from app.main import app as main_app
+
+
+class TestNegotiateEncoding:
+    """Unit tests for Accept-Encoding negotiation."""
+
+    def test_prefers_gzip_then_deflate(self) -> None:
+        assert negotiate_encoding("deflate, gzip") == "gzip"
+        assert negotiate_encoding("deflate") == "deflate"
+        assert negotiate_encoding("gzip;q=0.5, deflate") == "deflate"
+
+    def test_refusals_and_wildcards(self) -> None:
+        assert negotiate_encoding(None) is None
+        assert negotiate_encoding("br, identity") is None
+        assert negotiate_encoding("gzip;q=0, *") == "deflate"
+        assert negotiate_encoding("*;q=0") is None
+
+    def test_compressible_types(self) -> None:
+        assert is_compressible("application/json")
+        assert is_compressible("text/html; charset=utf-8")
+        assert is_compressible("application/problem+json")
+        assert not is_compressible("image/png")
+
+
+def test_stream_compressor_output_decodes_incrementally() -> None:
+    compressor = StreamCompressor("gzip", 6)
+    decoder = zlib.decompressobj(31)
+    assert decoder.decompress(compressor.compress(b"first ")) == b"first "
+    assert decoder.decompress(compressor.compress(b"second")) == b"second"
+    decoder.decompress(compressor.finish())
+    assert decoder.eof
+    assert compressor.bytes_in == 12
+
+
+def _app(**options: int) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, **options)
+
+    @app.get("/text")
+    async def text(size: int) -> PlainTextResponse:
+        return PlainTextResponse("x" * size)
+
+    @app.get("/stream")
+    async def stream() -> StreamingResponse:
+        async def lines() -> AsyncIterator[str]:
+            for i in range(100):
+                yield f"line {i}\n"
+
+        return StreamingResponse(lines(), media_type="text/plain")
+
+    return app
+
+
+def test_small_bodies_and_unwilling_clients_are_not_compressed() -> None:
+    client = TestClient(_app(min_size=100))
+    small = client.get("/text", params={"size": 50}, headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+    identity = client.get("/text", params={"size": 500}, headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in identity.headers
+    assert identity.text == "x" * 500
+
+
+def test_large_and_streaming_bodies_are_compressed() -> None:
+    client = TestClient(_app(min_size=100, thread_threshold=256))
+    response = client.get("/text", params={"size": 5000}, headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.text == "x" * 5000
+
+    with client.stream("GET", "/stream", headers={"Accept-Encoding": "deflate"}) as streamed:
+        assert streamed.headers["content-encoding"] == "deflate"
+        raw = b"".join(streamed.iter_raw())
+    assert zlib.decompress(raw).decode() == "".join(f"line {i}\n" for i in range(100))
+
+
+async def test_logged_bodies_stay_uncompressed() -> None:
+    client = TestClient(main_app)
+    for i in range(30):
+        client.post(
+            "/users",
+            json={"first_name": "Bulk", "last_name": f"User{i}", "email": f"u{i}@example.com"},
+        )
+    response = client.get("/users", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert len(response.json()) == 30
+
+    async with AsyncSessionLocal() as session:
+        logged = (
+            await session.execute(
+                select(APILog.response_body).where(APILog.path == "/users", APILog.method == "GET")
+            )
+        ).scalar_one()
+    assert logged is not None
+    assert json.loads(logged) == response.json()
+
+
+def test_each_coding_gets_its_own_strong_etag() -> None:
+    client = TestClient(main_app)
+    for i in range(30):
+        client.post(
+            "/users",
+            json={"first_name": "Tag", "last_name": f"User{i}", "email": f"t{i}@example.com"},
+        )
+    plain = client.get("/users", headers={"Accept-Encoding": "identity"}).headers["ETag"]
+    gzipped = client.get("/users", headers={"Accept-Encoding": "gzip"})
+    deflated = client.get("/users", headers={"Accept-Encoding": "deflate"})
+    assert gzipped.headers["ETag"] == plain[:-1] + '-gzip"'
+    assert len({plain, gzipped.headers["ETag"], deflated.headers["ETag"]}) == 3
+
+    revalidated = client.get(
+        "/users",
+        headers={"Accept-Encoding": "gzip", "If-None-Match": gzipped.headers["ETag"]},
+    )
+    assert revalidated.status_code == 304
+    assert revalidated.headers["ETag"] == gzipped.headers["ETag"]
+    assert (
+        client.get(
+            "/users", headers={"Accept-Encoding": "identity", "If-None-Match": plain}
+        ).status_code
+        == 304
+    )
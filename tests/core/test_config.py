@@ -0,0 +1,22 @@
+"""
+Tests for configuration helpers.
+"""
+
+from app.core.config import PrefixRules
+
+
+def test_longest_matching_prefix_wins() -> None:
+    rules = PrefixRules({"/users": 1, "/users/changes": 2, "/": 3})
+    assert rules.match("/users/changes") == 2
+    assert rules.match("/users/changes/1") == 2
+    assert rules.match("/users/42") == 1
+    assert rules.match("/admin") == 3
+
+
+def test_prefixes_match_whole_path_segments() -> None:
+    rules = PrefixRules({"/users": 1, "/admin/": 2})
+    assert rules.match("/users") == 1
+    assert rules.match("/admin") == 2 and rules.match("/admin/logs") == 2
+    assert rules.match("/users-export") is None
+    assert rules.match("/administrator") is None
+    assert rules.match("/") is None
@@ -0,0 +1,72 @@
+"""
+Tests for database initialization and startup helpers.
+"""
+
+from pathlib import Path
+
+import pytest
+from sqlalchemy import Column, Integer, MetaData, Table, inspect, text
+
+from app.core.database import (
+    add_missing_columns,
+    compute_schema_fingerprint,
+    create_database_engine,
+    engine,
+    init_db,
+    warm_up_pool,
+)
+from app.core.logging.models import APILog
+from app.users.models import UserModel
+
+
+@pytest.mark.commits
+async def test_init_db_skips_create_all_when_fingerprint_unchanged() -> None:
+    assert await init_db() is True
+    assert await init_db() is False
+
+
+def test_schema_fingerprint_is_stable() -> None:
+    assert compute_schema_fingerprint() == compute_schema_fingerprint()
+
+
+@pytest.mark.commits
+async def test_warm_up_pool_is_capped_at_pool_size() -> None:
+    assert await warm_up_pool(0) == 0
+    assert await warm_up_pool(1000) == engine.pool.size()  # type: ignore[attr-defined]
+
+
+async def test_new_columns_are_added_to_existing_tables(tmp_path: Path) -> None:
+    old_engine = create_database_engine(f"sqlite+aiosqlite:///{tmp_path / 'old.db'}")
+    try:
+        async with old_engine.begin() as conn:
+            await conn.execute(
+                text(
+                    "CREATE TABLE users (id INTEGER PRIMARY KEY, first_name VARCHAR(100) NOT NULL,"
+                    " last_name VARCHAR(100) NOT NULL, email VARCHAR(255) NOT NULL UNIQUE)"
+                )
+            )
+            await conn.execute(
+                text("INSERT INTO users VALUES (1, 'Old', 'User', 'old@example.com')")
+            )
+            added = await conn.run_sync(
+                add_missing_columns, [UserModel.__table__, APILog.__table__]
+            )
+            assert added == ["users.version"]
+            assert (await conn.execute(text("SELECT version FROM users"))).scalar() == 1
+            indexes = await conn.run_sync(
+                lambda sync_conn: {
+                    index["name"] for index in inspect(sync_conn).get_indexes("users")
+                }
+            )
+            assert {"ix_users_id", "ix_users_email"} <= indexes
+
+            required = Table(
+                "users",
+                MetaData(),
+                Column("id", Integer, primary_key=True),
+                Column("rank", Integer, nullable=False),
+            )
+            with pytest.raises(RuntimeError, match="users.rank"):
+                await conn.run_sync(add_missing_columns, [required])
+    finally:
+        await old_engine.dispose()
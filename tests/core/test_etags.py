@@ -0,0 +1,46 @@
+"""
+Unit tests for ETag helpers.
+"""
+
+from app.core.etags import (
+    add_coding_suffix,
+    if_match_matches,
+    if_none_match_matches,
+    make_etag,
+    strip_coding_suffixes,
+)
+
+
+def test_make_etag_is_quoted_and_deterministic() -> None:
+    etag = make_etag(1, 2)
+    assert etag.startswith('"') and etag.endswith('"')
+    assert etag == make_etag(1, 2)
+    assert etag != make_etag(12)
+
+
+def test_if_none_match_uses_weak_comparison() -> None:
+    etag = make_etag(1, 1)
+    assert if_none_match_matches(f'"other", W/{etag}', etag)
+    assert if_none_match_matches("*", etag)
+    assert not if_none_match_matches('"other"', etag)
+    assert not if_none_match_matches(None, etag)
+
+
+def test_if_match_uses_strong_comparison() -> None:
+    etag = make_etag(1, 1)
+    assert if_match_matches(None, etag)
+    assert if_match_matches(etag, etag)
+    assert if_match_matches("*", etag)
+    assert not if_match_matches(f"W/{etag}", etag)
+
+
+def test_coding_suffixes_round_trip() -> None:
+    etag = make_etag(1, 1)
+    gzip_etag = add_coding_suffix(etag, "gzip")
+    assert gzip_etag != etag and gzip_etag.endswith('-gzip"')
+    assert add_coding_suffix(f"W/{etag}", "gzip") == f"W/{etag}"
+    assert strip_coding_suffixes(f'{gzip_etag}, "other"', ["gzip", "deflate"]) == (
+        f'{etag}, "other"',
+        "gzip",
+    )
+    assert strip_coding_suffixes(etag, ["gzip"]) == (etag, None)
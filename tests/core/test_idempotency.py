@@ -0,0 +1,167 @@
+"""
+Tests for the idempotency key store and middleware.
+"""
+
+import asyncio
+from typing import Any, Dict, List
+
+import pytest
+from fastapi import FastAPI, Response
+from fastapi.testclient import TestClient
+from httpx import ASGITransport, AsyncClient
+from starlette.responses import JSONResponse
+
+from app.core.idempotency.middleware import IdempotencyMiddleware
+from app.core.idempotency.store import IdempotencyStore, StoredResponse
+from app.core.setup import create_app
+
+
+USER_PAYLOAD: Dict[str, Any] = {
+    "email": "retry@example.com",
+    "first_name": "Retry",
+    "last_name": "Test",
+}
+
+
+def _entry(body: bytes, expires_at: float = 100.0) -> StoredResponse:
+    headers = [("content-type", "application/json"), ("set-cookie", "a=1"), ("set-cookie", "b=2")]
+    return StoredResponse(201, headers, body, b"f", expires_at)
+
+
+class TestIdempotencyStore:
+    """Unit tests for the idempotency store."""
+
+    async def test_finish_stores_the_entry_and_wakes_duplicates(self) -> None:
+        store = IdempotencyStore(lease=60)
+        assert await store.claim(b"k", b"f", now=0) == (True, None)
+        assert await store.claim(b"k", b"f", now=0) == (False, None)
+        waiter = store.waiter(b"k")
+        assert waiter is not None and not waiter.done()
+        entry = _entry(b"{}")
+        await store.finish(b"k", entry)
+        assert await waiter is entry and store.waiter(b"k") is None
+        claimed, stored = await store.claim(b"k", b"f", now=1)
+        assert not claimed and stored is not None
+        assert (stored.status_code, stored.body, stored.fingerprint) == (201, b"{}", b"f")
+        assert stored.headers == entry.headers
+        assert await store.claim(b"k", b"f", now=100.0) == (True, None)
+        await store.finish(b"k", None)
+
+    async def test_failed_requests_release_the_key(self) -> None:
+        store = IdempotencyStore(lease=60)
+        await store.claim(b"k", b"f")
+        await store.finish(b"k", None)
+        assert await store.claim(b"k", b"f") == (True, None)
+        await store.finish(b"k", None)
+
+    async def test_key_of_a_request_that_never_finished_is_freed_after_the_lease(self) -> None:
+        holder, other_worker = IdempotencyStore(lease=60), IdempotencyStore(lease=60)
+        assert await holder.claim(b"k", b"f", now=0) == (True, None)
+        assert await other_worker.claim(b"k", b"f", now=59) == (False, None)
+        assert await other_worker.claim(b"k", b"f", now=60) == (True, None)
+        await other_worker.finish(b"k", None)
+
+
+def _counting_app(calls: List[str], delay: float = 0.0, status_codes: Any = None) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(IdempotencyMiddleware, store=IdempotencyStore(lease=60), ttls={"/items": 60})
+
+    @app.post("/items")
+    async def create_item(payload: Dict[str, Any]) -> JSONResponse:
+        calls.append(payload["name"])
+        await asyncio.sleep(delay)
+        status_code = next(status_codes) if status_codes is not None else 201
+        return JSONResponse({"id": len(calls)}, status_code=status_code)
+
+    return app
+
+
+@pytest.mark.commits
+async def test_concurrent_duplicates_wait_for_the_first_response() -> None:
+    calls: List[str] = []
+    transport = ASGITransport(app=_counting_app(calls, delay=0.1))
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        headers = {"Idempotency-Key": "abc"}
+        responses = await asyncio.gather(
+            *(client.post("/items", json={"name": "a"}, headers=headers) for _ in range(5))
+        )
+    assert calls == ["a"]
+    assert {response.json()["id"] for response in responses} == {1}
+    assert sorted(response.headers.get("Idempotent-Replayed", "") for response in responses) == [
+        "",
+        "true",
+        "true",
+        "true",
+        "true",
+    ]
+
+
+def test_server_errors_are_not_stored_and_keys_are_per_request() -> None:
+    calls: List[str] = []
+    client = TestClient(_counting_app(calls, status_codes=iter([503, 201, 201])))
+    headers = {"Idempotency-Key": "abc"}
+    assert client.post("/items", json={"name": "a"}, headers=headers).status_code == 503
+    assert client.post("/items", json={"name": "a"}, headers=headers).status_code == 201
+    assert client.post("/items", json={"name": "b"}, headers=headers).status_code == 422
+    assert client.post("/items", json={"name": "b"}).status_code == 201
+    assert calls == ["a", "a", "b"]
+    assert client.post("/items", json={}, headers={"Idempotency-Key": "x" * 256}).status_code == 400
+
+
+@pytest.mark.commits
+async def test_duplicates_in_another_worker_wait_for_the_first_response() -> None:
+    calls: List[str] = []
+    # Two apps with stores of their own stand in for two worker processes.
+    workers = [_counting_app(calls, delay=0.2), _counting_app(calls)]
+    headers = {"Idempotency-Key": "abc"}
+
+    async def post(app: FastAPI, delay: float) -> Any:
+        await asyncio.sleep(delay)
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post("/items", json={"name": "a"}, headers=headers)
+
+    first, retry = await asyncio.gather(post(workers[0], 0), post(workers[1], 0.05))
+    assert calls == ["a"]
+    assert first.json() == retry.json() == {"id": 1}
+    assert retry.headers["Idempotent-Replayed"] == "true"
+
+
+def test_replayed_responses_keep_repeated_headers() -> None:
+    app = FastAPI()
+    app.add_middleware(IdempotencyMiddleware, store=IdempotencyStore(lease=60), ttls={"/items": 60})
+
+    @app.post("/items")
+    async def create_item() -> Response:
+        response = JSONResponse({"id": 1}, status_code=201)
+        response.set_cookie("a", "1")
+        response.set_cookie("b", "2")
+        return response
+
+    client = TestClient(app)
+    headers = {"Idempotency-Key": "abc"}
+    first = client.post("/items", headers=headers)
+    retry = client.post("/items", headers=headers)
+    for response in (first, retry):
+        cookies = response.headers.get_list("set-cookie")
+        assert [cookie.split(";")[0] for cookie in cookies] == ["a=1", "b=2"]
+    assert retry.headers["Idempotent-Replayed"] == "true"
+
+
+def test_retried_user_creation_is_replayed() -> None:
+    client = TestClient(create_app())
+    headers = {"Idempotency-Key": "create-user", "X-User-Id": "42"}
+    first = client.post("/users", json=USER_PAYLOAD, headers=headers)
+    retry = client.post("/users", json=USER_PAYLOAD, headers=headers)
+    assert first.status_code == retry.status_code == 201
+    assert retry.json() == first.json()
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert len(client.get("/users").json()) == 1
+
+    # Keys are scoped to the client.
+    other = client.post(
+        "/users",
+        json={**USER_PAYLOAD, "email": "other@example.com"},
+        headers={"Idempotency-Key": "create-user", "X-User-Id": "7"},
+    )
+    assert other.status_code == 201 and "Idempotent-Replayed" not in other.headers
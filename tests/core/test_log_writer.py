@@ -0,0 +1,75 @@
+"""
+Tests for log persistence through the writer queue.
+"""
+
+import multiprocessing
+import os
+import queue
+import signal
+from typing import Any, Dict
+
+from sqlalchemy import func, select
+
+from app.core.database import AsyncSessionLocal
+from app.core.logging.models import APILog, eastern_now
+from app.core.logging.writer import drain_log_queue, persist_log, run_log_writer, set_log_queue
+
+
+def _record(path: str) -> Dict[str, Any]:
+    return {
+        "created_at": eastern_now(),
+        "method": "GET",
+        "path": path,
+        "query_string": "",
+        "request_body": None,
+        "response_body": "[]",
+        "status_code": 200,
+        "duration_ms": 1.0,
+        "user_id": None,
+        "client_host": "127.0.0.1",
+    }
+
+
+async def _log_count() -> int:
+    async with AsyncSessionLocal() as session:
+        count_stmt = select(func.count()).select_from(APILog)  # pylint: disable=not-callable
+        return (await session.execute(count_stmt)).scalar_one()
+
+
+async def test_persist_log_enqueues_when_queue_is_set() -> None:
+    log_queue: "queue.Queue[Any]" = queue.Queue()
+    set_log_queue(log_queue)
+    try:
+        await persist_log(_record("/users"))
+    finally:
+        set_log_queue(None)
+    assert log_queue.get_nowait()["path"] == "/users"
+    assert await _log_count() == 0
+
+
+async def test_drain_log_queue_writes_everything_before_sentinel() -> None:
+    log_queue: "queue.Queue[Any]" = queue.Queue()
+    for index in range(5):
+        log_queue.put(_record(f"/users/{index}"))
+    log_queue.put(None)
+    assert await drain_log_queue(log_queue, batch_size=2) == 5
+    assert await _log_count() == 5
+
+
+def test_log_writer_survives_sigterm_until_drained() -> None:
+    spawn = multiprocessing.get_context("spawn")
+    log_queue = spawn.Queue()
+    ready = spawn.Event()
+    writer = spawn.Process(target=run_log_writer, args=(log_queue, ready))
+    writer.start()
+    try:
+        assert ready.wait(60)
+        os.kill(writer.pid or 0, signal.SIGTERM)
+        writer.join(0.5)
+        assert writer.is_alive()
+        log_queue.put(None)
+        writer.join(10)
+        assert writer.exitcode == 0
+    finally:
+        if writer.is_alive():
+            writer.kill()
@@ -0,0 +1,96 @@
+"""
+Tests for the event-loop lag monitor and its admin page.
+"""
+
+import asyncio
+import os
+import time
+from typing import Awaitable, Callable
+
+from fastapi import FastAPI, Request, Response
+from fastapi.testclient import TestClient
+from httpx import ASGITransport, AsyncClient
+
+from app.core.eventloop.middleware import LoopMonitorMiddleware
+from app.core.eventloop.monitor import (
+    LAG_BUCKETS_MS,
+    LagHistogram,
+    LoopMonitor,
+    SlowCallback,
+    loop_monitor,
+)
+from app.core.setup import create_app
+
+
+def _block_the_loop(seconds: float) -> None:
+    time.sleep(seconds)
+
+
+def test_histogram_buckets_are_upper_bounds() -> None:
+    histogram = LagHistogram()
+    for lag_ms in (0.2, 1.0, 1.5, 75.0, 5000.0):
+        histogram.observe(lag_ms)
+    stats = histogram.as_dict()
+    counts = {bucket["le_ms"]: bucket["count"] for bucket in stats["buckets"]}
+    assert counts[1] == 2 and counts[2] == 1 and counts[100] == 1 and counts[None] == 1
+    assert len(stats["buckets"]) == len(LAG_BUCKETS_MS) + 1
+    assert stats["count"] == 5 and stats["max_ms"] == 5000.0
+
+
+async def test_stall_is_recorded_with_its_stack_and_request() -> None:
+    monitor = LoopMonitor(interval_ms=5, slow_ms=50, max_events=10)
+    app = FastAPI()
+
+    @app.middleware("http")
+    async def spawn_task(
+        request: Request, call_next: Callable[[Request], Awaitable[Response]]
+    ) -> Response:
+        # BaseHTTPMiddleware runs the route in a task of its own.
+        return await call_next(request)
+
+    app.add_middleware(LoopMonitorMiddleware, monitor=monitor)
+
+    @app.get("/slow")
+    async def slow() -> dict:
+        _block_the_loop(0.3)
+        return {}
+
+    monitor.start()
+    try:
+        await asyncio.sleep(0.05)
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            assert (await client.get("/slow")).status_code == 200
+        await asyncio.sleep(0.05)
+    finally:
+        await monitor.stop()
+
+    assert not monitor.running
+    snapshot = monitor.snapshot()
+    assert snapshot["lag"]["count"] > 0 and snapshot["lag"]["max_ms"] >= 250
+    slow_events = [event for event in snapshot["slow_callbacks"] if event["lag_ms"] >= 250]
+    assert len(slow_events) == 1
+    assert slow_events[0]["request"] == "GET /slow"
+    assert "_block_the_loop" in "".join(slow_events[0]["stack"])
+
+
+def test_admin_page_shows_the_histogram_and_slow_callbacks() -> None:
+    loop_monitor.reset()
+    loop_monitor.histogram.observe(0.5)
+    event = SlowCallback(time.time(), ['  File "app/users/routes.py", line 1, in <module>\n'], None)
+    event.lag_ms = 180.0
+    loop_monitor.events.append(event)
+    app = create_app()
+    # The monitor is opt-in, but its pages are always served.
+    assert all(middleware.cls is not LoopMonitorMiddleware for middleware in app.user_middleware)
+    client = TestClient(app)
+
+    stats = client.get("/admin/loop/stats").json()
+    assert stats["pid"] == os.getpid()
+    assert stats["lag"]["count"] == 1
+    assert stats["slow_callbacks"][0]["lag_ms"] == 180.0
+    page = client.get("/admin/loop")
+    assert page.status_code == 200
+    assert "Heartbeat Lag" in page.text and "180.0" in page.text
+    assert "&lt;module&gt;" in page.text
+    loop_monitor.reset()
@@ -0,0 +1,87 @@
+"""
+Tests for the per-request sampling profiler and its admin pages.
+"""
+
+import asyncio
+import time
+from typing import Iterator
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+import app.core.config as config
+from app.core.database import AsyncSessionLocal
+from app.core.logging.models import APILog, APILogProfile
+from app.core.profiling.sampler import AWAIT_MARKER, TaskSampler
+from app.core.setup import create_app
+
+TOKEN = "let-me-profile"
+
+
+def _spin(seconds: float) -> None:
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+async def test_sampler_attributes_cpu_and_await_time_to_the_task() -> None:
+    sampler = TaskSampler(0.001)
+    sampler.start()
+    _spin(0.05)
+    await asyncio.sleep(0.05)
+    sampler.stop()
+
+    profile = sampler.profile("header")
+    assert profile["sample_count"] == sum(sampler.samples.values()) > 0
+    assert 0 < profile["running_samples"] < profile["sample_count"]
+    names = [row["function"] for row in profile["functions"]]
+    assert any(name.startswith("_spin ") for name in names)
+    assert AWAIT_MARKER in names
+    for line in profile["stacks"].splitlines():
+        stack, count = line.rsplit(" ", 1)
+        assert stack.startswith("test_sampler_attributes_cpu_and_await_time_to_the_task ")
+        assert int(count) > 0
+
+
+async def test_sampler_ignores_other_tasks() -> None:
+    async def busy() -> None:
+        _spin(0.05)
+
+    sampler = TaskSampler(0.001)
+    sampler.start()
+    await asyncio.create_task(busy())
+    sampler.stop()
+
+    assert sampler.running_samples == 0
+    assert all(stack.endswith(AWAIT_MARKER) for stack in sampler.samples)
+
+
+@pytest.fixture(name="profiled_client")
+def fixture_profiled_client(monkeypatch: pytest.MonkeyPatch) -> Iterator[TestClient]:
+    monkeypatch.setattr(config, "PROFILING_ENABLED", True)
+    monkeypatch.setattr(config, "PROFILING_TOKEN", TOKEN)
+    yield TestClient(create_app())
+
+
+async def test_profile_header_stores_profile_with_log(profiled_client: TestClient) -> None:
+    assert profiled_client.get("/users").status_code == 200
+    assert profiled_client.get("/users", headers={"X-Profile": "wrong"}).status_code == 200
+    assert profiled_client.get("/users", headers={"X-Profile": TOKEN}).status_code == 200
+
+    async with AsyncSessionLocal() as session:
+        rows = (await session.execute(select(APILogProfile, APILog).join(APILog))).all()
+        log_count = len((await session.execute(select(APILog.id))).all())
+    assert log_count == 3
+    assert len(rows) == 1
+    profile, log = rows[0]
+    assert (log.path, profile.trigger) == ("/users", "header")
+
+    listing = profiled_client.get("/admin/profiles")
+    assert listing.status_code == 200
+    assert f"/admin/profiles/{profile.id}" in listing.text
+    assert profiled_client.get(f"/admin/profiles/{profile.id}").status_code == 200
+    collapsed = profiled_client.get(f"/admin/profiles/{profile.id}/collapsed")
+    assert collapsed.status_code == 200
+    assert collapsed.headers["content-type"].startswith("text/plain")
+    assert profiled_client.get("/admin/profiles/999").status_code == 404
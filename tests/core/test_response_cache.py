@@ -0,0 +1,89 @@
+"""
+Tests for the response cache store and middleware.
+"""
+
+from typing import Any, Dict, Iterator
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+import app.core.config as config
+from app.core.cache.store import CachedResponse, ResponseCache, response_cache
+from app.core.database import AsyncSessionLocal
+from app.core.logging.models import APILog
+from app.core.setup import create_app
+
+
+USER_PAYLOAD: Dict[str, Any] = {
+    "email": "cache@example.com",
+    "first_name": "Cache",
+    "last_name": "Test",
+}
+
+
+def _entry(body: bytes, tag: str = "users", expires_at: float = 100.0) -> CachedResponse:
+    return CachedResponse(200, [("content-type", "application/json")], body, tag, expires_at)
+
+
+class TestResponseCache:
+    """Unit tests for the response cache store."""
+
+    def test_expired_entries_are_dropped(self) -> None:
+        cache = ResponseCache(max_bytes=10_000)
+        cache.set("a", _entry(b"[]", expires_at=10.0), cache.generation("users"))
+        assert cache.get("a", now=5.0) is not None
+        assert cache.get("a", now=10.0) is None
+        assert len(cache) == 0
+
+    def test_least_recently_used_entry_is_evicted_over_budget(self) -> None:
+        entry_size = _entry(b"x" * 100).size
+        cache = ResponseCache(max_bytes=entry_size * 2)
+        cache.set("a", _entry(b"x" * 100), 0)
+        cache.set("b", _entry(b"x" * 100), 0)
+        cache.get("a", now=0)
+        cache.set("c", _entry(b"x" * 100), 0)
+        assert cache.get("a", now=0) is not None
+        assert cache.get("b", now=0) is None
+        assert cache.size <= cache.max_bytes
+
+    def test_invalidate_tag_drops_entries_and_rejects_stale_writes(self) -> None:
+        cache = ResponseCache(max_bytes=10_000)
+        cache.set("a", _entry(b"[]"), cache.generation("users"))
+        cache.set("b", _entry(b"[]", tag="logs"), cache.generation("logs"))
+        stale_generation = cache.generation("users")
+        cache.invalidate_tag("users")
+        assert cache.get("a", now=0) is None
+        assert cache.get("b", now=0) is not None
+        assert not cache.set("a", _entry(b"[]"), stale_generation)
+
+
+@pytest.fixture(name="cached_client")
+def fixture_cached_client(monkeypatch: pytest.MonkeyPatch) -> Iterator[TestClient]:
+    monkeypatch.setattr(config, "RESPONSE_CACHE_ENABLED", True)
+    response_cache.clear()
+    yield TestClient(create_app())
+    response_cache.clear()
+
+
+async def test_cache_hits_are_logged_and_invalidated_by_mutations(
+    cached_client: TestClient,
+) -> None:
+    assert cached_client.get("/users").headers["X-Cache"] == "MISS"
+    hit = cached_client.get("/users")
+    assert hit.headers["X-Cache"] == "HIT"
+    assert hit.json() == []
+    assert (
+        cached_client.get("/users", headers={"If-None-Match": hit.headers["ETag"]}).status_code
+        == 304
+    )
+
+    cached_client.post("/users", json=USER_PAYLOAD)
+    refreshed = cached_client.get("/users")
+    assert refreshed.headers["X-Cache"] == "MISS"
+    assert len(refreshed.json()) == 1
+
+    async with AsyncSessionLocal() as session:
+        statuses = (await session.execute(select(APILog.cache_status))).scalars().all()
+    assert statuses.count("HIT") == 2
+    assert statuses.count("MISS") == 2
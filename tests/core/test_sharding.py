@@ -0,0 +1,304 @@
+"""
+Tests for hash-sharded user storage.
+
+Each test gets its own shard databases in temporary files and a session factory
+bound to them, so the app's main database and its per-test transaction are not
+involved.
+"""
+
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, List
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+import app.core.config as config
+from app.core.database import create_database_engine
+from app.core.sharding.keys import (
+    BUCKET_COUNT,
+    bucket_for_id,
+    bucket_for_key,
+    change_seq_watermark,
+    jump_hash,
+    make_change_seq,
+    make_id,
+)
+from app.core.sharding.rebalance import rebalance
+from app.core.sharding.router import ShardRouter
+from app.users.dao import UserDAO
+from app.users.models import UserModel
+from app.users.schemas import UserCreate, UserUpdate
+
+Factory = Callable[[int], async_sessionmaker[AsyncSession]]
+
+
+def _user(index: int) -> UserCreate:
+    return UserCreate(
+        first_name="Shard", last_name=f"User{index}", email=f"user{index}@example.com"
+    )
+
+
+def _other_bucket_email(email: str, object_id: int) -> str:
+    """An unused email whose bucket differs from the one encoded in `object_id`."""
+    index = 0
+    while bucket_for_key(f"moved{index}-{email}") == bucket_for_id(object_id):
+        index += 1
+    return f"moved{index}-{email}"
+
+
+@pytest_asyncio.fixture(name="shard_sessions")
+async def fixture_shard_sessions(tmp_path: Path) -> AsyncIterator[Factory]:
+    """Factory of session makers over the first n of a fixed list of shard databases."""
+    urls = [f"sqlite+aiosqlite:///{tmp_path / f'shard{index}.db'}" for index in range(3)]
+    main = create_database_engine(f"sqlite+aiosqlite:///{tmp_path / 'main.db'}")
+    routers: List[ShardRouter] = []
+
+    def make(shard_count: int) -> async_sessionmaker[AsyncSession]:
+        router = ShardRouter([create_database_engine(url) for url in urls[:shard_count]], main)
+        routers.append(router)
+        return async_sessionmaker(**router.session_options(), expire_on_commit=False)
+
+    yield make
+    for router in routers:
+        await router.dispose()
+    await main.dispose()
+
+
+async def _sessions(make: Factory, shard_count: int) -> async_sessionmaker[AsyncSession]:
+    sessions = make(shard_count)
+    async with sessions() as session:
+        router = session.info["shard_router"]
+    await router.create_schema()
+    return sessions
+
+
+async def _users_per_shard(session: AsyncSession) -> List[int]:
+    router = session.info["shard_router"]
+    return [
+        await session.scalar(
+            select(func.count()).select_from(UserModel),  # pylint: disable=not-callable
+            bind_arguments={"shard_id": shard_id},
+        )
+        or 0
+        for shard_id in router.shard_ids
+    ]
+
+
+class TestKeys:
+    """Tests for bucket, shard and sequence arithmetic."""
+
+    def test_ids_encode_their_bucket(self) -> None:
+        assert bucket_for_id(make_id(5, 17)) == 17
+        assert 0 <= bucket_for_key("alice@example.com") < BUCKET_COUNT
+
+    def test_adding_a_shard_only_moves_buckets_to_it(self) -> None:
+        for shards in range(1, 8):
+            for bucket in range(BUCKET_COUNT):
+                before, after = jump_hash(bucket, shards), jump_hash(bucket, shards + 1)
+                assert after in (before, shards)
+
+    def test_change_seqs_order_by_tick_then_shard(self) -> None:
+        assert make_change_seq(10, 3) < make_change_seq(11, 0)
+        assert change_seq_watermark(1.0, now=100_000_000.0) < change_seq_watermark(
+            0.5, now=100_000_000.0
+        )
+
+
+class TestShardedUsers:
+    """Tests for the user DAO on sharded sessions."""
+
+    async def test_users_spread_and_route_by_id(self, shard_sessions: Factory) -> None:
+        sessions = await _sessions(shard_sessions, 3)
+        async with sessions() as session:
+            dao = UserDAO(session)
+            created: List[Any] = [await dao.create(_user(index)) for index in range(60)]
+            assert all(bucket_for_id(user.id) == bucket_for_key(user.email) for user in created)
+            per_shard = await _users_per_shard(session)
+        assert sum(per_shard) == 60
+        assert all(count > 0 for count in per_shard)
+
+        async with sessions() as session:
+            dao = UserDAO(session)
+            fetched = await dao.get(created[7].id)
+            assert fetched is not None and fetched.email == "user7@example.com"
+            assert await dao.get_version(created[7].id) == 1
+            by_email = await dao.get_by_email("user8@example.com")
+            assert by_email is not None and by_email.id == created[8].id
+
+    async def test_duplicate_email_is_rejected(self, shard_sessions: Factory) -> None:
+        sessions = await _sessions(shard_sessions, 2)
+        async with sessions() as session:
+            await UserDAO(session).create(_user(1))
+        async with sessions() as session:
+            with pytest.raises(IntegrityError):
+                await UserDAO(session).create(_user(1))
+
+    async def test_changed_email_stays_unique_and_findable(self, shard_sessions: Factory) -> None:
+        sessions = await _sessions(shard_sessions, 3)
+        async with sessions() as session:
+            dao = UserDAO(session)
+            user: Any = await dao.create(_user(1))
+            email = _other_bucket_email(user.email, user.id)
+            updated = await dao.update(user.id, UserUpdate(email=email))
+            assert updated is not None and updated.version == 2
+
+        async with sessions() as session:
+            dao = UserDAO(session)
+            found = await dao.get_by_email(email)
+            assert found is not None and found.id == user.id
+            assert await dao.get_by_email("user1@example.com") is None
+            with pytest.raises(IntegrityError):
+                await dao.create(UserCreate(first_name="A", last_name="B", email=email))
+
+        async with sessions() as session:
+            dao = UserDAO(session)
+            # The old address was released.
+            assert (await dao.create(_user(1))).id != user.id
+            await dao.delete(user.id)
+        async with sessions() as session:
+            assert await UserDAO(session).get_by_email(email) is None
+            await UserDAO(session).create(UserCreate(first_name="A", last_name="B", email=email))
+
+    async def test_pages_merge_shards_in_id_order(self, shard_sessions: Factory) -> None:
+        sessions = await _sessions(shard_sessions, 3)
+        async with sessions() as session:
+            dao = UserDAO(session)
+            created: List[Any] = [await dao.create(_user(index)) for index in range(25)]
+            ids = sorted(user.id for user in created)
+            assert [user.id for user in await dao.get_all(limit=10, offset=5)] == ids[5:15]
+            rows = await dao.get_all_rows(limit=10, offset=20, columns=["email"])
+            assert len(rows) == 5 and list(rows[0]) == ["email"]
+            assert [object_id for object_id, _ in await dao.get_versions(limit=30)] == ids
+
+    async def test_upsert_many_updates_in_place(self, shard_sessions: Factory) -> None:
+        sessions = await _sessions(shard_sessions, 3)
+        rows = [_user(index).model_dump() for index in range(30)]
+        async with sessions() as session:
+            assert await UserDAO(session).upsert_many(rows, ["email"]) == 30
+        async with sessions() as session:
+            dao = UserDAO(session)
+            user: Any = await dao.get_by_email("user3@example.com")
+            assert user is not None
+            email = _other_bucket_email(user.email, user.id)
+            await dao.update(user.id, UserUpdate(email=email))
+        rows[3]["email"] = email
+        rows[3]["first_name"] = "Renamed"
+        async with sessions() as session:
+            dao = UserDAO(session)
+            # Only the renamed row changes; the aliased email updates its owner.
+            assert await dao.upsert_many(rows, ["email"]) == 1
+            renamed = await dao.get(user.id)
+            assert renamed is not None and renamed.first_name == "Renamed"
+            assert sum(await _users_per_shard(session)) == 30
+
+    async def test_search_spans_shards(self, shard_sessions: Factory) -> None:
+        sessions = await _sessions(shard_sessions, 3)
+        async with sessions() as session:
+            dao = UserDAO(session)
+            for index in range(20):
+                await dao.create(_user(index))
+            ranked = await dao.search_users('"user1"', ["id", "email"], limit=5)
+            assert len(ranked) == 5 and all("user1" in row["email"] for row in ranked)
+            assert [(row["score"], row["id"]) for row in ranked] == sorted(
+                (row["score"], row["id"]) for row in ranked
+            )
+            unranked = await dao.search_users('"user"', ["id"], limit=50, max_ranked=5)
+            assert [row["id"] for row in unranked] == sorted(row["id"] for row in unranked)
+            assert len(unranked) == 20
+
+    async def test_changes_merge_in_seq_order(
+        self, shard_sessions: Factory, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr(config, "SHARD_CHANGE_SETTLE_MS", 0.0)
+        sessions = await _sessions(shard_sessions, 3)
+        async with sessions() as session:
+            dao = UserDAO(session)
+            created: List[Any] = [await dao.create(_user(index)) for index in range(10)]
+            await dao.delete(created[0].id)
+            changes = await dao.get_changes(limit=100)
+            assert [change.entity_id for change in changes] == [user.id for user in created] + [
+                created[0].id
+            ]
+            assert [change.operation for change in changes][-1] == "delete"
+            tail = await dao.get_changes(since=changes[4].seq, limit=3)
+            assert [change.seq for change in tail] == [change.seq for change in changes[5:8]]
+
+    async def test_changes_committed_out_of_order_are_not_skipped(
+        self, shard_sessions: Factory, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr(config, "SHARD_CHANGE_SETTLE_MS", 0.0)
+        sessions = await _sessions(shard_sessions, 2)
+        async with sessions() as slow, sessions() as fast:
+            router = slow.info["shard_router"]
+            emails: Dict[str, int] = {}
+            index = 0
+            while len(emails) < 2:
+                emails.setdefault(router.shard_for_key(f"user{index}@example.com"), index)
+                index += 1
+
+            async def held_open() -> None:
+                """Stands in for a commit held up elsewhere, e.g. by the main database."""
+
+            # The slow transaction records its change first, but commits last.
+            with monkeypatch.context() as patch:
+                patch.setattr(slow, "commit", held_open)
+                late: Any = await UserDAO(slow).create(_user(emails["shard0"]))
+            early: Any = await UserDAO(fast).create(_user(emails["shard1"]))
+            feed = UserDAO(fast)
+            seen = await feed.get_changes()
+            assert [change.entity_id for change in seen] == [early.id]
+            cursor = seen[-1].seq
+            await feed.end_read()
+
+            await slow.commit()
+            later = await feed.get_changes(since=cursor)
+            assert [change.entity_id for change in later] == [late.id]
+
+    async def test_changes_wait_for_settle_time(self, shard_sessions: Factory) -> None:
+        sessions = await _sessions(shard_sessions, 2)
+        async with sessions() as session:
+            dao = UserDAO(session)
+            await dao.create(_user(1))
+            assert await dao.get_changes() == []
+
+
+class TestRebalance:
+    """Tests for moving rows after shards are added or removed."""
+
+    async def test_grow_and_shrink_keep_every_user(
+        self, shard_sessions: Factory, tmp_path: Path
+    ) -> None:
+        sessions = await _sessions(shard_sessions, 2)
+        async with sessions() as session:
+            dao = UserDAO(session)
+            users: List[Any] = [await dao.create(_user(index)) for index in range(40)]
+            email = _other_bucket_email(users[0].email, users[0].id)
+            await dao.update(users[0].id, UserUpdate(email=email))
+        urls = [f"sqlite+aiosqlite:///{tmp_path / f'shard{index}.db'}" for index in range(3)]
+
+        moved = await rebalance(urls[:2], urls)
+        assert 0 < moved["users"] < 40
+        async with (await _sessions(shard_sessions, 3))() as session:
+            dao = UserDAO(session)
+            per_shard = await _users_per_shard(session)
+            assert sum(per_shard) == 40 and per_shard[2] == moved["users"]
+            for user in users[1:]:
+                found = await dao.get_by_email(user.email)
+                assert found is not None and found.id == user.id
+            aliased = await dao.get_by_email(email)
+            assert aliased is not None and aliased.id == users[0].id
+            assert len(await dao.search_users('"user3"', ["id"])) == 11
+            new_user: Any = await dao.create(_user(99))
+            assert await dao.get(new_user.id) is not None
+
+        await rebalance(urls, urls[:2])
+        async with sessions() as session:
+            assert sum(await _users_per_shard(session)) == 41
+            assert await UserDAO(session).get_by_email("user99@example.com") is not None
+
+    async def test_shards_can_only_change_at_the_end(self) -> None:
+        with pytest.raises(ValueError):
+            await rebalance(["sqlite+aiosqlite:///a.db"], ["sqlite+aiosqlite:///b.db"])
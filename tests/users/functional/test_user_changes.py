@@ -0,0 +1,81 @@
+"""
+Integration tests for the user change feed.
+
+The long-polling test runs a request concurrently with the one it waits for, so it
+uses real commits rather than savepoints on the shared test connection.
+"""
+
+import asyncio
+from typing import Any, AsyncIterator, Dict
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+import app.core.config as config
+from app.main import app
+from tests.test_client import client
+
+
+def test_changes_record_creates_updates_and_tombstones(user_payload: Dict[str, Any]) -> None:
+    user = client.post("/users", json=user_payload).json()
+    client.patch(f"/users/{user['id']}", json={"last_name": "Johnson"})
+    client.patch(f"/users/{user['id']}", json={"last_name": "Johnson"})
+    client.delete(f"/users/{user['id']}")
+
+    response = client.get("/users/changes")
+    assert response.status_code == 200
+    assert response.headers["Cache-Control"] == "no-store"
+    feed = response.json()
+    assert [(change["operation"], change["id"], change["version"]) for change in feed["items"]] == [
+        ("create", user["id"], 1),
+        ("update", user["id"], 2),
+        ("delete", user["id"], 2),
+    ]
+    assert feed["items"][0]["user"] == user
+    assert feed["items"][1]["user"]["last_name"] == "Johnson"
+    assert feed["items"][2]["user"] is None
+    assert feed["next_since"] == feed["items"][-1]["seq"]
+
+
+def test_changes_are_paged_by_sequence_number() -> None:
+    for index in range(3):
+        client.post(
+            "/users",
+            json={"first_name": "User", "last_name": str(index), "email": f"u{index}@example.com"},
+        )
+
+    first = client.get("/users/changes", params={"limit": 2}).json()
+    assert [change["user"]["last_name"] for change in first["items"]] == ["0", "1"]
+    rest = client.get("/users/changes", params={"since": first["next_since"]}).json()
+    assert [change["user"]["last_name"] for change in rest["items"]] == ["2"]
+    caught_up = client.get("/users/changes", params={"since": rest["next_since"]}).json()
+    assert caught_up == {"items": [], "next_since": rest["next_since"]}
+
+
+def test_long_poll_times_out_without_changes() -> None:
+    response = client.get("/users/changes", params={"since": 5, "wait": 0.05})
+    assert response.json() == {"items": [], "next_since": 5}
+    assert client.get("/users/changes", params={"wait": 3600}).status_code == 422
+
+
+@pytest.fixture(name="async_client")
+async def fixture_async_client() -> AsyncIterator[AsyncClient]:
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client_:
+        yield client_
+
+
+@pytest.mark.commits
+async def test_long_poll_wakes_up_on_new_change(
+    async_client: AsyncClient, user_payload: Dict[str, Any], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # Rely on the in-process notification rather than re-reading the change log.
+    monkeypatch.setattr(config, "CHANGES_POLL_INTERVAL", 30.0)
+    poll = asyncio.create_task(async_client.get("/users/changes", params={"wait": 10}))
+    await asyncio.sleep(0.1)
+    assert not poll.done()
+
+    await async_client.post("/users", json=user_payload)
+    response = await asyncio.wait_for(poll, timeout=5)
+    assert [change["user"]["email"] for change in response.json()["items"]] == [
+        user_payload["email"]
+    ]
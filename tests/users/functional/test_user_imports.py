@@ -0,0 +1,103 @@
+"""
+Integration tests for bulk user imports.
+
+Import jobs run as background tasks on the event loop that accepted the upload,
+so these tests drive the app through an in-process async client. The job's
+sessions interleave with those of the polling requests, which savepoints on the
+shared test connection cannot do, so tests that run a job use real commits.
+"""
+
+import asyncio
+import json
+from typing import Any, AsyncIterator, Dict
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.main import app
+
+
+@pytest.fixture(name="async_client")
+async def fixture_async_client() -> AsyncIterator[AsyncClient]:
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+async def _wait_for_job(client: AsyncClient, location: str) -> Dict[str, Any]:
+    for _ in range(200):
+        job: Dict[str, Any] = (await client.get(location)).json()
+        if job["status"] in ("completed", "failed"):
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"import job did not finish: {job}")
+
+
+@pytest.mark.commits
+async def test_csv_import_upserts_on_email_and_reports_row_errors(
+    async_client: AsyncClient,
+) -> None:
+    existing = await async_client.post(
+        "/users", json={"first_name": "Alice", "last_name": "Smith", "email": "alice@example.com"}
+    )
+    upload = (
+        "first_name,last_name,email\n"
+        "Alice,Jones,alice@example.com\n"
+        "Bob,Brown,bob@example.com\n"
+        "Carol,,carol@example.com\n"
+        "Dave,Green,not-an-email\n"
+    )
+    response = await async_client.post(
+        "/users/imports", content=upload, headers={"Content-Type": "text/csv"}
+    )
+    assert response.status_code == 202
+    assert response.json()["status"] == "pending"
+
+    job = await _wait_for_job(async_client, response.headers["Location"])
+    assert job["status"] == "completed"
+    assert job["processed_rows"] == 4
+    assert job["imported_rows"] == 2
+    assert job["failed_rows"] == 2
+    assert [error["row"] for error in job["errors"]] == [3, 4]
+    assert job["progress"] == 1.0
+
+    users = {user["email"]: user for user in (await async_client.get("/users")).json()}
+    assert set(users) == {"alice@example.com", "bob@example.com"}
+    assert users["alice@example.com"]["last_name"] == "Jones"
+    assert users["alice@example.com"]["id"] == existing.json()["id"]
+    refreshed = await async_client.get(f"/users/{existing.json()['id']}")
+    assert refreshed.headers["ETag"] != existing.headers["ETag"]
+
+    changes = (await async_client.get("/users/changes")).json()["items"]
+    assert [(change["operation"], change["user"]["email"]) for change in changes] == [
+        ("create", "alice@example.com"),
+        ("update", "alice@example.com"),
+        ("create", "bob@example.com"),
+    ]
+
+
+@pytest.mark.commits
+async def test_ndjson_import_in_chunks(
+    async_client: AsyncClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr("app.core.config.IMPORT_CHUNK_SIZE", 2)
+    lines = [
+        json.dumps({"first_name": f"User{i}", "last_name": "Bulk", "email": f"u{i}@example.com"})
+        for i in range(5)
+    ]
+    upload = "\n".join([*lines, "{not json"]) + "\n"
+    response = await async_client.post(
+        "/users/imports", content=upload, headers={"Content-Type": "application/x-ndjson"}
+    )
+    job = await _wait_for_job(async_client, response.headers["Location"])
+    assert job["status"] == "completed"
+    assert job["imported_rows"] == 5
+    assert job["errors"][0]["row"] == 6
+    assert len((await async_client.get("/users")).json()) == 5
+
+
+async def test_import_rejects_unsupported_content_type(async_client: AsyncClient) -> None:
+    response = await async_client.post(
+        "/users/imports", content="{}", headers={"Content-Type": "application/json"}
+    )
+    assert response.status_code == 415
+    assert (await async_client.get("/users/imports/999")).status_code == 404
@@ -2,6 +2,8 @@
 Integration tests for the user endpoints.
 """
 
+import pytest
+import app.core.config as config
 from tests.test_client import client
 from typing import Dict, Any
 
@@ -44,3 +46,152 @@ def test_delete_user(user_payload: Dict[str, Any]) -> None:
     assert response.status_code == 200
     response = client.get(f"/users/{user['id']}")
     assert response.status_code == 404
+
+
+def test_fast_json_responses_match_default_encoding(
+    user_payload: Dict[str, Any], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    client.post("/users", json=user_payload)
+    user = client.post(
+        "/users", json={"first_name": "Zoë", "last_name": "Brontë", "email": "zoe@example.com"}
+    ).json()
+
+    default_list = client.get("/users").content
+    default_user = client.get(f"/users/{user['id']}").content
+    monkeypatch.setattr(config, "FAST_JSON_RESPONSES", True)
+    fast_list = client.get("/users")
+    fast_user = client.get(f"/users/{user['id']}")
+
+    assert fast_list.content == default_list
+    assert fast_user.content == default_user
+    assert fast_list.headers["content-type"] == "application/json"
+    assert client.get("/users/999999").status_code == 404
+
+
+def test_get_user_conditional_requests(user_payload: Dict[str, Any]) -> None:
+    created = client.post("/users", json=user_payload)
+    user_id = created.json()["id"]
+    response = client.get(f"/users/{user_id}")
+    etag = response.headers["ETag"]
+    assert etag == created.headers["ETag"]
+
+    not_modified = client.get(f"/users/{user_id}", headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert not_modified.headers["ETag"] == etag
+
+    client.patch(f"/users/{user_id}", json={"last_name": "Johnson"})
+    assert client.get(f"/users/{user_id}", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_get_all_users_conditional_request(user_payload: Dict[str, Any]) -> None:
+    client.post("/users", json=user_payload)
+    etag = client.get("/users").headers["ETag"]
+    assert client.get("/users", headers={"If-None-Match": etag}).status_code == 304
+    client.post("/users", json={**user_payload, "email": "bob@example.com"})
+    assert client.get("/users", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_get_all_users_sparse_fieldset(user_payload: Dict[str, Any]) -> None:
+    user = client.post("/users", json=user_payload).json()
+    response = client.get("/users", params={"fields": "email,id"})
+    assert response.status_code == 200
+    assert response.json() == [{"email": user["email"], "id": user["id"]}]
+
+    # Each fieldset has its own ETag, which still answers If-None-Match.
+    etag = response.headers["ETag"]
+    assert etag != client.get("/users").headers["ETag"]
+    assert etag != client.get("/users", params={"fields": "id"}).headers["ETag"]
+    not_modified = client.get(
+        "/users", params={"fields": "id,email"}, headers={"If-None-Match": etag}
+    )
+    assert not_modified.status_code == 304
+
+    assert client.get("/users", params={"fields": "id,version"}).status_code == 400
+    assert client.get("/users", params={"fields": ","}).status_code == 400
+
+
+def test_patch_and_delete_honour_if_match(user_payload: Dict[str, Any]) -> None:
+    created = client.post("/users", json=user_payload)
+    user_id, etag = created.json()["id"], created.headers["ETag"]
+
+    updated = client.patch(
+        f"/users/{user_id}", json={"last_name": "Johnson"}, headers={"If-Match": etag}
+    )
+    assert updated.status_code == 200
+    assert updated.headers["ETag"] != etag
+
+    stale = client.patch(f"/users/{user_id}", json={"last_name": "Lee"}, headers={"If-Match": etag})
+    assert stale.status_code == 412
+    assert client.delete(f"/users/{user_id}", headers={"If-Match": etag}).status_code == 412
+    response = client.delete(f"/users/{user_id}", headers={"If-Match": updated.headers["ETag"]})
+    assert response.status_code == 200
+
+
+def _create_users(*names: str) -> None:
+    for name in names:
+        first, last = name.split()
+        client.post(
+            "/users",
+            json={
+                "first_name": first,
+                "last_name": last,
+                "email": f"{first.lower()}.{last.lower()}@example.com",
+            },
+        )
+
+
+def test_get_user_by_email(user_payload: Dict[str, Any]) -> None:
+    user = client.post("/users", json=user_payload).json()
+    response = client.get("/users/by-email", params={"email": "alice@example.com"})
+    assert response.status_code == 200
+    assert response.json() == user
+    assert client.get("/users/by-email", params={"email": "bob@example.com"}).status_code == 404
+
+
+def test_search_users_by_prefix_follows_updates_and_deletes() -> None:
+    _create_users("Alice Smith", "Bob Alison", "Malice Jones")
+    response = client.get("/users/search", params={"q": "ali"})
+    assert response.status_code == 200
+    assert {user["first_name"] for user in response.json()["items"]} == {"Alice", "Bob"}
+
+    bob = client.get("/users/by-email", params={"email": "bob.alison@example.com"}).json()
+    client.patch(f"/users/{bob['id']}", json={"last_name": "Stone"})
+    names = [user["first_name"] for user in client.get("/users/search?q=ali").json()["items"]]
+    assert names == ["Alice"]
+
+    alice = client.get("/users/by-email", params={"email": "alice.smith@example.com"}).json()
+    client.delete(f"/users/{alice['id']}")
+    assert client.get("/users/search?q=ali").json()["items"] == []
+
+
+def test_fuzzy_search_tolerates_typos() -> None:
+    _create_users("Alice Smith", "Bob Jones")
+    response = client.get("/users/search", params={"q": "smiht", "mode": "fuzzy"})
+    assert [user["last_name"] for user in response.json()["items"]] == ["Smith"]
+
+
+def test_search_users_paginates_with_cursor() -> None:
+    _create_users("Anna One", "Anna Two", "Anna Three")
+    first = client.get("/users/search", params={"q": "anna", "limit": 2}).json()
+    assert len(first["items"]) == 2
+    second = client.get(
+        "/users/search", params={"q": "anna", "limit": 2, "cursor": first["next_cursor"]}
+    ).json()
+    assert len(second["items"]) == 1
+    assert second["next_cursor"] is None
+    ids = [user["id"] for user in first["items"] + second["items"]]
+    assert len(set(ids)) == 3
+    assert client.get("/users/search", params={"q": "anna", "cursor": "bogus"}).status_code == 400
+
+
+def test_broad_search_is_ordered_by_id(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(config, "SEARCH_MAX_RANKED", 1)
+    _create_users("Anna One", "Anna Two", "Anna Three")
+    first = client.get("/users/search", params={"q": "anna", "limit": 2}).json()
+    second = client.get(
+        "/users/search", params={"q": "anna", "limit": 2, "cursor": first["next_cursor"]}
+    ).json()
+    ids = [user["id"] for user in first["items"] + second["items"]]
+    assert ids == sorted(ids) and len(ids) == 3
+    assert second["next_cursor"] is None
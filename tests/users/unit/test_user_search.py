@@ -0,0 +1,38 @@
+"""
+Unit tests for user search query building.
+"""
+
+import pytest
+
+from app.users.search import SearchMode, build_match_query, decode_cursor, encode_cursor
+
+
+class TestBuildMatchQuery:
+    """Tests for translating search text into FTS5 MATCH expressions."""
+
+    def test_prefix_anchors_every_term(self) -> None:
+        assert build_match_query("Alice Smi", SearchMode.PREFIX) == '^ "alice" AND ^ "smi"'
+
+    def test_fuzzy_ors_distinct_trigrams(self) -> None:
+        assert build_match_query("anan", SearchMode.FUZZY) == '"ana" OR "nan"'
+
+    def test_short_terms_are_ignored(self) -> None:
+        assert build_match_query("al smith", SearchMode.PREFIX) == '^ "smith"'
+        assert build_match_query("al", SearchMode.FUZZY) is None
+
+    def test_quotes_are_escaped(self) -> None:
+        assert build_match_query('a"b OR', SearchMode.PREFIX) == '^ "a""b"'
+
+
+class TestCursor:
+    """Tests for search cursor encoding."""
+
+    def test_round_trip(self) -> None:
+        assert decode_cursor(encode_cursor(-1.2455384615384616e-06, 7)) == (
+            -1.2455384615384616e-06,
+            7,
+        )
+
+    def test_malformed_cursor_raises(self) -> None:
+        with pytest.raises(ValueError):
+            decode_cursor("bogus")